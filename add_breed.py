@@ -15,29 +15,44 @@ Usage:
     python add_breed.py 'Samoyed'
     python add_breed.py 'Border Collie' --dry-run
     python add_breed.py 'Australian Shepherd'
+    python add_breed.py 'Samoyed' --metrics-json m.json   # + fetch and stage timings
 
 As a callable module:
     from add_breed import add_breed_entry
     result = add_breed_entry("Samoyed")
     # returns {"ok": True, "breed": {...}, "placeholders": [...]}
     # or      {"ok": False, "error": "..."}
+
+    # progress: optional callback receiving a short message per step
+    add_breed_entry("Samoyed", progress=lambda msg: print("…", msg))
+
+    # Many at once: concurrent lookups, then a single write and rescore
+    from add_breed import add_breeds
+    add_breeds(["Samoyed", "Borzoi", "Saluki"], workers=8)
+    # returns {"ok": True, "results": {name: add_breed_entry-style result}}
 """
 
 import argparse
 import hashlib
 import io
 import json
+import os
 import re
 import subprocess
 import sys
 import time
 from pathlib import Path
+from typing import Callable
 from urllib.parse import urlsplit, urlunsplit
 
 import requests
 from bs4 import BeautifulSoup
 from PIL import Image
 
+import metrics
+from models import Breed, Range, Ratings, load_ratings
+from trait_registry import OVERALL_SUFFIX, REGISTRY
+
 DATA_FILE    = Path(__file__).parent / "large_dog_breeds.json"
 RATINGS_DIR  = Path(__file__).parent / "breed_details"
 RATINGS_JSON = Path(__file__).parent / "breed_ratings.json"
@@ -94,8 +109,10 @@ COUNTRIES = sorted([
 
 def fetch_page(url: str, max_attempts: int = 3) -> str | None:
     for attempt in range(max_attempts):
+        t0 = time.perf_counter()
         try:
             resp = requests.get(url, headers=HEADERS, timeout=15)
+            metrics.record_fetch(url, resp.status_code, time.perf_counter() - t0)
             if resp.status_code == 200:
                 return resp.text
             if resp.status_code in (429, 503):
@@ -103,6 +120,7 @@ def fetch_page(url: str, max_attempts: int = 3) -> str | None:
             else:
                 return None
         except requests.RequestException:
+            metrics.record_fetch(url, "error", time.perf_counter() - t0)
             time.sleep(2 ** attempt)
     return None
 
@@ -223,7 +241,7 @@ def slug_to_color(slug: str) -> str:
 def extract_ratings(html: str) -> dict[str, dict[str, int]] | None:
     """Same logic as scrape_ratings.py — returns category dict or None."""
     soup = BeautifulSoup(html, "lxml")
-    ratings = {}
+    items = []   # (category_id, trait_id, stars)
     for details in soup.find_all("details"):
         summary = details.find("summary", recursive=False)
         if not summary:
@@ -232,13 +250,13 @@ def extract_ratings(html: str) -> dict[str, dict[str, int]] | None:
         if not h2:
             continue
         category = re.sub(r"\s+", " ", h2.get_text(" ", strip=True)).strip()
-        cat_ratings = {}
+        cid = REGISTRY.intern_category(category)
 
         # Category-level overall rating (star span alongside the h2 in summary)
         cat_star_span = summary.find("span", class_="xe-breed-star-rating")
         if cat_star_span:
             filled = len(cat_star_span.find_all("span", class_="xe-breed-star--selected"))
-            cat_ratings[f"{category} - Overall"] = filled
+            items.append((cid, REGISTRY.intern(category + OVERALL_SUFFIX, cid), filled))
 
         for sub in details.find_all("details"):
             sub_summary = sub.find("summary", recursive=False)
@@ -253,10 +271,8 @@ def extract_ratings(html: str) -> dict[str, dict[str, int]] | None:
                 filled = len(star_span.find_all("span", class_="xe-breed-star--selected"))
             else:
                 filled = None
-            cat_ratings[trait] = filled
-        if cat_ratings:
-            ratings[category] = cat_ratings
-    return ratings if ratings else None
+            items.append((cid, REGISTRY.intern(trait, cid), filled))
+    return REGISTRY.nest(items) if items else None
 
 
 def extract_text_fields(text: str, breed_name: str) -> dict:
@@ -445,10 +461,13 @@ def download_image(img_url: str, slug: str) -> bool:
     parts = urlsplit(img_url)
     clean_url = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
     for url in [clean_url, img_url]:  # fallback to original if stripped fails
+        t0 = time.perf_counter()
         try:
             resp = requests.get(url, headers=HEADERS, timeout=20, stream=True)
+            body = resp.content if resp.status_code == 200 else b""
+            metrics.record_fetch(url, resp.status_code, time.perf_counter() - t0)
             if resp.status_code == 200:
-                img = Image.open(io.BytesIO(resp.content))
+                img = Image.open(io.BytesIO(body))
                 if img.mode not in ("RGB", "L"):
                     img = img.convert("RGB")
                 img.save(dest, "JPEG", quality=90, optimize=True)
@@ -458,9 +477,25 @@ def download_image(img_url: str, slug: str) -> bool:
     return False
 
 
+Progress = Callable[[str], None] | None
+
+
+def _reporter(progress: Progress) -> Callable[[str], None]:
+    return progress or (lambda message: None)
+
+
+def _save_breeds(breeds: list[dict]) -> None:
+    """Write large_dog_breeds.json via a temp file + rename so the server
+    never serves a half-written file."""
+    with metrics.stage("write"):
+        tmp = DATA_FILE.with_suffix(".tmp")
+        tmp.write_text(json.dumps(breeds, indent=2, ensure_ascii=False))
+        os.replace(tmp, DATA_FILE)
+
+
 # ── Remove breed ──────────────────────────────────────────────────────────────
 
-def remove_breed_entry(breed_name: str, dry_run: bool = False) -> dict:
+def remove_breed_entry(breed_name: str, dry_run: bool = False, progress: Progress = None) -> dict:
     """
     Remove a breed from large_dog_breeds.json and delete its associated files.
 
@@ -468,6 +503,7 @@ def remove_breed_entry(breed_name: str, dry_run: bool = False) -> dict:
         {"ok": True,  "name": ..., "slug": ..., "removed_files": [...]}
         {"ok": False, "error": "..."}
     """
+    report = _reporter(progress)
     existing_breeds = json.loads(DATA_FILE.read_text())
     match_idx = None
     for i, b in enumerate(existing_breeds):
@@ -497,74 +533,67 @@ def remove_breed_entry(breed_name: str, dry_run: bool = False) -> dict:
                 "removed_files": files_to_remove, "dry_run": True}
 
     # Remove files
+    report(f"Removing {name}")
     for path_str in files_to_remove:
         Path(path_str).unlink(missing_ok=True)
 
     # Remove from JSON
     existing_breeds.pop(match_idx)
-    DATA_FILE.write_text(json.dumps(existing_breeds, indent=2, ensure_ascii=False))
+    _save_breeds(existing_breeds)
     print(f"  Removed '{name}' from large_dog_breeds.json")
 
     # Rebuild breed_ratings.json
-    subprocess.run([sys.executable, str(Path(__file__).parent / "merge_ratings.py")],
-                   check=False, capture_output=True)
+    report("Rebuilding breed_ratings.json")
+    _merge_ratings()
     print("  Updated breed_ratings.json")
 
-    # Recompute service scores
-    from compute_service_score import update_service_scores
-    update_service_scores(verbose=False)
+    # Drop the breed from the correlation stats, then recompute service scores
+    from compute_service_score import update_correlation, update_service_scores
+    from profiles import update_profile_scores
+    report("Recomputing scores")
+    with metrics.stage("score"):
+        update_correlation({slug: None})
+        update_service_scores(verbose=False)
+        update_profile_scores(verbose=False)
     print("  Updated service_dog_score in large_dog_breeds.json")
 
+    report("Updating the similarity index")
+    from similarity import remove_breed
+    with metrics.stage("index"):
+        remove_breed(slug)
+
+    report("Updating the search index")
+    from search_index import remove_breed as unindex_breed
+    with metrics.stage("index"):
+        unindex_breed(slug or name)
+
     return {"ok": True, "name": name, "slug": slug, "removed_files": files_to_remove}
 
 
-# ── Core function ─────────────────────────────────────────────────────────────
+# ── Page lookup ───────────────────────────────────────────────────────────────
 
-def add_breed_entry(breed_name: str, dry_run: bool = False) -> dict:
+def find_breed_page(breed_name: str, progress: Progress = None) -> dict:
     """
-    Find the DogTime page for breed_name, extract data, and add to JSON files.
+    Resolve breed_name to its DogTime page and extract everything add needs
+    from it.  Network only, no file writes, so lookups can run concurrently.
 
     Returns:
-        {"ok": True,  "breed": {...}, "placeholders": [...]}
+        {"ok": True, "slug", "url", "page_name", "ranges", "img", "ratings", "text_fields"}
         {"ok": False, "error": "..."}
     """
-    # Check for duplicate — if found, look for auto-extractable gaps to fill
-    existing_breeds = json.loads(DATA_FILE.read_text())
-    existing_idx = None
-    for i, b in enumerate(existing_breeds):
-        if b["name"].lower() == breed_name.lower():
-            existing_idx = i
-            break
-
-    if existing_idx is not None:
-        gaps = _auto_gaps(existing_breeds[existing_idx])
-        if not gaps:
-            return {"ok": False, "error": f"'{existing_breeds[existing_idx]['name']}' is already in the database and all auto-extractable fields are complete"}
-        print(f"  '{existing_breeds[existing_idx]['name']}' already exists — gaps to fill: {gaps}")
-
-    # Find the DogTime page
-    found_slug = None
-    found_url  = None
-    found_html = None
-    found_page_name = None
-
+    report = _reporter(progress)
     for slug in slug_candidates(breed_name):
         url = f"https://dogtime.com/dog-breeds/{slug}"
         print(f"  Trying {url} …")
-        html = fetch_page(url)
+        report(f"Looking up {url}")
+        with metrics.stage("fetch"):
+            html = fetch_page(url)
         if not html:
             continue
         page_name = extract_page_breed_name(html)
-        if not page_name:
-            continue
-        if is_same_breed(breed_name, page_name):
-            found_slug      = slug
-            found_url       = url
-            found_html      = html
-            found_page_name = page_name
+        if page_name and is_same_breed(breed_name, page_name):
             break
-
-    if not found_slug:
+    else:
         return {
             "ok":    False,
             "error": (
@@ -574,39 +603,154 @@ def add_breed_entry(breed_name: str, dry_run: bool = False) -> dict:
             ),
         }
 
-    print(f"  Found: {found_page_name} → {found_url}")
+    print(f"  Found: {page_name} → {url}")
+    report(f"Found {page_name}, extracting data")
+
+    with metrics.stage("parse"):
+        soup = BeautifulSoup(html, "lxml")
+        text = soup.get_text(" ", strip=True)
+        return {
+            "ok":          True,
+            "slug":        slug,
+            "url":         url,
+            "page_name":   page_name,
+            "ranges":      extract_ranges(text),
+            "img":         extract_image_url(soup),
+            "ratings":     extract_ratings(html),
+            # Text-based fields (coat, health_notes, origin)
+            "text_fields": extract_text_fields(text, breed_name),
+        }
+
+
+def _fill_gaps(entry: dict, gaps: list[str], page: dict) -> list[str]:
+    """Fill an existing entry's scalar gaps from a page in place; returns the keys filled."""
+    updated = []
+    for key in ("weight_lbs", "height_in", "lifespan_yrs"):
+        if key in gaps and key in page["ranges"]:
+            entry[key] = page["ranges"][key]
+            updated.append(key)
+
+    if "dogtime_image_url" in gaps and page["img"]:
+        entry["dogtime_image_url"] = page["img"]
+        updated.append("dogtime_image_url")
+
+    for key in ("coat", "health_notes", "origin"):
+        if key in gaps and key in page["text_fields"]:
+            entry[key] = page["text_fields"][key]
+            updated.append(key)
+    return updated
 
-    # Extract data from page
-    soup   = BeautifulSoup(found_html, "lxml")
-    text   = soup.get_text(" ", strip=True)
-    ranges = extract_ranges(text)
-    img    = extract_image_url(soup)
 
-    # Extract star ratings
-    ratings = extract_ratings(found_html)
+def _new_breed(page: dict) -> tuple[Breed, list[str]]:
+    """A new Breed built from a page, plus the fields left at placeholder values."""
+    ranges, text_fields = page["ranges"], page["text_fields"]
+    found_page_name     = page["page_name"]
+    placeholders = []
+
+    def placeholder(key, val):
+        placeholders.append(key)
+        return val
+
+    entry = Breed(
+        name=found_page_name.removesuffix(" Dog").strip()
+             if found_page_name.endswith(" Dog") and " " in found_page_name.rstrip(" Dog")
+             else found_page_name,
+        origin=text_fields.get("origin", placeholder("origin", "Unknown")),
+        weight_lbs=Range.from_dict(ranges.get("weight_lbs", placeholder("weight_lbs", None))),
+        height_in=Range.from_dict(ranges.get("height_in", placeholder("height_in", None))),
+        lifespan_yrs=Range.from_dict(ranges.get("lifespan_yrs", placeholder("lifespan_yrs", None))),
+        temperament=placeholder("temperament", []),
+        purpose=placeholder("purpose", []),
+        grooming=placeholder("grooming", "Moderate"),
+        exercise=placeholder("exercise", "Moderate"),
+        good_with_kids=placeholder("good_with_kids", True),
+        good_with_dogs=placeholder("good_with_dogs", False),
+        coat=text_fields.get("coat", placeholder("coat", "Unknown")),
+        shedding=placeholder("shedding", "Moderate"),
+        trainability=placeholder("trainability", "Moderate"),
+        health_notes=text_fields.get("health_notes", placeholder("health_notes", "See DogTime for details")),
+        color=slug_to_color(page["slug"]),
+        dogtime_slug=page["slug"],
+        source_url=page["url"],
+    )
+
+    # Remove placeholders that were actually filled in by extraction
+    for key in ("weight_lbs", "height_in", "lifespan_yrs"):
+        if key in ranges:
+            if key in placeholders:
+                placeholders.remove(key)
+    for key in ("origin", "coat", "health_notes"):
+        if key in text_fields and key in placeholders:
+            placeholders.remove(key)
+
+    if page["img"]:
+        entry.dogtime_image_url = page["img"]
+    return entry, placeholders
+
+
+def _save_rating_file(name: str, page: dict) -> Path:
+    """Write breed_details/<slug>_ratings.json for a page's star ratings."""
+    from datetime import date
+    RATINGS_DIR.mkdir(exist_ok=True)
+    rating_file = RATINGS_DIR / f"{page['slug']}_ratings.json"
+    with metrics.stage("write"):
+        rating_file.write_text(json.dumps({
+            "breed":      name,
+            "slug":       page["slug"],
+            "url":        page["url"],
+            "scraped_at": date.today().isoformat(),
+            "ratings":    page["ratings"],
+        }, indent=2, ensure_ascii=False))
+    print(f"  Saved ratings → {rating_file.name}")
+    return rating_file
+
+
+def _merge_ratings() -> None:
+    """Rebuild breed_ratings.json from every breed_details/*_ratings.json."""
+    with metrics.stage("merge"):
+        subprocess.run([sys.executable, str(Path(__file__).parent / "merge_ratings.py")],
+                       check=False, capture_output=True)
+    print("  Updated breed_ratings.json")
 
-    # Extract text-based fields (coat, health_notes, origin)
-    text_fields = extract_text_fields(text, breed_name)
+
+# ── Core function ─────────────────────────────────────────────────────────────
+
+def add_breed_entry(breed_name: str, dry_run: bool = False, progress: Progress = None) -> dict:
+    """
+    Find the DogTime page for breed_name, extract data, and add to JSON files.
+    progress, if given, is called with a short message at each step.
+
+    Returns:
+        {"ok": True,  "breed": {...}, "placeholders": [...]}
+        {"ok": False, "error": "..."}
+    """
+    report = _reporter(progress)
+    # Check for duplicate — if found, look for auto-extractable gaps to fill
+    existing_breeds = json.loads(DATA_FILE.read_text())
+    existing_idx = None
+    for i, b in enumerate(existing_breeds):
+        if b["name"].lower() == breed_name.lower():
+            existing_idx = i
+            break
+
+    if existing_idx is not None:
+        gaps = _auto_gaps(existing_breeds[existing_idx])
+        if not gaps:
+            return {"ok": False, "error": f"'{existing_breeds[existing_idx]['name']}' is already in the database and all auto-extractable fields are complete"}
+        print(f"  '{existing_breeds[existing_idx]['name']}' already exists — gaps to fill: {gaps}")
+
+    # Find the DogTime page
+    page = find_breed_page(breed_name, progress)
+    if not page["ok"]:
+        return page
+    found_slug = page["slug"]
+    img, ratings, text_fields = page["img"], page["ratings"], page["text_fields"]
 
     # ── Update path: breed exists, fill in gaps ───────────────────────────────
     if existing_idx is not None:
         entry   = existing_breeds[existing_idx]
         gaps    = _auto_gaps(entry)
-        updated = []
-
-        for key in ("weight_lbs", "height_in", "lifespan_yrs"):
-            if key in gaps and key in ranges:
-                entry[key] = ranges[key]
-                updated.append(key)
-
-        if "dogtime_image_url" in gaps and img:
-            entry["dogtime_image_url"] = img
-            updated.append("dogtime_image_url")
-
-        for key in ("coat", "health_notes", "origin"):
-            if key in gaps and key in text_fields:
-                entry[key] = text_fields[key]
-                updated.append(key)
+        updated = _fill_gaps(entry, gaps, page)
 
         if dry_run:
             could_fill = updated \
@@ -619,10 +763,11 @@ def add_breed_entry(breed_name: str, dry_run: bool = False) -> dict:
         # Write JSON if any scalar fields changed
         if updated:
             existing_breeds[existing_idx] = entry
-            DATA_FILE.write_text(json.dumps(existing_breeds, indent=2, ensure_ascii=False))
+            _save_breeds(existing_breeds)
             print(f"  Updated fields: {updated}")
 
         # Download image if now available
+        report("Saving")
         img_url_to_use = entry.get("dogtime_image_url") or img
         if ("image_file" in gaps or "dogtime_image_url" in updated) and img_url_to_use:
             ok = download_image(img_url_to_use, found_slug)
@@ -632,80 +777,47 @@ def add_breed_entry(breed_name: str, dry_run: bool = False) -> dict:
 
         # Save ratings if missing or incomplete (missing category overall scores)
         if ("ratings" in gaps or "ratings_incomplete" in gaps) and ratings:
-            RATINGS_DIR.mkdir(exist_ok=True)
-            from datetime import date
-            rating_file = RATINGS_DIR / f"{found_slug}_ratings.json"
-            rating_file.write_text(json.dumps({
-                "breed":      entry["name"],
-                "slug":       found_slug,
-                "url":        found_url,
-                "scraped_at": date.today().isoformat(),
-                "ratings":    ratings,
-            }, indent=2, ensure_ascii=False))
-            print(f"  Saved ratings → {rating_file.name}")
+            _save_rating_file(entry["name"], page)
             updated.append("ratings")
-            subprocess.run([sys.executable, str(Path(__file__).parent / "merge_ratings.py")],
-                           check=False, capture_output=True)
-            print("  Updated breed_ratings.json")
-            from compute_service_score import update_service_scores
-            update_service_scores(verbose=False)
+            _merge_ratings()
+            from compute_service_score import update_correlation, update_service_scores
+            from profiles import update_profile_scores
+            report("Recomputing scores")
+            with metrics.stage("score"):
+                update_correlation({found_slug: Ratings.from_ids(REGISTRY.flatten(ratings))})
+                update_service_scores(verbose=False)
+                update_profile_scores(verbose=False)
             print("  Updated service_dog_score in large_dog_breeds.json")
 
         if not updated:
             return {"ok": False, "error": f"'{entry['name']}' exists with gaps {gaps} but the DogTime page didn't have the missing data"}
 
+        # Size ranges and ratings feed the similarity index
+        if {"weight_lbs", "height_in", "lifespan_yrs", "ratings"} & set(updated):
+            report("Updating the similarity index")
+            from similarity import upsert_breed
+            with metrics.stage("index"):
+                upsert_breed(Breed.from_dict(entry), load_ratings().get(found_slug))
+
+        report("Updating the search index")
+        from search_index import index_breeds
+        with metrics.stage("index"):
+            index_breeds([entry.get("dogtime_slug") or entry["name"]])
+
         return {"ok": True, "breed": entry, "updated": updated, "already_existed": True, "ratings": ratings}
 
     # ── New breed path ────────────────────────────────────────────────────────
     # Build breed entry (placeholder for fields we can't extract)
-    placeholders = []
-
-    def placeholder(key, val):
-        placeholders.append(key)
-        return val
-
-    entry = {
-        "name":          found_page_name.removesuffix(" Dog").strip()
-                         if found_page_name.endswith(" Dog") and " " in found_page_name.rstrip(" Dog")
-                         else found_page_name,
-        "origin":        text_fields.get("origin",       placeholder("origin",       "Unknown")),
-        "weight_lbs":    ranges.get("weight_lbs",         placeholder("weight_lbs",    {"min": 0, "max": 0})),
-        "height_in":     ranges.get("height_in",          placeholder("height_in",     {"min": 0, "max": 0})),
-        "lifespan_yrs":  ranges.get("lifespan_yrs",       placeholder("lifespan_yrs",  {"min": 0, "max": 0})),
-        "temperament":   placeholder("temperament",        []),
-        "purpose":       placeholder("purpose",            []),
-        "grooming":      placeholder("grooming",           "Moderate"),
-        "exercise":      placeholder("exercise",           "Moderate"),
-        "good_with_kids":placeholder("good_with_kids",     True),
-        "good_with_dogs":placeholder("good_with_dogs",     False),
-        "coat":          text_fields.get("coat",          placeholder("coat",         "Unknown")),
-        "shedding":      placeholder("shedding",           "Moderate"),
-        "trainability":  placeholder("trainability",       "Moderate"),
-        "health_notes":  text_fields.get("health_notes",  placeholder("health_notes", "See DogTime for details")),
-        "color":         slug_to_color(found_slug),
-        "dogtime_slug":  found_slug,
-        "source_url":    found_url,
-    }
-
-    # Remove placeholders that were actually filled in by extraction
-    for key in ("weight_lbs", "height_in", "lifespan_yrs"):
-        if key in ranges:
-            if key in placeholders:
-                placeholders.remove(key)
-    for key in ("origin", "coat", "health_notes"):
-        if key in text_fields and key in placeholders:
-            placeholders.remove(key)
-
-    if img:
-        entry["dogtime_image_url"] = img
+    entry, placeholders = _new_breed(page)
 
     if dry_run:
-        return {"ok": True, "breed": entry, "placeholders": placeholders, "dry_run": True, "ratings": ratings}
+        return {"ok": True, "breed": entry.to_dict(), "placeholders": placeholders, "dry_run": True, "ratings": ratings}
 
     # Write to large_dog_breeds.json
-    existing_breeds.append(entry)
-    DATA_FILE.write_text(json.dumps(existing_breeds, indent=2, ensure_ascii=False))
-    print(f"  Added '{entry['name']}' to large_dog_breeds.json")
+    report("Saving")
+    existing_breeds.append(entry.to_dict())
+    _save_breeds(existing_breeds)
+    print(f"  Added '{entry.name}' to large_dog_breeds.json")
 
     # Download image
     if img:
@@ -716,61 +828,233 @@ def add_breed_entry(breed_name: str, dry_run: bool = False) -> dict:
 
     # Save ratings
     if ratings:
-        flat = {}
-        for cat_traits in ratings.values():
-            flat.update(cat_traits)
-        RATINGS_DIR.mkdir(exist_ok=True)
-        rating_file = RATINGS_DIR / f"{found_slug}_ratings.json"
-        from datetime import date
-        rating_file.write_text(json.dumps({
-            "breed":      entry["name"],
-            "slug":       found_slug,
-            "url":        found_url,
-            "scraped_at": date.today().isoformat(),
-            "ratings":    ratings,
-        }, indent=2, ensure_ascii=False))
-        print(f"  Saved ratings → {rating_file.name}")
+        _save_rating_file(entry.name, page)
 
         # Re-run merge_ratings.py to update breed_ratings.json
-        subprocess.run([sys.executable, str(Path(__file__).parent / "merge_ratings.py")],
-                       check=False, capture_output=True)
-        print("  Updated breed_ratings.json")
-
-        # Recompute service dog scores now that ratings include the new breed
-        from compute_service_score import update_service_scores
-        update_service_scores(verbose=False)
+        _merge_ratings()
+
+        # Fold the new breed into the correlation stats, then recompute scores
+        from compute_service_score import update_correlation, update_service_scores
+        from profiles import update_profile_scores
+        report("Recomputing scores")
+        with metrics.stage("score"):
+            update_correlation({found_slug: Ratings.from_ids(REGISTRY.flatten(ratings))})
+            update_service_scores(verbose=False)
+            update_profile_scores(verbose=False)
         print("  Updated service_dog_score in large_dog_breeds.json")
     else:
         print("  Warning: no star ratings found for this breed (page may use a different template)")
 
-    return {"ok": True, "breed": entry, "placeholders": placeholders, "ratings": ratings}
+    report("Updating the similarity index")
+    from similarity import upsert_breed
+    with metrics.stage("index"):
+        upsert_breed(entry, Ratings.from_ids(REGISTRY.flatten(ratings)) if ratings else None)
 
+    report("Updating the search index")
+    from search_index import index_breeds
+    with metrics.stage("index"):
+        index_breeds([found_slug])
 
-# ── CLI ───────────────────────────────────────────────────────────────────────
+    return {"ok": True, "breed": entry.to_dict(), "placeholders": placeholders, "ratings": ratings}
+
+
+# ── Bulk add ──────────────────────────────────────────────────────────────────
 
-def refresh_all_breeds(dry_run: bool = False) -> None:
+BULK_WORKERS = 8     # concurrent DogTime lookups / image downloads
+
+
+def add_breeds(names: list[str], workers: int = BULK_WORKERS, dry_run: bool = False,
+               progress: Progress = None) -> dict:
+    """
+    Add (or fill the gaps of) many breeds at once.  Pages are looked up and
+    images downloaded concurrently, `workers` at a time.  Everything is then
+    committed together: one large_dog_breeds.json write, one ratings merge,
+    one correlation update and rescore, one similarity and search index
+    update.  A batch costs about as much as its slowest few fetches, not N
+    sequential adds.
+
+    progress gets one message per breed as its lookup finishes, then one per
+    commit step.
+
+    Returns {"ok": True, "results": {name: result}}, where each result has
+    add_breed_entry's shape.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    report   = _reporter(progress)
+    existing = json.loads(DATA_FILE.read_text())
+    by_name  = {b["name"].lower(): i for i, b in enumerate(existing)}
+    results: dict[str, dict] = {}
+
+    todo, seen = [], set()
+    for name in (n.strip() for n in names):
+        if not name or name.lower() in seen:
+            continue
+        seen.add(name.lower())
+        i = by_name.get(name.lower())
+        if i is not None and not _auto_gaps(existing[i]):
+            results[name] = {"ok": False, "error": f"'{existing[i]['name']}' is already in the database and all auto-extractable fields are complete"}
+        else:
+            todo.append(name)
+
+    # ── Look up every page concurrently (network only) ───────────────────────
+    pages = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(find_breed_page, name): name for name in todo}
+        for n, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                pages[name] = future.result()
+            except Exception as exc:
+                pages[name] = {"ok": False, "error": f"Lookup failed: {exc}"}
+            state = f"found {pages[name]['page_name']}" if pages[name]["ok"] else "not found"
+            report(f"[{n}/{len(todo)}] {name}: {state}")
+
+    # ── Plan the changes in memory ────────────────────────────────────────────
+    slugs    = {b.get("dogtime_slug") for b in existing}
+    images   = {}                      # slug → image URL to download
+    rated    = {}                      # slug → (name, page) with ratings to save
+    changed  = {}                      # slug → (entry dict, result) for the indexes
+    for name in todo:                  # request order, so the JSON order is deterministic
+        page = pages[name]
+        if not page["ok"]:
+            results[name] = page
+            continue
+        slug, img, ratings = page["slug"], page["img"], page["ratings"]
+        i = by_name.get(name.lower())
+
+        if i is not None:
+            entry   = existing[i]
+            gaps    = _auto_gaps(entry)
+            updated = _fill_gaps(entry, gaps, page)
+            img_url = entry.get("dogtime_image_url") or img
+            if ("image_file" in gaps or "dogtime_image_url" in updated) and img_url:
+                images[slug] = img_url
+            if ("ratings" in gaps or "ratings_incomplete" in gaps) and ratings:
+                rated[slug] = (entry["name"], page)
+                updated.append("ratings")
+            if not updated and slug not in images:
+                results[name] = {"ok": False, "error": f"'{entry['name']}' exists with gaps {gaps} but the DogTime page didn't have the missing data"}
+                continue
+            if dry_run and slug in images:
+                updated.append("image_file")
+            result = {"ok": True, "breed": entry, "updated": updated, "already_existed": True, "ratings": ratings}
+        elif slug in slugs:
+            results[name] = {"ok": False, "error": f"'{page['page_name']}' ({slug}) is already in the database"}
+            continue
+        else:
+            breed, placeholders = _new_breed(page)
+            entry = breed.to_dict()
+            existing.append(entry)
+            slugs.add(slug)
+            if img:
+                images[slug] = img
+            if ratings:
+                rated[slug] = (breed.name, page)
+            result = {"ok": True, "breed": entry, "placeholders": placeholders, "ratings": ratings}
+
+        if dry_run:
+            result["dry_run"] = True
+        results[name]  = result
+        changed[slug]  = (entry, result)
+
+    if dry_run or not changed:
+        return {"ok": True, "results": _in_order(results, names)}
+
+    # ── Download images concurrently ──────────────────────────────────────────
+    report(f"Downloading {len(images)} image(s)")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        saved = dict(zip(images, pool.map(lambda kv: download_image(kv[1], kv[0]), images.items())))
+    for slug, ok in saved.items():
+        print(f"  Image: {'saved → images/' + slug + '.jpg' if ok else 'download failed'} ({slug})")
+        result = changed[slug][1]
+        if ok and result.get("already_existed"):
+            result["updated"].append("image_file")
+
+    for slug, (entry, result) in list(changed.items()):
+        if result.get("already_existed") and not result["updated"]:
+            gaps = _auto_gaps(entry)
+            result.clear()
+            result.update(ok=False, error=f"'{entry['name']}' exists with gaps {gaps} but the DogTime page didn't have the missing data")
+            del changed[slug]
+
+    # ── Commit: one write, one merge, one rescore ─────────────────────────────
+    report(f"Saving {len(changed)} breed(s)")
+    _save_breeds(existing)
+    print(f"  Saved {len(changed)} breed(s) to large_dog_breeds.json")
+
+    if rated:
+        for slug, (name, page) in rated.items():
+            _save_rating_file(name, page)
+        _merge_ratings()
+        from compute_service_score import update_correlation, update_service_scores
+        from profiles import update_profile_scores
+        report("Recomputing scores")
+        with metrics.stage("score"):
+            update_correlation({slug: Ratings.from_ids(REGISTRY.flatten(page["ratings"]))
+                                for slug, (_, page) in rated.items()})
+            update_service_scores(verbose=False)
+            update_profile_scores(verbose=False)
+        print("  Updated service_dog_score in large_dog_breeds.json")
+
+    report("Updating the similarity and search indexes")
+    from similarity import upsert_breeds
+    from search_index import index_breeds
+    with metrics.stage("index"):
+        all_ratings = load_ratings()
+        upsert_breeds([(Breed.from_dict(entry), all_ratings.get(slug)) for slug, (entry, _) in changed.items()])
+        index_breeds(list(changed))
+
+    return {"ok": True, "results": _in_order(results, names)}
+
+
+def _in_order(results: dict, names: list[str]) -> dict:
+    return {n: results[n] for n in dict.fromkeys(n.strip() for n in names) if n in results}
+
+
+# ── Refresh ───────────────────────────────────────────────────────────────────
+
+def refresh_breed_entry(breed_name: str, dry_run: bool = False, progress: Progress = None) -> dict:
+    """
+    Fill auto-extractable gaps for a breed that is already in
+    large_dog_breeds.json.  Same result shape as add_breed_entry's update
+    path, but never adds a new breed.
+    """
+    breeds = json.loads(DATA_FILE.read_text())
+    if not any(b["name"].lower() == breed_name.lower() for b in breeds):
+        return {"ok": False, "error": f"'{breed_name}' not found in large_dog_breeds.json"}
+    return add_breed_entry(breed_name, dry_run=dry_run, progress=progress)
+
+
+def refresh_all_breeds(dry_run: bool = False, progress: Progress = None) -> dict:
     """
     Check every breed in large_dog_breeds.json for auto-extractable gaps.
     For any breed with gaps, fetch its DogTime page and fill them in.
+
+    Returns {"ok": True, "results": {name: add_breed_entry result}}.
     """
+    report = _reporter(progress)
     breeds = json.loads(DATA_FILE.read_text())
     needs_work = [(b["name"], _auto_gaps(b)) for b in breeds if _auto_gaps(b)]
 
     if not needs_work:
         print("All breeds are complete — nothing to update.")
-        return
+        return {"ok": True, "results": {}}
 
     print(f"{len(needs_work)} breed(s) have gaps:\n")
     for name, gaps in needs_work:
         print(f"  {name}: {gaps}")
 
     if dry_run:
-        return
+        return {"ok": True, "results": {}, "gaps": dict(needs_work), "dry_run": True}
 
     print()
-    for name, gaps in needs_work:
+    results = {}
+    for i, (name, gaps) in enumerate(needs_work, 1):
         print(f"── {name} ──")
-        result = add_breed_entry(name, dry_run=False)
+        step   = f"[{i}/{len(needs_work)}] {name}"
+        result = add_breed_entry(name, dry_run=False, progress=lambda msg: report(f"{step}: {msg}"))
+        results[name] = result
         if result.get("ok"):
             print(f"  Updated: {result.get('updated', [])}")
         else:
@@ -778,6 +1062,10 @@ def refresh_all_breeds(dry_run: bool = False) -> None:
         print()
 
     print("Done.")
+    return {"ok": True, "results": results}
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
 
 
 def main():
@@ -786,7 +1074,9 @@ def main():
     ap.add_argument("--remove",      action="store_true", help="Remove the breed instead of adding it")
     ap.add_argument("--refresh-all", action="store_true", help="Check all breeds for gaps and fill them in")
     ap.add_argument("--dry-run",     action="store_true", help="Print result but don't save")
+    metrics.add_argument(ap)
     args = ap.parse_args()
+    metrics.dump_at_exit(args.metrics_json)
 
     if args.refresh_all:
         print("\nChecking all breeds for gaps…\n")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+asset_manifest.py — content-hashed URLs for breed images and charts.
+
+Maps each logical asset path to a fingerprinted URL that embeds a hash of
+the file's bytes:
+
+  images/great-dane.jpg  →  /images/great-dane.3f2a9c1d4e5b6a70.jpg
+
+A fingerprinted URL names exactly one version of a file, so server.py can
+send it with "Cache-Control: public, max-age=31536000, immutable".  A
+browser then never re-requests it, and a changed image gets a new URL.
+/api/breeds gives each breed an image_url from this manifest.  The plain
+path still works and is served with Last-Modified / If-Modified-Since and an
+ETag.
+
+The manifest is persisted to asset_manifest.json.  A refresh re-stats every
+asset and re-hashes only those whose (inode, mtime, size) changed.  The
+shared manifest refreshes at most once per CHECK_INTERVAL, so an image
+replaced by add_breed.py or a chart regenerated by generate_visualizations.py
+gets its new URL within a second.
+
+Usage:
+    python asset_manifest.py              # refresh asset_manifest.json, print a summary
+    python asset_manifest.py --list       # every logical path → URL
+
+As a callable module:
+    from asset_manifest import get_manifest
+    url = get_manifest().url_for("images/great-dane.jpg")
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+ROOT           = Path(__file__).parent
+MANIFEST_FILE  = ROOT / "asset_manifest.json"
+ASSET_DIRS     = ("images", "charts")
+ASSET_SUFFIXES = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"}
+HASH_BYTES     = 8            # 16 hex digits in the URL
+CHECK_INTERVAL = 1.0          # seconds between re-stats of the asset directories
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_FINGERPRINT_RE = re.compile(rf"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{{{HASH_BYTES * 2}}})(?P<suffix>\.[A-Za-z0-9]+)$")
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=HASH_BYTES)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprinted(logical: str, digest: str) -> str:
+    """images/a.jpg, 3f2a… → /images/a.3f2a….jpg"""
+    p = Path(logical)
+    return "/" + str(p.with_name(f"{p.stem}.{digest}{p.suffix}"))
+
+
+def stat_key(st: os.stat_result) -> list[int]:
+    """What an entry's "key" records: the file is re-hashed once this changes."""
+    return [st.st_ino, st.st_mtime_ns, st.st_size]
+
+
+class AssetManifest:
+    """Logical path ("images/x.jpg") → {"url", "hash", "key"}."""
+
+    def __init__(self, root: Path = ROOT, manifest_file: Path = MANIFEST_FILE):
+        self.root          = Path(root)
+        self.manifest_file = Path(manifest_file)
+        self.assets: dict[str, dict] = {}
+        self.version = 0              # bumped on every change; keys derived caches
+        self._lock   = threading.Lock()
+        try:
+            self.assets = json.loads(self.manifest_file.read_text())["assets"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _scan(self) -> dict[str, os.stat_result]:
+        found = {}
+        for d in ASSET_DIRS:
+            try:
+                entries = list(os.scandir(self.root / d))
+            except OSError:
+                continue
+            for e in entries:
+                if e.is_file() and not e.name.startswith(".") and Path(e.name).suffix.lower() in ASSET_SUFFIXES:
+                    found[f"{d}/{e.name}"] = e.stat()
+        return found
+
+    def refresh(self) -> bool:
+        """Re-stat every asset and re-hash changed ones.  True if anything changed."""
+        with self._lock:
+            current = self._scan()
+            assets  = {}
+            for logical, st in current.items():
+                key = stat_key(st)
+                old = self.assets.get(logical)
+                if old and old["key"] == key:
+                    assets[logical] = old
+                    continue
+                try:
+                    digest = file_hash(self.root / logical)
+                except OSError:                    # vanished between scan and read
+                    continue
+                assets[logical] = {"url": fingerprinted(logical, digest), "hash": digest, "key": key}
+            if assets == self.assets:
+                return False
+            self.assets   = assets
+            self.version += 1
+            tmp = self.manifest_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"assets": assets}, indent=1))
+            os.replace(tmp, self.manifest_file)
+            return True
+
+    def url_for(self, logical: str) -> str | None:
+        entry = self.assets.get(logical.lstrip("/"))
+        return entry["url"] if entry else None
+
+    def image_url(self, slug: str) -> str | None:
+        return self.url_for(f"images/{slug}.jpg")
+
+    def resolve(self, url_path: str) -> tuple[str, list[int] | None] | None:
+        """
+        A fingerprinted URL path → (logical path, key).  key is the stat key
+        of the file the fingerprint was hashed from, or None for an old
+        fingerprint of a file that has since changed.  None if url_path isn't
+        a fingerprinted asset URL.
+        """
+        m = _FINGERPRINT_RE.match(url_path.lstrip("/"))
+        if not m:
+            return None
+        logical = m["stem"] + m["suffix"]
+        entry   = self.assets.get(logical)
+        if entry is None:
+            return None
+        return logical, entry["key"] if entry["hash"] == m["hash"] else None
+
+    def urls(self) -> dict[str, str]:
+        return {logical: e["url"] for logical, e in sorted(self.assets.items())}
+
+
+# ── Shared manifest ──────────────────────────────────────────────────────────
+
+_lock   = threading.Lock()
+_shared: dict = {"manifest": None, "checked": 0.0}
+
+
+def get_manifest() -> AssetManifest:
+    """The process-wide manifest, refreshed at most once per CHECK_INTERVAL."""
+    with _lock:
+        manifest = _shared["manifest"]
+        if manifest is None:
+            manifest = _shared["manifest"] = AssetManifest()
+        now = time.monotonic()
+        if now - _shared["checked"] >= CHECK_INTERVAL:
+            _shared["checked"] = now
+            manifest.refresh()
+        return manifest
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Content-hashed URLs for images and charts")
+    ap.add_argument("--list", action="store_true", help="Print every logical path and its URL")
+    args = ap.parse_args()
+
+    t0       = time.perf_counter()
+    manifest = AssetManifest()
+    changed  = manifest.refresh()
+    print(f"{'Wrote' if changed else 'Unchanged:'} {MANIFEST_FILE.name}  "
+          f"({len(manifest.assets)} assets, {time.perf_counter() - t0:.2f}s)")
+    if args.list:
+        for logical, url in manifest.urls().items():
+            print(f"  {logical:45s} {url}")
+
+
+if __name__ == "__main__":
+    main()
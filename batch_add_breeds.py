@@ -1,7 +1,20 @@
 #!/usr/bin/env python3
-"""Batch-add 50 large breeds sequentially using add_breed_entry()."""
-import sys
-from add_breed import add_breed_entry
+"""
+Batch-add 50 large breeds with add_breeds(): pages are fetched concurrently,
+then everything is committed with one data write, one ratings merge and one
+rescore.
+
+Usage:
+    python batch_add_breeds.py                 # the 50 breeds below, 8 at a time
+    python batch_add_breeds.py --workers 16
+    python batch_add_breeds.py --dry-run
+    python batch_add_breeds.py --metrics-json m.json   # + per-stage timings
+"""
+import argparse
+import time
+
+import metrics
+from add_breed import BULK_WORKERS, add_breeds
 
 BREEDS = [
     "Tibetan Mastiff",
@@ -56,25 +69,39 @@ BREEDS = [
     "Entlebucher Mountain Dog",
 ]
 
-ok_count = 0
-fail_count = 0
-skip_count = 0
 
-for breed in BREEDS:
+def main():
+    ap = argparse.ArgumentParser(description="Add the BREEDS list in one bulk commit")
+    ap.add_argument("--workers", type=int, default=BULK_WORKERS,
+                    help=f"Concurrent DogTime lookups (default {BULK_WORKERS})")
+    ap.add_argument("--dry-run", action="store_true", help="Look everything up but don't save")
+    metrics.add_argument(ap)
+    args = ap.parse_args()
+    metrics.dump_at_exit(args.metrics_json)
+
+    t0      = time.perf_counter()
+    results = add_breeds(BREEDS, workers=args.workers, dry_run=args.dry_run,
+                         progress=lambda msg: print(f"  … {msg}"))["results"]
+
+    ok_count = fail_count = skip_count = 0
     print(f"\n{'='*60}")
-    print(f"Adding: {breed}")
-    print('='*60)
-    result = add_breed_entry(breed)
-    if result["ok"]:
-        ok_count += 1
-        if result.get("placeholders"):
-            print(f"  Placeholders to fill: {result['placeholders']}")
-    elif "duplicate" in result.get("error", "").lower() or "already" in result.get("error", "").lower():
-        skip_count += 1
-        print(f"  SKIP (duplicate): {result['error']}")
-    else:
-        fail_count += 1
-        print(f"  FAIL: {result['error']}")
+    for breed in BREEDS:
+        result = results.get(breed, {"ok": False, "error": "not processed"})
+        if result["ok"]:
+            ok_count += 1
+            if result.get("placeholders"):
+                print(f"  {breed}: placeholders to fill: {result['placeholders']}")
+        elif "duplicate" in result.get("error", "").lower() or "already" in result.get("error", "").lower():
+            skip_count += 1
+            print(f"  SKIP (duplicate) {breed}: {result['error']}")
+        else:
+            fail_count += 1
+            print(f"  FAIL {breed}: {result['error']}")
+
+    print(f"\n{'='*60}")
+    print(f"DONE — added: {ok_count}, skipped (dup): {skip_count}, failed: {fail_count} "
+          f"in {time.perf_counter() - t0:.1f}s")
+
 
-print(f"\n{'='*60}")
-print(f"DONE — added: {ok_count}, skipped (dup): {skip_count}, failed: {fail_count}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+bench_server.py — load test for server.py: read latency during an add.
+
+Starts server.py's server in-process on a free port, POSTs one
+/api/add-breed and polls the job it returns until it finishes.  While the job
+runs, client threads GET a mix of static files, breed images and /api/breeds.
+Prints latency percentiles for those reads and for the add POST itself.
+
+By default the add is simulated: add_breed_entry is replaced with a sleep of
+--add-seconds, so the test runs offline and leaves the data files alone.  The
+job still goes through the real handler, job queue and mutation lock.
+--real NAME performs a real DogTime add instead, which changes the data files.
+
+--waterfall replays the card view's page load instead: the HTML, then the
+JSX, then /api/breeds and breed_ratings.json together, then every breed's
+320 px thumbnail, spread over --connections parallel connections as a
+browser does.  It is timed twice: with persistent connections, and with a
+new TCP connection per request (what the HTTP/1.0 server forced).  Caches are
+warmed first, so only connection handling differs.  On localhost a TCP
+handshake costs tens of microseconds; over a real network each one costs at
+least one round trip, so the gap there is larger.
+
+Usage:
+    python bench_server.py                      # pooled server, simulated 5 s add
+    python bench_server.py --workers 0          # single-threaded server, for comparison
+    python bench_server.py --clients 8 --add-seconds 10
+    python bench_server.py --real Samoyed
+    python bench_server.py --waterfall          # page-load waterfall, keep-alive vs not
+    python bench_server.py --waterfall --connections 6 --rounds 20
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import server
+
+ROOT = Path(__file__).parent
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _read_paths() -> list[str]:
+    images = sorted((ROOT / "images").glob("*.jpg"))[:3]
+    return ["/", "/large_dog_breeds_app.jsx", "/api/breeds"] + [f"/images/{p.name}" for p in images]
+
+
+def _percentile(sorted_vals: list[float], p: float) -> float:
+    if not sorted_vals:
+        return float("nan")
+    k = min(len(sorted_vals) - 1, max(0, round(p / 100 * (len(sorted_vals) - 1))))
+    return sorted_vals[k]
+
+
+def run(workers: int, clients: int, add_seconds: float, real: str | None) -> dict:
+    if not real:
+        import add_breed
+
+        def simulated_add(name, dry_run=False, progress=None):
+            time.sleep(add_seconds)
+            return {"ok": False, "error": f"simulated add of {name!r}"}
+        add_breed.add_breed_entry = simulated_add
+
+    os.chdir(ROOT)
+    port  = _free_port()
+    httpd = server.make_server("127.0.0.1", port, workers)
+    server.Handler.log_message = lambda *a: None
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{port}"
+
+    add_done  = threading.Event()
+    add_state = {}
+
+    def do_add():
+        t0  = time.perf_counter()
+        req = urllib.request.Request(f"{base}/api/add-breed", method="POST",
+                                     data=json.dumps({"name": real or "Simulated Breed"}).encode(),
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=600) as r:
+                add_state["status"] = r.status
+                job = json.loads(r.read())["job"]
+            add_state["post_ms"] = (time.perf_counter() - t0) * 1e3
+            while job["status"] in ("queued", "running"):
+                time.sleep(0.1)
+                with urllib.request.urlopen(f"{base}/api/jobs/{job['id']}", timeout=60) as r:
+                    job = json.loads(r.read())
+            add_state["job"] = job["status"]
+        except urllib.error.HTTPError as e:
+            add_state["status"] = e.code
+        add_state["seconds"] = time.perf_counter() - t0
+        add_done.set()
+
+    paths     = _read_paths()
+    latencies = []
+    lat_lock  = threading.Lock()
+
+    def reader(i):
+        n = i
+        while not add_done.is_set():
+            path = paths[n % len(paths)]
+            n   += 1
+            started_during_add = not add_done.is_set()
+            t0   = time.perf_counter()
+            try:
+                with urllib.request.urlopen(base + path, timeout=600) as r:
+                    r.read()
+            except OSError:
+                continue
+            dt = time.perf_counter() - t0
+            if started_during_add:             # only count reads issued while the add ran
+                with lat_lock:
+                    latencies.append(dt)
+
+    adder = threading.Thread(target=do_add)
+    adder.start()
+    time.sleep(0.2)                            # let the add get into its handler first
+    readers = [threading.Thread(target=reader, args=(i,)) for i in range(clients)]
+    for t in readers:
+        t.start()
+    adder.join()
+    for t in readers:
+        t.join()
+    httpd.shutdown()
+    httpd.server_close()
+
+    latencies.sort()
+    return {
+        "mode":        "single-threaded" if workers <= 0 else f"{workers} workers",
+        "add_status":  add_state.get("status"),
+        "add_post_ms": round(add_state.get("post_ms", float("nan")), 2),
+        "add_job":     add_state.get("job"),
+        "add_seconds": round(add_state.get("seconds", 0), 2),
+        "reads":       len(latencies),
+        "p50_ms":      round(_percentile(latencies, 50) * 1e3, 2),
+        "p99_ms":      round(_percentile(latencies, 99) * 1e3, 2),
+        "max_ms":      round((latencies[-1] if latencies else float("nan")) * 1e3, 2),
+    }
+
+
+# ── Page-load waterfall ──────────────────────────────────────────────────────
+
+def _page_stages(port: int) -> list[list[str]]:
+    """The card view's requests, in the order a browser can issue them."""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.request("GET", "/api/breeds")
+    breeds = json.loads(conn.getresponse().read())
+    conn.close()
+    thumbs = [b["thumb_url"] + "&w=320&fmt=webp" if b.get("thumb_url") else f"/images/{b['dogtime_slug']}.jpg"
+              for b in breeds if b.get("dogtime_slug")]
+    return [["/"], ["/large_dog_breeds_app.jsx"], ["/api/breeds", "/breed_ratings.json"], thumbs]
+
+
+def _load_page(port: int, stages: list[list[str]], connections: int, keep_alive: bool) -> tuple[float, int]:
+    """(seconds, TCP connections opened) for one page load."""
+    local  = threading.local()
+    opened = []
+
+    def connect() -> http.client.HTTPConnection:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        opened.append(conn)
+        return conn
+
+    def fetch(path: str) -> None:
+        headers = {"Accept-Encoding": "gzip", **({} if keep_alive else {"Connection": "close"})}
+        conn    = getattr(local, "conn", None) or connect()
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()                    # server closed it while idle; retry once, as browsers do
+            conn = connect()
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        resp.read()
+        if resp.will_close:
+            conn.close()
+            conn = None
+        local.conn = conn
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=connections) as ex:
+        for stage in stages:
+            list(ex.map(fetch, stage))
+    elapsed = time.perf_counter() - t0
+    for conn in opened:
+        conn.close()
+    return elapsed, len(opened)
+
+
+def waterfall(workers: int, connections: int, rounds: int) -> dict:
+    os.chdir(ROOT)
+    port  = _free_port()
+    httpd = server.make_server("127.0.0.1", port, workers)
+    server.Handler.log_message = lambda *a: None
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    stages = _page_stages(port)
+    _load_page(port, stages, connections, keep_alive=True)          # render thumbnails, fill caches
+    res = {"requests": sum(map(len, stages)), "connections": connections}
+    for mode, keep_alive in (("keep-alive", True), ("close", False)):
+        runs = [_load_page(port, stages, connections, keep_alive) for _ in range(rounds)]
+        res[mode] = {"median_ms": round(statistics.median(t for t, _ in runs) * 1e3, 1),
+                     "min_ms":    round(min(t for t, _ in runs) * 1e3, 1),
+                     "opened":    runs[-1][1]}
+    httpd.shutdown()
+    httpd.server_close()
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Read latency under an in-flight add-breed request")
+    ap.add_argument("--workers",     type=int,   default=server.DEFAULT_WORKERS,
+                    help="Server handler threads (0 = single-threaded HTTPServer)")
+    ap.add_argument("--clients",     type=int,   default=4, help="Concurrent reader threads")
+    ap.add_argument("--add-seconds", type=float, default=5.0, help="Duration of the simulated add")
+    ap.add_argument("--real",        metavar="NAME", help="Do a real add of NAME instead of simulating")
+    ap.add_argument("--waterfall",   action="store_true", help="Time a full card-view page load instead")
+    ap.add_argument("--connections", type=int,   default=6, help="Parallel connections for --waterfall (a browser's 6)")
+    ap.add_argument("--rounds",      type=int,   default=10, help="Page loads per mode for --waterfall")
+    args = ap.parse_args()
+
+    if args.waterfall:
+        res = waterfall(args.workers, args.connections, args.rounds)
+        print(f"Page load: {res['requests']} requests over {res['connections']} connections")
+        for mode in ("keep-alive", "close"):
+            r = res[mode]
+            print(f"  {mode:10s}  median {r['median_ms']:7.1f} ms   min {r['min_ms']:7.1f} ms   "
+                  f"{r['opened']} TCP connections")
+        return
+
+    res = run(args.workers, args.clients, args.add_seconds, args.real)
+    print(f"{res['mode']}: add → HTTP {res['add_status']} in {res['add_post_ms']} ms, "
+          f"job {res['add_job']} after {res['add_seconds']} s")
+    print(f"  {res['reads']} reads during the add   "
+          f"p50 {res['p50_ms']} ms   p99 {res['p99_ms']} ms   max {res['max_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+breed_archive.py — append-only packed archive of scraped breed content.
+
+`scrape_breed.py --save` produces one pretty-printed JSON file per slug.  This
+module packs those records into a single file so consumers can pull one
+section without parsing the whole record, and corpus-wide scans become one
+sequential read instead of thousands of small-file opens.
+
+Files:
+    breed_details/content.pack       concatenated records (append-only)
+    breed_details/content.idx.json   {slug: [offset, length]} for live records
+
+Record layout (all integers little-endian):
+    u32  header_len
+    header_len bytes  compact JSON header:
+        {"slug": ..., "meta": {breed, slug, url, scraped_at, intro},
+         "sections": [[title, rel_offset, length], ...]}
+    section blobs     compact JSON, one per section, back to back
+
+Rewriting a slug appends a new record and repoints the index; the old record
+becomes dead space until `compact()` rewrites the pack with live records only.
+
+Usage:
+    python breed_archive.py --pack               # pack breed_details/<slug>.json files
+    python breed_archive.py --compact            # drop dead records
+    python breed_archive.py --get great-dane     # print one record
+    python breed_archive.py --get great-dane --section 'Highlights'
+    python breed_archive.py --stats
+
+As a callable module:
+    from breed_archive import BreedArchive
+    with BreedArchive() as archive:
+        archive.put(record)                      # record as returned by scrape_breed()
+        archive.section("great-dane", "Highlights")
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+DETAILS_DIR = Path(__file__).parent / "breed_details"
+PACK_FILE   = DETAILS_DIR / "content.pack"
+INDEX_FILE  = DETAILS_DIR / "content.idx.json"
+
+HEADER_LEN = struct.Struct("<I")
+META_KEYS  = ("breed", "slug", "url", "scraped_at", "intro")
+
+
+def _dumps(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encode_record(record: dict) -> bytes:
+    """Serialise a scrape_breed() record into the packed layout."""
+    blobs   = [_dumps(s) for s in record.get("sections", [])]
+    spans   = []
+    rel     = 0
+    for sec, blob in zip(record.get("sections", []), blobs):
+        spans.append([sec.get("title", ""), rel, len(blob)])
+        rel += len(blob)
+    header = _dumps({
+        "slug":     record["slug"],
+        "meta":     {k: record[k] for k in META_KEYS if k in record},
+        "sections": spans,
+    })
+    return HEADER_LEN.pack(len(header)) + header + b"".join(blobs)
+
+
+class _Mapping:
+    """
+    One read-only map of the pack.  Readers pin it while they use it; once
+    retired (after an append, compact() or close()) it is closed by whichever
+    of retire / last unpin comes second, so no reader loses its bytes.
+    """
+
+    def __init__(self, pack_file: Path, size: int):
+        self.size    = size
+        self.readers = 0
+        self.retired = False
+        self._fh = open(pack_file, "rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def view(self) -> memoryview:
+        """A view over the map; use it as a context manager so it's released."""
+        return memoryview(self._mm)
+
+    def close(self):
+        self._mm.close()
+        self._fh.close()
+
+
+class BreedArchive:
+    """
+    Reader/writer for the packed content archive.
+
+    Reads go through a read-only mmap of the pack, so `section()` touches only
+    the bytes of the requested section.  Writes append to the pack and persist
+    the index; the mmap is remapped lazily on the next read.
+    """
+
+    def __init__(self, pack_file: Path = PACK_FILE, index_file: Path = INDEX_FILE):
+        self.pack_file  = Path(pack_file)
+        self.index_file = Path(index_file)
+        self.index: dict[str, list[int]] = {}
+        self._recover()
+        if self.index_file.exists():
+            self.index = json.loads(self.index_file.read_text())
+        self._lock = threading.RLock()
+        self._map: _Mapping | None = None
+
+    # ── Context / lifecycle ──────────────────────────────────────────────────
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Drop the map; one still pinned by an unfinished iter_records() closes when it finishes."""
+        with self._lock:
+            mapping, self._map = self._map, None
+            if mapping is not None:
+                mapping.retired = True
+                if not mapping.readers:
+                    mapping.close()
+
+    def __contains__(self, slug: str) -> bool:
+        return slug in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def slugs(self) -> list[str]:
+        return sorted(self.index)
+
+    # ── Low-level access ─────────────────────────────────────────────────────
+
+    def _pin(self) -> _Mapping | None:
+        """The current map (remapped after appends), pinned; None for an empty pack.  Holds _lock."""
+        size = self.pack_file.stat().st_size if self.pack_file.exists() else 0
+        if size == 0:
+            return None
+        if self._map is None or size != self._map.size:
+            self.close()
+            self._map = _Mapping(self.pack_file, size)
+        self._map.readers += 1
+        return self._map
+
+    def _unpin(self, mapping: _Mapping | None):
+        with self._lock:
+            if mapping is not None:
+                mapping.readers -= 1
+                if mapping.retired and not mapping.readers:
+                    mapping.close()
+
+    @contextmanager
+    def _view(self):
+        """A memoryview over the whole pack, released (and the map unpinned) on exit."""
+        with self._lock:
+            mapping = self._pin()
+        try:
+            with (mapping.view() if mapping is not None else memoryview(b"")) as view:
+                yield view
+        finally:
+            self._unpin(mapping)
+
+    def _header(self, view: memoryview, offset: int) -> tuple[dict, int]:
+        """Parse the record header at offset; returns (header, body_offset)."""
+        (hlen,) = HEADER_LEN.unpack_from(view, offset)
+        start   = offset + HEADER_LEN.size
+        header  = json.loads(bytes(view[start:start + hlen]))
+        return header, start + hlen
+
+    def _decode(self, view: memoryview, offset: int) -> dict:
+        header, body = self._header(view, offset)
+        record = dict(header["meta"])
+        sections = []
+        for _title, rel, length in header["sections"]:
+            sections.append(json.loads(bytes(view[body + rel:body + rel + length])))
+        if sections:
+            record["sections"] = sections
+        return record
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def raw(self, slug: str) -> bytes | None:
+        """Packed bytes of a slug's record (for copying between archives)."""
+        with self._lock:
+            entry = self.index.get(slug)
+            if entry is None:
+                return None
+            offset, length = entry
+            with self._view() as view:
+                return bytes(view[offset:offset + length])
+
+    def get(self, slug: str) -> dict | None:
+        """Full record in the same shape scrape_breed() returns, or None."""
+        with self._lock:
+            entry = self.index.get(slug)
+            if entry is None:
+                return None
+            with self._view() as view:
+                return self._decode(view, entry[0])
+
+    def meta(self, slug: str) -> dict | None:
+        """Record metadata (breed, url, scraped_at, intro) without any section."""
+        with self._lock:
+            entry = self.index.get(slug)
+            if entry is None:
+                return None
+            with self._view() as view:
+                header, _ = self._header(view, entry[0])
+            return header["meta"]
+
+    def section_titles(self, slug: str) -> list[str]:
+        with self._lock:
+            entry = self.index.get(slug)
+            if entry is None:
+                return []
+            with self._view() as view:
+                header, _ = self._header(view, entry[0])
+            return [t for t, _, _ in header["sections"]]
+
+    def section(self, slug: str, title: str) -> dict | None:
+        """Decode a single section by title (case-insensitive), or None."""
+        with self._lock:
+            entry = self.index.get(slug)
+            if entry is None:
+                return None
+            want = title.lower()
+            with self._view() as view:
+                header, body = self._header(view, entry[0])
+                for t, rel, length in header["sections"]:
+                    if t.lower() == want:
+                        return json.loads(bytes(view[body + rel:body + rel + length]))
+            return None
+
+    def iter_records(self):
+        """
+        Yield (slug, record) for every live record in file order.
+
+        Live offsets are visited in ascending order so a corpus scan is one
+        forward pass over the mapping.  The scan pins the map it started on
+        and holds neither the lock nor a view between records, so the archive
+        can be written, compacted or closed meanwhile; the scan still sees
+        the records as they were when it started.
+        """
+        with self._lock:
+            mapping = self._pin()
+            order   = sorted(self.index.items(), key=lambda kv: kv[1][0])
+        try:
+            for slug, (offset, _length) in order if mapping is not None else ():
+                with mapping.view() as view:
+                    record = self._decode(view, offset)
+                yield slug, record
+        finally:
+            self._unpin(mapping)
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _write_index(path: Path, index: dict):
+        with open(path, "w") as f:
+            f.write(json.dumps(index, separators=(",", ":"), sort_keys=True))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _save_index(self):
+        tmp = self.index_file.with_suffix(".tmp")
+        self._write_index(tmp, self.index)
+        os.replace(tmp, self.index_file)
+
+    def _recover(self):
+        """
+        Finish a compact() that crashed between its two renames.  A pending
+        index without a pending pack means the new pack is already in place,
+        so its index goes in too.  With both still pending, the old pair is
+        intact and the half-done compaction is dropped.
+        """
+        pending = self.index_file.with_suffix(".compact")
+        if not pending.exists():
+            return
+        if self.pack_file.with_suffix(".tmp").exists():
+            self.pack_file.with_suffix(".tmp").unlink()
+            pending.unlink()
+        else:
+            os.replace(pending, self.index_file)
+
+    def _append(self, blobs: list[tuple[str, bytes]]):
+        self.pack_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.pack_file, "ab") as f:
+            offset = f.tell()
+            for slug, blob in blobs:
+                f.write(blob)
+                self.index[slug] = [offset, len(blob)]
+                offset += len(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        self._save_index()
+
+    def put(self, record: dict) -> None:
+        """Append (or supersede) the record for record['slug']."""
+        with self._lock:
+            self._append([(record["slug"], encode_record(record))])
+
+    def put_many(self, records: list[dict]) -> None:
+        """Append several records with a single index write."""
+        with self._lock:
+            self._append([(r["slug"], encode_record(r)) for r in records])
+
+    def delete(self, slug: str) -> bool:
+        """Drop slug from the index; its bytes stay dead until compact()."""
+        with self._lock:
+            if self.index.pop(slug, None) is None:
+                return False
+            self._save_index()
+            return True
+
+    def dead_bytes(self) -> int:
+        size = self.pack_file.stat().st_size if self.pack_file.exists() else 0
+        return size - sum(length for _, length in self.index.values())
+
+    def compact(self) -> int:
+        """
+        Rewrite the pack with live records only.  Returns bytes reclaimed.
+
+        The new pack and its index are both written and fsynced before
+        either is renamed into place, and the index is renamed right after
+        the pack.  If a crash lands between the two renames, _recover()
+        installs the pending index on the next open.
+        """
+        with self._lock:
+            if not self.pack_file.exists():
+                return 0
+            before = self.pack_file.stat().st_size
+            tmp    = self.pack_file.with_suffix(".tmp")
+            new_index = {}
+            with open(tmp, "wb") as f, self._view() as view:
+                for slug, (offset, length) in sorted(self.index.items(), key=lambda kv: kv[1][0]):
+                    new_index[slug] = [f.tell(), length]
+                    f.write(view[offset:offset + length])
+                f.flush()
+                os.fsync(f.fileno())
+            pending = self.index_file.with_suffix(".compact")
+            self._write_index(pending, new_index)
+            self.close()
+            os.replace(tmp, self.pack_file)
+            os.replace(pending, self.index_file)
+            self.index = new_index
+            return before - self.pack_file.stat().st_size
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def pack_details(archive: BreedArchive, details_dir: Path = DETAILS_DIR) -> int:
+    """Pack every breed_details/<slug>.json content file into the archive."""
+    records = []
+    for path in sorted(details_dir.glob("*.json")):
+        if path.name.endswith("_ratings.json") or path == archive.index_file:
+            continue
+        data = json.loads(path.read_text())
+        if isinstance(data, dict) and data.get("slug"):
+            records.append(data)
+    if records:
+        archive.put_many(records)
+    return len(records)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Packed archive of scraped breed content")
+    ap.add_argument("--pack",    action="store_true", help="Pack breed_details/<slug>.json files")
+    ap.add_argument("--compact", action="store_true", help="Rewrite the pack without dead records")
+    ap.add_argument("--get",     metavar="SLUG",      help="Print one record")
+    ap.add_argument("--section", metavar="TITLE",     help="With --get: print a single section")
+    ap.add_argument("--stats",   action="store_true", help="Print archive size and dead space")
+    args = ap.parse_args()
+
+    with BreedArchive() as archive:
+        if args.pack:
+            n = pack_details(archive)
+            print(f"Packed {n} record(s) → {archive.pack_file}")
+        if args.compact:
+            reclaimed = archive.compact()
+            print(f"Compacted: reclaimed {reclaimed} bytes")
+        if args.get:
+            data = archive.section(args.get, args.section) if args.section else archive.get(args.get)
+            if data is None:
+                print(f"Not found: {args.get}" + (f" / {args.section}" if args.section else ""))
+                return
+            print(json.dumps(data, indent=2, ensure_ascii=False))
+        if args.stats or not (args.pack or args.compact or args.get):
+            size = archive.pack_file.stat().st_size if archive.pack_file.exists() else 0
+            print(f"Records: {len(archive)}  |  Pack: {size} bytes  |  Dead: {archive.dead_bytes()} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+breed_query.py — server-side filtering, sorting, projection and paging of
+the breed catalog.
+
+Column indexes over large_dog_breeds.json + breed_ratings.json are built
+once per data change:
+
+  numeric      weight / height / lifespan min and max, service_dog_score and
+               each of the 31 DogTime traits.  Each column keeps its values
+               in sorted order, so a range filter is two searchsorted()
+               calls.
+  categorical  origin, coat, exercise, grooming, shedding, trainability,
+               purpose, temperament, kids, dogs, slug.  Each maps a
+               (case-folded) value to a row bitmask.
+
+A query ANDs the masks, lexsorts the rows that match on the sort keys and
+cuts one page.  The slug is always the final tie-break, so the order is
+total.  That lets the cursor be a keyset position (the last row's sort key),
+which stays valid when breeds are added or removed between pages.
+
+Query parameters (GET /api/breeds?…):
+  weight=40-80  height=24-  lifespan=-12   overlaps the breed's range, like the app's sliders
+  service_score=4-5                        service_dog_score within the range
+  rating=Easy To Train:4                   trait ≥ 4; "Prey Drive:1-2" for a range; repeatable
+  origin=Germany&origin=France             any of the values; likewise coat, exercise, grooming,
+                                           shedding, trainability, purpose, temperament, slug
+  kids=yes  dogs=no
+  q=guard                                  substring of name / origin / temperament / purpose
+  sort=-service_dog_score,name             keys, "-" for descending; "rating:Easy To Train"
+                                           sorts by a trait; missing values sort last
+  fields=name,origin,ratings               projection ("ratings" adds the breed's star ratings)
+  limit=20  cursor=…                       page size (default 50, max 500) and the next_cursor
+                                           of the previous page
+
+Returns {"ok": true, "total": matches, "count": rows in this page,
+         "breeds": [...], "next_cursor": str | null}.
+Unknown parameters, fields, traits or sort keys, inverted ranges and kids /
+dogs values other than yes / no raise QueryError.
+
+Usage:
+    python breed_query.py 'weight=100-&sort=-service_dog_score&fields=name,service_dog_score&limit=5'
+    python breed_query.py --bench 50000      # index + query timing on a synthetic catalog
+
+As a callable module:
+    from breed_query import get_index
+    get_index().query({"origin": ["Germany"], "sort": ["-weight_max"], "limit": ["10"]})
+"""
+
+import argparse
+import base64
+import json
+import threading
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from models import MISSING, TRAIT_NAMES, Ratings
+
+ROOT         = Path(__file__).parent
+BREEDS_FILE  = ROOT / "large_dog_breeds.json"
+RATINGS_FILE = ROOT / "breed_ratings.json"
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT     = 500
+
+LEVEL_ORDER = ["Low", "Moderate", "High"]                  # same orders as the app
+TRAIN_ORDER = ["Very Easy", "Easy", "Moderate", "Hard"]
+
+RANGE_PARAMS = {"weight": "weight_lbs", "height": "height_in", "lifespan": "lifespan_yrs"}
+CATEGORICAL  = {
+    "origin":       "origin",
+    "coat":         "coat",
+    "exercise":     "exercise",
+    "grooming":     "grooming",
+    "shedding":     "shedding",
+    "trainability": "trainability",
+    "purpose":      "purpose",
+    "temperament":  "temperament",
+    "kids":         "good_with_kids",
+    "dogs":         "good_with_dogs",
+    "slug":         "dogtime_slug",
+}
+YES_NO    = ("kids", "dogs")                             # categorical params that only take yes / no
+ORDINAL   = {"exercise": LEVEL_ORDER, "grooming": LEVEL_ORDER, "shedding": LEVEL_ORDER,
+             "trainability": TRAIN_ORDER}
+TEXT_SORT = ("name", "origin", "coat")
+PARAMS    = {*RANGE_PARAMS, *CATEGORICAL, "service_score", "rating", "q",
+             "sort", "fields", "limit", "cursor"}
+
+
+class QueryError(ValueError):
+    """A malformed or unknown query parameter (→ 400)."""
+
+
+# ── Parsing helpers ──────────────────────────────────────────────────────────
+
+def _number(text: str, param: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        raise QueryError(f"{param}: expected a number, got {text!r}") from None
+
+
+def parse_span(text: str, param: str, open_ended: bool = False) -> tuple[float | None, float | None]:
+    """
+    "40-80" → (40, 80), "40-" → (40, None), "-80" → (None, 80).  A bare
+    number N means exactly N, or ≥ N when open_ended.  An inverted range
+    ("80-40") is a QueryError.
+    """
+    text = text.strip()
+    if "-" not in text:
+        n = _number(text, param)
+        return (n, None) if open_ended else (n, n)
+    lo, _, hi = text.partition("-")
+    lo = _number(lo, param) if lo.strip() else None
+    hi = _number(hi, param) if hi.strip() else None
+    if lo is not None and hi is not None and lo > hi:
+        raise QueryError(f"{param}: range {text!r} has its low end above its high end")
+    return lo, hi
+
+
+def _range_end(value: dict | None, end: str) -> float:
+    return float(value[end]) if value and value.get(end) is not None else np.nan
+
+
+def _encode_cursor(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, specs: list[tuple[str, bool]]) -> dict:
+    """
+    The {"sort", "key"} a next_cursor encodes.  key must hold one value per
+    sort spec (a string for text columns, a number or null otherwise) plus
+    the slug; anything else is a QueryError.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise QueryError("Invalid cursor") from None
+    key = data.get("key") if isinstance(data, dict) else None
+    if not (isinstance(data, dict) and isinstance(data.get("sort"), str)
+            and isinstance(key, list) and len(key) == len(specs) + 1 and isinstance(key[-1], str)):
+        raise QueryError("Invalid cursor")
+    for (name, _), v in zip(specs, key):
+        ok = isinstance(v, str) if name in TEXT_SORT else \
+            v is None or (isinstance(v, (int, float)) and not isinstance(v, bool))
+        if not ok:
+            raise QueryError("Invalid cursor")
+    return data
+
+
+# ── Index ────────────────────────────────────────────────────────────────────
+
+class BreedIndex:
+    """Column indexes over one snapshot of the breeds + ratings files."""
+
+    def __init__(self, breeds: list[dict], ratings: dict[str, dict]):
+        self.breeds  = breeds
+        self.ratings = ratings                                   # slug → raw {trait: stars}
+        self.slugs   = [b.get("dogtime_slug") or b["name"] for b in breeds]
+        self.n       = len(breeds)
+        self.fields  = {k for b in breeds for k in b} | {"ratings"}
+
+        # Numeric columns, NaN where missing
+        self.numeric: dict[str, np.ndarray] = {}
+        for param, field in RANGE_PARAMS.items():
+            for end in ("min", "max"):
+                self.numeric[f"{param}_{end}"] = np.array(
+                    [_range_end(b.get(field), end) for b in breeds], dtype=float).reshape(self.n)
+        self.numeric["service_dog_score"] = np.array(
+            [np.nan if b.get("service_dog_score") is None else b["service_dog_score"] for b in breeds],
+            dtype=float).reshape(self.n)
+        stars = np.array([Ratings.from_flat(ratings.get(s, {})).values for s in self.slugs],
+                         dtype=float).reshape(self.n, len(TRAIT_NAMES))
+        stars[stars == MISSING] = np.nan
+        self._trait = {t.casefold(): t for t in TRAIT_NAMES}
+        for i, t in enumerate(TRAIT_NAMES):
+            self.numeric[f"rating:{t}"] = stars[:, i]
+        # argsort puts NaN last, so each column's sorted view is
+        # [values ascending…, NaN…]
+        self._order  = {k: np.argsort(v, kind="stable") for k, v in self.numeric.items()}
+        self._sorted = {k: v[self._order[k]] for k, v in self.numeric.items()}
+
+        # Categorical bitmasks, keyed by case-folded value
+        self.categorical: dict[str, dict[str, np.ndarray]] = {}
+        for param, field in CATEGORICAL.items():
+            masks = defaultdict(lambda: np.zeros(self.n, dtype=bool))
+            for i, b in enumerate(breeds):
+                value  = b.get(field)
+                values = value if isinstance(value, list) else [value]
+                for v in values:
+                    if isinstance(v, bool):
+                        v = "yes" if v else "no"
+                    if v is not None:
+                        masks[str(v).casefold()][i] = True
+            self.categorical[param] = dict(masks)
+
+        # Sort ranks for text and ordinal columns (NaN = unknown, sorts last)
+        self.rank: dict[str, np.ndarray] = {}
+        for key in TEXT_SORT:
+            _, inverse = np.unique([str(b.get(key) or "").casefold() for b in breeds], return_inverse=True)
+            self.rank[key] = inverse.astype(float).reshape(self.n)
+        for key, order in ORDINAL.items():
+            pos = {v: i for i, v in enumerate(order)}
+            self.rank[key] = np.array([pos.get(b.get(key), np.nan) for b in breeds], dtype=float).reshape(self.n)
+        _, inverse = np.unique(self.slugs, return_inverse=True)
+        self._slug_rank = inverse.reshape(self.n)
+
+        self._search = [" ".join([b.get("name", ""), b.get("origin", ""),
+                                  *b.get("temperament", []), *b.get("purpose", [])]).casefold()
+                        for b in breeds]
+
+    @classmethod
+    def from_files(cls, breeds_file: Path = BREEDS_FILE, ratings_file: Path = RATINGS_FILE) -> "BreedIndex":
+        return cls(json.loads(Path(breeds_file).read_text()), json.loads(Path(ratings_file).read_text()))
+
+    # ── Filters ──────────────────────────────────────────────────────────────
+
+    def between(self, column: str, lo: float | None, hi: float | None) -> np.ndarray:
+        """Bitmask of rows with lo ≤ column ≤ hi (either end open); NaN never matches."""
+        sv, order = self._sorted[column], self._order[column]
+        a = 0 if lo is None else np.searchsorted(sv, lo, side="left")
+        b = np.searchsorted(sv, np.inf, side="right") if hi is None else np.searchsorted(sv, hi, side="right")
+        mask = np.zeros(self.n, dtype=bool)
+        mask[order[a:b]] = True
+        return mask
+
+    def _trait_column(self, name: str) -> str:
+        trait = self._trait.get(name.strip().casefold())
+        if trait is None:
+            raise QueryError(f"Unknown trait {name.strip()!r}")
+        return f"rating:{trait}"
+
+    def mask(self, params: dict[str, list[str]]) -> np.ndarray:
+        keep = np.ones(self.n, dtype=bool)
+        for param, field in RANGE_PARAMS.items():
+            for text in params.get(param, []):
+                lo, hi = parse_span(text, param)
+                if lo is not None:
+                    keep &= self.between(f"{param}_max", lo, None)
+                if hi is not None:
+                    keep &= self.between(f"{param}_min", None, hi)
+        for text in params.get("service_score", []):
+            keep &= self.between("service_dog_score", *parse_span(text, "service_score"))
+        for text in params.get("rating", []):
+            trait, sep, span = text.rpartition(":")
+            if not sep:
+                raise QueryError(f"rating: expected 'Trait:N' or 'Trait:lo-hi', got {text!r}")
+            keep &= self.between(self._trait_column(trait), *parse_span(span, "rating", open_ended=True))
+        for param in CATEGORICAL:
+            values = params.get(param)
+            if values:
+                index = self.categorical[param]
+                any_of = np.zeros(self.n, dtype=bool)
+                for v in values:
+                    if param in YES_NO and v.strip().casefold() not in ("yes", "no"):
+                        raise QueryError(f"{param}: expected yes or no, got {v!r}")
+                    hit = index.get(v.strip().casefold())
+                    if hit is not None:
+                        any_of |= hit
+                keep &= any_of
+        for q in params.get("q", []):
+            q = q.strip().casefold()
+            if q:
+                keep &= np.fromiter((q in text for text in self._search), dtype=bool, count=self.n)
+        return keep
+
+    # ── Sorting ──────────────────────────────────────────────────────────────
+
+    def _sort_specs(self, params: dict[str, list[str]]) -> list[tuple[str, bool]]:
+        specs = []
+        for item in ",".join(params.get("sort", [])).split(","):
+            item = item.strip()
+            if not item:
+                continue
+            desc, key = item.startswith("-"), item.lstrip("-").strip()
+            if key.startswith("rating:"):
+                key = self._trait_column(key.removeprefix("rating:"))
+            elif key not in self.numeric and key not in self.rank:
+                raise QueryError(f"Unknown sort key {key!r}")
+            specs.append((key, desc))
+        return specs or [("name", False)]
+
+    def _column(self, key: str) -> np.ndarray:
+        return self.numeric[key] if key in self.numeric else self.rank[key]
+
+    def order(self, rows: np.ndarray, specs: list[tuple[str, bool]]) -> np.ndarray:
+        """rows sorted by specs (missing values last), then by slug."""
+        keys = []
+        for key, desc in specs:
+            col     = self._column(key)[rows]
+            missing = np.isnan(col)
+            value   = np.where(missing, 0.0, -col if desc else col)
+            keys   += [missing, value]
+        keys.append(self._slug_rank[rows])
+        return rows[np.lexsort(keys[::-1])]
+
+    def sort_key(self, row: int, specs: list[tuple[str, bool]]) -> list:
+        """JSON-safe sort key of one row, for the cursor (text by value, not rank)."""
+        key = []
+        for name, _ in specs:
+            if name in TEXT_SORT:
+                key.append(str(self.breeds[row].get(name) or "").casefold())
+            else:
+                v = self._column(name)[row]
+                key.append(None if np.isnan(v) else float(v))
+        return key + [self.slugs[row]]
+
+    @staticmethod
+    def _after(key: list, cursor: list, specs: list[tuple[str, bool]]) -> bool:
+        """True if key sorts strictly after cursor (missing values last)."""
+        for a, b, desc in zip(key, cursor, [d for _, d in specs] + [False]):
+            if a == b:
+                continue
+            if a is None or b is None:
+                return a is None
+            return (a > b) != desc
+        return False
+
+    # ── Query ────────────────────────────────────────────────────────────────
+
+    def query(self, params: dict[str, list[str]]) -> dict:
+        unknown = set(params) - PARAMS
+        if unknown:
+            raise QueryError(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+
+        fields = [f.strip() for v in params.get("fields", []) for f in v.split(",") if f.strip()]
+        bad    = [f for f in fields if f not in self.fields]
+        if bad:
+            raise QueryError(f"Unknown field(s): {', '.join(bad)}")
+        try:
+            limit = int(params.get("limit", [DEFAULT_LIMIT])[-1])
+        except ValueError:
+            raise QueryError("limit must be an integer") from None
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        specs = self._sort_specs(params)
+        rows  = self.order(np.flatnonzero(self.mask(params)), specs)
+
+        start = 0
+        if params.get("cursor"):
+            cursor = _decode_cursor(params["cursor"][-1], specs)
+            if cursor.get("sort") != specs_id(specs):
+                raise QueryError("cursor belongs to a different sort order")
+            pos = {self.slugs[r]: i for i, r in enumerate(rows)}.get(cursor["key"][-1])
+            if pos is not None and self.sort_key(rows[pos], specs) == cursor["key"]:
+                start = pos + 1
+            else:                          # that row changed or is gone: seek by key
+                start = next((i for i, r in enumerate(rows)
+                              if self._after(self.sort_key(r, specs), cursor["key"], specs)), len(rows))
+
+        page = rows[start:start + limit]
+        more = start + limit < len(rows)
+        return {
+            "ok":          True,
+            "total":       int(len(rows)),
+            "count":       int(len(page)),
+            "breeds":      [self.project(int(r), fields) for r in page],
+            "next_cursor": _encode_cursor({"sort": specs_id(specs), "key": self.sort_key(int(page[-1]), specs)})
+                           if more else None,
+        }
+
+    def project(self, row: int, fields: list[str]) -> dict:
+        breed = self.breeds[row]
+        if not fields:
+            return breed
+        out = {}
+        for f in fields:
+            out[f] = self.ratings.get(self.slugs[row]) if f == "ratings" else breed.get(f)
+        return out
+
+
+def specs_id(specs: list[tuple[str, bool]]) -> str:
+    return ",".join(("-" if desc else "") + key for key, desc in specs)
+
+
+# ── Shared index ─────────────────────────────────────────────────────────────
+# Rebuilt only when the breeds or ratings file changes on disk.
+
+_cache_lock = threading.Lock()
+_cache: dict = {"key": None, "index": None}
+
+
+def get_index(breeds_file: Path = BREEDS_FILE, ratings_file: Path = RATINGS_FILE) -> BreedIndex:
+    key = tuple((p.stat().st_ino, p.stat().st_mtime_ns, p.stat().st_size)
+                for p in (Path(breeds_file), Path(ratings_file)))
+    with _cache_lock:
+        if _cache["key"] != key:
+            _cache["index"] = BreedIndex.from_files(breeds_file, ratings_file)
+            _cache["key"]   = key
+        return _cache["index"]
+
+
+def query_string(qs: str) -> dict:
+    """GET /api/breeds?<qs> → response dict (QueryError for bad input)."""
+    return get_index().query(parse_qs(qs, keep_blank_values=True))
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def _bench(n: int) -> None:
+    import time
+    base    = json.loads(BREEDS_FILE.read_text())
+    ratings = json.loads(RATINGS_FILE.read_text())
+    rng     = np.random.default_rng(0)
+    breeds, synth_ratings = [], {}
+    for i in range(n):
+        b = dict(base[i % len(base)])
+        slug = f"{b['dogtime_slug']}-{i}"
+        scale = rng.uniform(0.7, 1.3)
+        b.update(name=f"{b['name']} {i}", dogtime_slug=slug,
+                 weight_lbs={"min": round(b["weight_lbs"]["min"] * scale), "max": round(b["weight_lbs"]["max"] * scale)})
+        breeds.append(b)
+        synth_ratings[slug] = ratings.get(base[i % len(base)]["dogtime_slug"], {})
+
+    t0 = time.perf_counter()
+    index = BreedIndex(breeds, synth_ratings)
+    print(f"Index over {n:,} breeds built in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    queries = [
+        "weight=80-120&limit=20",
+        "rating=Easy To Train:4&rating=Prey Drive:-2&sort=-service_dog_score,name&limit=20",
+        "origin=Germany&purpose=Guardian&fields=name,weight_lbs&sort=-weight_max&limit=50",
+        "kids=yes&sort=rating:Intelligence&limit=100",
+    ]
+    for qs in queries:
+        params = parse_qs(qs)
+        index.query(params)
+        reps = 20
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            res = index.query(params)
+        dt = (time.perf_counter() - t0) / reps
+        print(f"  {dt * 1000:7.2f} ms  {res['total']:>7,} match  {qs}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Query the breed catalog like GET /api/breeds?…")
+    ap.add_argument("query", nargs="?", default="", help="URL query string, e.g. 'origin=Germany&sort=name'")
+    ap.add_argument("--bench", type=int, metavar="N", help="Time index build + queries on N synthetic breeds")
+    args = ap.parse_args()
+
+    if args.bench:
+        _bench(args.bench)
+        return
+    try:
+        print(json.dumps(query_string(args.query), indent=2, ensure_ascii=False))
+    except QueryError as exc:
+        raise SystemExit(f"[error] {exc}")
+
+
+if __name__ == "__main__":
+    main()
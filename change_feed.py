@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+change_feed.py — versioned per-breed change stream for server.py.
+
+Holds a snapshot of every breed (its large_dog_breeds.json entry plus its
+breed_ratings.json ratings).  sync() diffs the files against the snapshot
+and appends one event per breed that changed:
+
+  {"version": 1760000000123, "op": "upsert", "slug": "samoyed", "breed": {...}, "ratings": {...}}
+  {"version": 1760000000124, "op": "delete", "slug": "samoyed"}
+
+Versions increase by one per event.  They start at the millisecond clock
+when the feed is created, so they keep increasing across server restarts.
+A client that remembers a version gets exactly the changes after it, either
+from GET /api/breeds?since=<version> or as Server-Sent Events from GET
+/api/events.  If its version is older than the retained history, or from the
+future (it saw another server), since() returns None and the client reloads
+everything.
+
+server.py syncs after every add / remove / refresh job, before marking the
+job done, so a client that sees "done" and asks for changes gets them.
+Requests to the feed also sync, at the cost of two stat() calls when nothing
+changed, which picks up edits made with the CLIs.
+
+As a callable module:
+    from change_feed import ChangeFeed
+    feed    = ChangeFeed()
+    version = feed.sync()
+    changes = feed.since(version - 5)      # latest event per changed breed
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+ROOT         = Path(__file__).parent
+BREEDS_FILE  = ROOT / "large_dog_breeds.json"
+RATINGS_FILE = ROOT / "breed_ratings.json"
+
+CHANGE_HISTORY = 2000         # events retained for since() / Last-Event-ID
+
+
+def _slug(breed: dict) -> str:
+    return breed.get("dogtime_slug") or breed["name"]
+
+
+def _key(path: Path) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class ChangeFeed:
+
+    def __init__(self, breeds_file: Path = BREEDS_FILE, ratings_file: Path = RATINGS_FILE,
+                 history: int = CHANGE_HISTORY):
+        self.breeds_file  = Path(breeds_file)
+        self.ratings_file = Path(ratings_file)
+        self.version  = int(time.time() * 1000)
+        self.floor    = self.version            # since() needs a version ≥ floor
+        self.closed   = False
+        self._events: deque[dict] = deque(maxlen=history)
+        self._snapshot: dict[str, tuple[dict, dict | None]] = {}
+        self._keys    = None
+        self._lock    = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self.sync()
+
+    # ── Producing ────────────────────────────────────────────────────────────
+
+    def _load(self) -> dict[str, tuple[dict, dict | None]]:
+        breeds  = json.loads(self.breeds_file.read_text())
+        try:
+            ratings = json.loads(self.ratings_file.read_text())
+        except (OSError, ValueError):
+            ratings = {}
+        return {_slug(b): (b, ratings.get(_slug(b))) for b in breeds}
+
+    def sync(self) -> int:
+        """Diff the data files against the snapshot, record changes, return the version."""
+        keys = (_key(self.breeds_file), _key(self.ratings_file))
+        with self._lock:
+            if keys == self._keys:
+                return self.version
+            try:
+                current = self._load()
+            except (OSError, ValueError):            # mid-edit by hand; next sync retries
+                return self.version
+            first, self._keys = self._keys is None, keys
+            events = []
+            if not first:
+                for slug, (breed, ratings) in current.items():
+                    if self._snapshot.get(slug) != (breed, ratings):
+                        events.append({"op": "upsert", "slug": slug, "breed": breed, "ratings": ratings})
+                events += [{"op": "delete", "slug": slug} for slug in self._snapshot if slug not in current]
+            self._snapshot = current
+            for event in events:
+                self.version += 1
+                if len(self._events) == self._events.maxlen:
+                    self.floor = self._events[0]["version"]
+                self._events.append({"version": self.version, **event})
+            if events:
+                self._changed.notify_all()
+            return self.version
+
+    # ── Consuming ────────────────────────────────────────────────────────────
+
+    def _since(self, version: int) -> list[dict] | None:
+        if version < self.floor or version > self.version:
+            return None
+        latest = {}                                  # one event per breed: its newest
+        for event in reversed(self._events):
+            if event["version"] <= version:
+                break
+            latest.setdefault(event["slug"], event)
+        return sorted(latest.values(), key=lambda e: e["version"])
+
+    def since(self, version: int) -> list[dict] | None:
+        """Latest change per breed after version, oldest first; None if a full reload is needed."""
+        with self._lock:
+            return self._since(version)
+
+    def wait(self, version: int, timeout: float) -> list[dict] | None:
+        """since(version), blocking up to timeout for something to arrive.  [] on timeout."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version or self.closed, timeout)
+            return self._since(version)
+
+    def snapshot(self) -> tuple[int, list[dict], dict]:
+        """(version, breeds, ratings) as of the last sync."""
+        with self._lock:
+            return (self.version, [b for b, _ in self._snapshot.values()],
+                    {slug: r for slug, (_, r) in self._snapshot.items() if r is not None})
+
+    def close(self) -> None:
+        """Wake every waiter; streams check .closed and end."""
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
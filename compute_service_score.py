@@ -1,35 +1,63 @@
 #!/usr/bin/env python3
 """
 compute_service_score.py
-Two independently callable functions:
+Independently callable functions:
 
   run_correlation_analysis()
-      Loads breed_ratings.json, builds the 12-trait × N-breed matrix,
-      computes the full Pearson correlation matrix, determines which
-      predefined groups are data-confirmed (all within-group pairs |r| ≥ threshold),
-      and writes service_score_analysis.json.
+      Loads breed_ratings.json, builds the N-breed × trait matrix,
+      computes the full correlation matrix (Pearson, Spearman or Kendall),
+      determines which predefined groups are data-confirmed (all
+      within-group pairs |r| ≥ threshold), and writes service_score_analysis.json.
 
   update_service_scores()
       Reads service_score_analysis.json for the confirmed formula,
       scores every breed, and writes service_dog_score into
       large_dog_breeds.json.
 
+  update_correlation()
+      Applies added/removed/changed breeds to persisted sufficient statistics
+      (correlation_stats.json) and refreshes the analysis in O(traits²).
+
+  estimate_uncertainty()
+      Bootstraps breeds and perturbs weights on a process pool, and writes
+      group-confirmation rates and per-breed score / rank intervals.
+
 CLI usage:
   python compute_service_score.py               # run both in sequence
   python compute_service_score.py --analysis    # correlation analysis only
   python compute_service_score.py --scores      # update scores only (analysis must exist)
+  python compute_service_score.py --method spearman --all-traits
+                                                # rank correlation over all 31 DogTime traits
+  python compute_service_score.py --analysis --all-traits --discover average
+                                                # cluster traits instead of the predefined groups
+  python compute_service_score.py --check-incremental
+  python compute_service_score.py --uncertainty 10000 --workers 8
+                                                # bootstrap / weight-sensitivity intervals
+  python compute_service_score.py --scores --metrics-json m.json   # + stage timings
 """
 
+import argparse
+import hashlib
 import json
 import math
-import sys
+import os
+import warnings
 from pathlib import Path
 
+import numpy as np
+
+import metrics
+from models import MISSING, Ratings, load_ratings
+from scoring import ScoringEngine
+from trait_registry import REGISTRY
+
 # ── Paths ─────────────────────────────────────────────────────────────────────
 ROOT          = Path(__file__).parent
 RATINGS_FILE  = ROOT / "breed_ratings.json"
 BREEDS_FILE   = ROOT / "large_dog_breeds.json"
 ANALYSIS_FILE = ROOT / "service_score_analysis.json"
+STATS_FILE    = ROOT / "correlation_stats.json"
+SCORE_CACHE_FILE = ROOT / "score_cache.json"
 
 # ── The 12 candidate traits ───────────────────────────────────────────────────
 ALL_TRAITS = [
@@ -46,6 +74,9 @@ ALL_TRAITS = [
     "Potential For Mouthiness",
     "Drooling Potential",
 ]
+# Scoring and correlation work on trait IDs; the names above are only used
+# when reading/writing JSON and printing.
+ALL_TRAIT_IDS = REGISTRY.trait_ids(ALL_TRAITS)
 
 # ── Predefined group candidates ───────────────────────────────────────────────
 # A group is only activated when every within-group trait pair satisfies |r| ≥ CORR_THRESHOLD.
@@ -87,46 +118,147 @@ ALWAYS_STANDALONE = [
 ]
 
 
+# Every trait in criteria_schema.json (category overalls included), for
+# analyses that go beyond the 12 formula traits.
+SCHEMA_TRAITS = REGISTRY.trait_names[:REGISTRY.n_schema_traits]
+
+CORR_METHODS = ("pearson", "spearman", "kendall")
+
+
 # ── Low-level helpers ─────────────────────────────────────────────────────────
-def _pearson(xs, ys):
-    n = len(xs)
-    if n < 2:
-        return float("nan")
-    mx, my = sum(xs) / n, sum(ys) / n
-    num   = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
-    den_x = math.sqrt(sum((x - mx) ** 2 for x in xs))
-    den_y = math.sqrt(sum((y - my) ** 2 for y in ys))
-    if den_x == 0 or den_y == 0:
-        return float("nan")
-    return num / (den_x * den_y)
-
-
-def _correlation_matrix(matrix_rows, traits):
-    """Returns list-of-lists Pearson r matrix."""
-    cols = [[row[j] for row in matrix_rows] for j in range(len(traits))]
-    idx  = {t: i for i, t in enumerate(traits)}
-    result = []
-    for i in range(len(traits)):
-        row = []
-        for j in range(len(traits)):
-            r = _pearson(cols[i], cols[j])
-            row.append(round(r, 3) if not math.isnan(r) else None)
-        result.append(row)
-    return result, idx
+def _write_json(path, data):
+    """json.dump(indent=2) through a temp file + rename, so concurrent readers
+    (server.py) never see a half-written file."""
+    tmp = Path(path).with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def _rating_matrix(ratings, trait_ids):
+    """
+    breeds × traits float matrix from {slug: Ratings}; missing ratings are NaN.
+    Returns (slugs, matrix).
+    """
+    slugs = list(ratings)
+    if not slugs:
+        return slugs, np.empty((0, len(trait_ids)))
+    raw = np.array([ratings[s].values for s in slugs], dtype=np.int8)[:, trait_ids]
+    X   = raw.astype(float)
+    X[raw == MISSING] = np.nan
+    return slugs, X
+
+
+def _breeds_in_analysis(X) -> int:
+    """Breeds with at least two traits rated, i.e. that enter some trait pair."""
+    return int(((~np.isnan(X)).sum(axis=1) >= 2).sum())
+
+
+def _pearson_from_sums(n, sx, sxx, sxy):
+    """
+    Pairwise Pearson r from pair counts and sums (all traits × traits):
+    n[a, b] rows with both present, sx[a, b] Σ a and sxx[a, b] Σ a² over
+    those rows, sxy[a, b] Σ a·b.  Leading axes are batch axes (one matrix
+    per bootstrap replicate).
+    """
+    sxT  = np.swapaxes(sx, -1, -2)
+    sxxT = np.swapaxes(sxx, -1, -2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        num = n * sxy - sx * sxT
+        den = np.sqrt((n * sxx - sx ** 2) * (n * sxxT - sxT ** 2))
+        r   = num / den
+    r[(n < 2) | ~(den > 0)] = np.nan
+    return r
+
+
+def _pairwise_sums(X):
+    """(n, sx, sxx, sxy) for a breeds × traits matrix with NaN for missing."""
+    M  = ~np.isnan(X)
+    Mf = M.astype(float)
+    Z  = np.where(M, X, 0.0)
+    return Mf.T @ Mf, Z.T @ Mf, (Z * Z).T @ Mf, Z.T @ Z
+
+
+def _pairwise_pearson(X):
+    """
+    Pearson r for every column pair using the rows where both columns are
+    present.  All pair counts/sums come out of a handful of matrix products.
+    """
+    if not np.isnan(X).any():
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.atleast_2d(np.corrcoef(X, rowvar=False))
+    return _pearson_from_sums(*_pairwise_sums(X))
+
+
+def _rank_columns(X):
+    """Average ranks (ties share the mean rank) per column; NaN stays NaN."""
+    R = np.full_like(X, np.nan)
+    for j in range(X.shape[1]):
+        ok = ~np.isnan(X[:, j])
+        _, inv, counts = np.unique(X[ok, j], return_inverse=True, return_counts=True)
+        ends = np.cumsum(counts)
+        R[ok, j] = ((ends - counts + 1 + ends) / 2)[inv]
+    return R
+
+
+def _pairwise_spearman(X):
+    """
+    Spearman ρ = Pearson on ranks.  Complete columns are ranked once; only
+    pairs that touch a column with missing values are re-ranked on their
+    shared rows, so the result matches per-pair ranking exactly.
+    """
+    rho     = _pairwise_pearson(_rank_columns(X))
+    missing = np.flatnonzero(np.isnan(X).any(axis=0))
+    for a in missing:
+        for b in range(X.shape[1]):
+            rows = ~np.isnan(X[:, a]) & ~np.isnan(X[:, b])
+            pair = _pairwise_pearson(_rank_columns(X[rows][:, [a, b]]))
+            rho[a, b] = rho[b, a] = pair[0, 1]
+    return rho
+
+
+def _kendall_tau_b(X):
+    """
+    Kendall τ-b for every column pair, from sign matrices over all breed
+    pairs.  Missing values drop out of exactly the pairs they touch.
+    O(N² · T) memory, which is fine at catalog scale.
+    """
+    n_rows = X.shape[0]
+    iu     = np.triu_indices(n_rows, 1)
+    S      = np.sign(X[iu[1]] - X[iu[0]])        # (breed pairs) × traits
+    V      = (~np.isnan(S)).astype(float)
+    S      = np.nan_to_num(S)
+    num    = S.T @ S                              # concordant − discordant
+    untied = (S * S).T @ V                        # untied pairs of a where b present
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tau = num / np.sqrt(untied * untied.T)
+    tau[~(untied * untied.T > 0)] = np.nan
+    return tau
+
+
+def _correlation_matrix(X, method="pearson"):
+    """traits × traits correlation ndarray (NaN where undefined)."""
+    if method == "pearson":
+        return _pairwise_pearson(X)
+    if method == "spearman":
+        return _pairwise_spearman(X)
+    if method == "kendall":
+        return _kendall_tau_b(X)
+    raise ValueError(f"Unknown correlation method {method!r} (choose from {CORR_METHODS})")
+
+
+def _matrix_json(corr):
+    """ndarray → list-of-lists rounded to 3 places, NaN → None."""
+    return [[None if math.isnan(v) else v for v in row] for row in np.round(corr, 3).tolist()]
 
 
 def _group_confirmed(group, corr_matrix, trait_idx):
     """True if every within-group pair has |r| ≥ CORR_THRESHOLD."""
-    traits = group["traits"]
-    for i in range(len(traits)):
-        for j in range(i + 1, len(traits)):
-            a, b = traits[i], traits[j]
-            if a not in trait_idx or b not in trait_idx:
-                return False
-            r = corr_matrix[trait_idx[a]][trait_idx[b]]
-            if r is None or abs(r) < CORR_THRESHOLD:
-                return False
-    return True
+    ids = [REGISTRY.trait_id(t) for t in group["traits"]]
+    if any(t not in trait_idx for t in ids):
+        return False
+    cols = [trait_idx[t] for t in ids]
+    sub  = np.abs(corr_matrix[np.ix_(cols, cols)])[np.triu_indices(len(cols), 1)]
+    return bool(np.all(sub >= CORR_THRESHOLD))   # NaN never passes
 
 
 def _extreme_raw(confirmed_groups, standalone_list):
@@ -137,78 +269,191 @@ def _extreme_raw(confirmed_groups, standalone_list):
     raw_max = 0.0
     raw_min = 0.0
     for g in confirmed_groups:
-        raw_max += contrib(g["group_weight"], g["direction"], 5)
-        raw_min += contrib(g["group_weight"], g["direction"], 1)
+        raw_max += contrib(g["weight"], g["direction"], 5)
+        raw_min += contrib(g["weight"], g["direction"], 1)
     for s in standalone_list:
         raw_max += contrib(s["weight"], s["direction"], 5)
         raw_min += contrib(s["weight"], s["direction"], 1)
     return raw_min, raw_max
 
 
-# ─────────────────────────────────────────────────────────────────────────────
-# PUBLIC FUNCTION 1: run_correlation_analysis
-# ─────────────────────────────────────────────────────────────────────────────
-def run_correlation_analysis(
-    ratings_file: Path = RATINGS_FILE,
-    analysis_file: Path = ANALYSIS_FILE,
-    verbose: bool = True,
-) -> dict:
+def _formula_for(confirmed_names):
+    """
+    (groups, standalones) in the analysis JSON shape for a set of confirmed
+    predefined group names.  Unconfirmed group traits fall back to their
+    standalone weights, ahead of ALWAYS_STANDALONE.
+    """
+    groups, unconfirmed = [], []
+    for pg in PREDEFINED_GROUPS:
+        if pg["name"] in confirmed_names:
+            groups.append({
+                "name":        pg["name"],
+                "traits":      pg["traits"],
+                "weight":      pg["group_weight"],
+                "direction":   pg["direction"],
+                "confirmed":   True,
+            })
+        else:
+            for trait in pg["traits"]:
+                unconfirmed.append({
+                    "trait":     trait,
+                    "weight":    pg["standalone_weights"][trait],
+                    "direction": pg["direction"],
+                })
+    standalones = unconfirmed + [
+        {"trait": t, "weight": w, "direction": d}
+        for t, w, d in ALWAYS_STANDALONE
+    ]
+    return groups, standalones
+
+
+# ── Group discovery ───────────────────────────────────────────────────────────
+LINKAGES = ("average", "complete")
+
+# Standalone weight/direction of every formula trait
+FORMULA_TRAITS = {
+    **{t: (pg["standalone_weights"][t], pg["direction"])
+       for pg in PREDEFINED_GROUPS for t in pg["traits"]},
+    **{t: (w, d) for t, w, d in ALWAYS_STANDALONE},
+}
+
+
+def _nn_chain_linkage(D, linkage="complete"):
     """
-    Load all breed ratings, compute the 12×12 Pearson correlation matrix,
-    decide which predefined groups are data-confirmed (|r| ≥ 0.70 for all
-    within-group pairs), and write service_score_analysis.json.
+    Agglomerative clustering of a symmetric distance matrix with the
+    nearest-neighbour-chain algorithm and Lance–Williams updates: O(n²) time
+    and one n × n matrix for average and complete linkage.
 
-    Returns the analysis dict.
+    Returns merges as (a, b, height) where a and b are leaf indices that
+    belong to the two clusters being joined.
     """
-    with open(ratings_file) as f:
-        ratings = json.load(f)
-
-    # Build trait matrix — include every breed that has all 12 traits
-    matrix_rows, matrix_slugs, skipped = [], [], []
-    for slug, traits in ratings.items():
-        row = []
-        ok  = True
-        for t in ALL_TRAITS:
-            v = traits.get(t)
-            if v is None:
-                ok = False
-                break
-            row.append(float(v))
-        if ok:
-            matrix_rows.append(row)
-            matrix_slugs.append(slug)
+    n = len(D)
+    D = np.array(D, dtype=float)
+    np.fill_diagonal(D, np.inf)
+    size   = np.ones(n)
+    active = np.ones(n, dtype=bool)
+    merges = []
+    chain  = []
+    while len(merges) < n - 1:
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        a   = chain[-1]
+        row = D[a]
+        b   = int(np.argmin(row))
+        if len(chain) > 1 and row[chain[-2]] <= row[b]:
+            b = chain[-2]                                 # prefer the chain on ties
+        if len(chain) > 1 and b == chain[-2]:
+            chain.pop(), chain.pop()
+            h = row[b]
+            if linkage == "average":
+                new = (size[a] * D[a] + size[b] * D[b]) / (size[a] + size[b])
+            else:
+                new = np.maximum(D[a], D[b])
+            D[a], D[:, a] = new, new
+            D[a, a] = np.inf
+            D[b], D[:, b] = np.inf, np.inf
+            size[a] += size[b]
+            active[b] = False
+            merges.append((a, b, float(h)))
         else:
-            skipped.append(slug)
+            chain.append(b)
+    return merges
+
+
+def _cut_clusters(n, merges, cut):
+    """Leaf clusters (size ≥ 2) after applying every merge at height ≤ cut."""
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b, h in merges:
+        if h <= cut:
+            parent[find(b)] = find(a)
+    clusters: dict[int, list[int]] = {}
+    for i in range(n):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted((c for c in clusters.values() if len(c) > 1), key=lambda c: c[0])
 
-    n_breeds = len(matrix_rows)
-    if verbose:
-        print(f"Correlation analysis: {n_breeds} breeds with all {len(ALL_TRAITS)} traits")
-        if skipped:
-            print(f"  Skipped (missing traits): {skipped}")
 
-    corr_matrix, trait_idx = _correlation_matrix(matrix_rows, ALL_TRAITS)
+def _discover_groups(traits, corr, linkage="complete"):
+    """
+    Cluster traits on 1 − |r| and cut at 1 − CORR_THRESHOLD.
+
+    Returns (clusters, groups): every multi-trait cluster over the analysed
+    traits, and the formula groups proposed from them.  A group holds formula
+    traits of one direction whose pairs all have r ≥ CORR_THRESHOLD (average
+    linkage can admit weaker pairs; those clusters are not proposed).  Its
+    weight is the sum of the members' standalone weights.
+    """
+    with np.errstate(invalid="ignore"):
+        D = 1.0 - np.abs(np.nan_to_num(corr, nan=0.0))
+    merges   = _nn_chain_linkage(D, linkage)
+    clusters = []
+    groups   = []
+    for members in _cut_clusters(len(traits), merges, 1.0 - CORR_THRESHOLD):
+        names = [traits[i] for i in members]
+        sub   = corr[np.ix_(members, members)][np.triu_indices(len(members), 1)]
+        clusters.append({"traits": names, "min_abs_r": round(float(np.nanmin(np.abs(sub))), 3)})
+
+        for direction in ("positive", "negative"):
+            idx = [i for i in members
+                   if traits[i] in FORMULA_TRAITS and FORMULA_TRAITS[traits[i]][1] == direction]
+            if len(idx) < 2:
+                continue
+            pair_r = corr[np.ix_(idx, idx)][np.triu_indices(len(idx), 1)]
+            with np.errstate(invalid="ignore"):
+                ok = bool(np.all(pair_r >= CORR_THRESHOLD))
+            if not ok:
+                continue
+            names = [traits[i] for i in idx]
+            groups.append({
+                "name":       " + ".join(names),
+                "traits":     names,
+                "weight":     sum(FORMULA_TRAITS[t][0] for t in names),
+                "direction":  direction,
+                "confirmed":  True,
+                "discovered": True,
+                "min_r":      round(float(pair_r.min()), 3),
+            })
+    return clusters, groups
+
+
+def _build_analysis(traits, corr, n_breeds, method, verbose, discover=None):
+    """
+    Turn a traits × traits correlation ndarray into the analysis dict:
+    correlated pairs, confirmed groups, standalones and normalization.
+    Shared by the batch and incremental paths.
+
+    discover: None to test PREDEFINED_GROUPS, or "average" / "complete" to
+    propose groups by clustering the matrix instead.
+    """
+    trait_ids = REGISTRY.trait_ids(traits)
+    corr      = np.round(corr, 3)
+    trait_idx = {t: i for i, t in enumerate(trait_ids)}
+    corr_matrix = _matrix_json(corr)
 
     # Print matrix
-    if verbose:
-        short  = [t.split()[0][:8] for t in ALL_TRAITS]
+    if verbose and len(traits) <= len(ALL_TRAITS):
+        short  = [t.split()[0][:8] for t in traits]
         header = "         " + "  ".join(f"{s:>8}" for s in short)
-        print("\n── Pearson Correlation Matrix ──")
+        print(f"\n── {method.title()} Correlation Matrix ──")
         print(header)
         for i, row in enumerate(corr_matrix):
             vals = "  ".join(f"{(v if v is not None else float('nan')):8.3f}" for v in row)
             print(f"{short[i]:>8} {vals}")
 
     # Collect all correlated pairs (|r| ≥ threshold, upper triangle)
-    all_corr_pairs = []
-    for i in range(len(ALL_TRAITS)):
-        for j in range(i + 1, len(ALL_TRAITS)):
-            r = corr_matrix[i][j]
-            if r is not None and abs(r) >= CORR_THRESHOLD:
-                all_corr_pairs.append({
-                    "trait_a": ALL_TRAITS[i],
-                    "trait_b": ALL_TRAITS[j],
-                    "r":       r,
-                })
+    iu = np.triu_indices(len(traits), 1)
+    with np.errstate(invalid="ignore"):
+        hits = np.abs(corr[iu]) >= CORR_THRESHOLD
+    all_corr_pairs = [
+        {"trait_a": traits[i], "trait_b": traits[j], "r": float(corr[i, j])}
+        for i, j in zip(iu[0][hits], iu[1][hits])
+    ]
 
     if verbose:
         print(f"\n── Pairs with |r| ≥ {CORR_THRESHOLD} ──")
@@ -218,45 +463,41 @@ def run_correlation_analysis(
         else:
             print(f"  (none — no traits are strongly correlated at this threshold)")
 
-    # Determine which predefined groups are confirmed
-    confirmed_groups  = []
-    unconfirmed_traits = []   # traits whose group was NOT confirmed → become standalones
+    clusters = None
+    if discover:
+        clusters, confirmed_groups = _discover_groups(traits, corr, discover)
+        grouped = {t for g in confirmed_groups for t in g["traits"]}
+        all_standalones = [{"trait": t, "weight": w, "direction": d}
+                           for t, (w, d) in FORMULA_TRAITS.items() if t not in grouped]
+        if verbose:
+            print(f"\n── Discovered clusters ({discover} linkage, cut at 1 − |r| = "
+                  f"{1 - CORR_THRESHOLD:.2f}) ──")
+            for c in clusters:
+                print(f"  min |r| = {c['min_abs_r']:.3f}  " + "  ·  ".join(c["traits"]))
+            if not clusters:
+                print("  (none)")
+            for g in confirmed_groups:
+                print(f"  ✓ Group '{g['name']}' proposed (weight {g['weight']}, {g['direction']})")
 
-    for pg in PREDEFINED_GROUPS:
-        if _group_confirmed(pg, corr_matrix, trait_idx):
-            confirmed_groups.append({
-                "name":        pg["name"],
-                "traits":      pg["traits"],
-                "weight":      pg["group_weight"],
-                "direction":   pg["direction"],
-                "confirmed":   True,
-            })
+    # Determine which predefined groups are confirmed
+    confirmed_names = set()
+    for pg in ([] if discover else PREDEFINED_GROUPS):
+        if _group_confirmed(pg, corr, trait_idx):
+            confirmed_names.add(pg["name"])
             if verbose:
                 print(f"  ✓ Group '{pg['name']}' confirmed (all pairs |r| ≥ {CORR_THRESHOLD})")
-        else:
+        elif verbose:
             # Check correlations within this group for the note
-            pair_rs = []
-            for i, ta in enumerate(pg["traits"]):
-                for tb in pg["traits"][i+1:]:
-                    if ta in trait_idx and tb in trait_idx:
-                        pair_rs.append(corr_matrix[trait_idx[ta]][trait_idx[tb]])
-            max_r = max((abs(r) for r in pair_rs if r is not None), default=0.0)
-            if verbose:
-                print(f"  ✗ Group '{pg['name']}' not confirmed "
-                      f"(max within-group |r| = {max_r:.3f} < {CORR_THRESHOLD})"
-                      " → traits treated as standalones")
-            for trait in pg["traits"]:
-                unconfirmed_traits.append({
-                    "trait":     trait,
-                    "weight":    pg["standalone_weights"][trait],
-                    "direction": pg["direction"],
-                })
+            cols  = [trait_idx[t] for t in REGISTRY.trait_ids(pg["traits"]) if t in trait_idx]
+            pair_rs = np.abs(corr[np.ix_(cols, cols)])[np.triu_indices(len(cols), 1)]
+            max_r = float(np.nanmax(pair_rs)) if np.isfinite(pair_rs).any() else 0.0
+            print(f"  ✗ Group '{pg['name']}' not confirmed "
+                  f"(max within-group |r| = {max_r:.3f} < {CORR_THRESHOLD})"
+                  " → traits treated as standalones")
 
-    # Merge unconfirmed traits with always-standalone traits
-    all_standalones = unconfirmed_traits + [
-        {"trait": t, "weight": w, "direction": d}
-        for t, w, d in ALWAYS_STANDALONE
-    ]
+    # Unconfirmed group traits are merged with the always-standalone traits
+    if not discover:
+        confirmed_groups, all_standalones = _formula_for(confirmed_names)
 
     raw_min, raw_max = _extreme_raw(confirmed_groups, all_standalones)
 
@@ -267,9 +508,10 @@ def run_correlation_analysis(
               f"→  score = (raw − {raw_min:.2f}) / {raw_max - raw_min:.2f} × 4 + 1  (1–5 scale)")
 
     formula_note = (
-        f"Groups confirmed by data (|r| ≥ {CORR_THRESHOLD}): "
+        (f"Groups discovered by {discover}-linkage clustering (|r| ≥ {CORR_THRESHOLD}): "
+         if discover else f"Groups confirmed by data (|r| ≥ {CORR_THRESHOLD}): ") +
         f"{[g['name'] for g in confirmed_groups] or 'none'}. "
-        f"Unconfirmed group traits become standalones. "
+        f"{'Ungrouped' if discover else 'Unconfirmed group'} traits become standalones. "
         f"Raw score range: [{raw_min:.2f}, {raw_max:.2f}]. "
         f"score = (raw − {raw_min:.2f}) / {raw_max - raw_min:.2f} × 4 + 1  (1–5 scale). "
         f"Breeds missing any of the {len(ALL_TRAITS)} traits receive null."
@@ -277,8 +519,9 @@ def run_correlation_analysis(
 
     analysis = {
         "n_breeds_in_analysis":  n_breeds,
+        "corr_method":           method,
         "corr_threshold":        CORR_THRESHOLD,
-        "traits":                ALL_TRAITS,
+        "traits":                traits,
         "correlation_matrix":    corr_matrix,
         "correlated_pairs":      all_corr_pairs,
         "groups":                confirmed_groups,
@@ -288,15 +531,243 @@ def run_correlation_analysis(
         "formula_notes":         formula_note,
         "scores":                [],   # filled in by update_service_scores()
     }
+    if discover:
+        analysis["discovery"] = {"linkage": discover, "clusters": clusters}
+
+    return analysis
 
-    with open(analysis_file, "w") as f:
-        json.dump(analysis, f, indent=2)
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PUBLIC FUNCTION 1: run_correlation_analysis
+# ─────────────────────────────────────────────────────────────────────────────
+def run_correlation_analysis(
+    ratings_file: Path = RATINGS_FILE,
+    analysis_file: Path = ANALYSIS_FILE,
+    verbose: bool = True,
+    method: str = "pearson",
+    traits: list[str] | None = None,
+    discover: str | None = None,
+) -> dict:
+    """
+    Load all breed ratings, compute the trait correlation matrix (Pearson by
+    default, or Spearman / Kendall τ-b), decide which predefined groups are
+    data-confirmed (|r| ≥ 0.70 for all within-group pairs), and write
+    service_score_analysis.json.
+
+    traits defaults to the 12 formula traits; pass SCHEMA_TRAITS to cover all
+    31 DogTime traits.  Missing ratings are handled with pairwise masks, so a
+    breed only drops out of the pairs involving the traits it lacks.
+
+    discover ("average" / "complete") replaces the predefined groups with
+    groups found by hierarchical clustering of 1 − |r| cut at
+    1 − CORR_THRESHOLD; see _discover_groups().
+
+    Returns the analysis dict.
+    """
+    if method not in CORR_METHODS:
+        raise ValueError(f"Unknown correlation method {method!r} (choose from {CORR_METHODS})")
+    if discover is not None and discover not in LINKAGES:
+        raise ValueError(f"Unknown linkage {discover!r} (choose from {LINKAGES})")
+    traits    = list(traits) if traits is not None else list(ALL_TRAITS)
+    trait_ids = REGISTRY.trait_ids(traits)
+    ratings   = load_ratings(ratings_file)
+
+    slugs, X = _rating_matrix(ratings, trait_ids)
+    present  = (~np.isnan(X)).sum(axis=1)
+    partial  = [s for s, k in zip(slugs, present) if 0 < k < len(traits)]
+    n_breeds = _breeds_in_analysis(X)
+    if verbose:
+        print(f"Correlation analysis ({method}): {n_breeds} breeds × {len(traits)} traits")
+        if partial:
+            print(f"  Partial ratings (pairwise-masked): {partial}")
+
+    analysis = _build_analysis(traits, _correlation_matrix(X, method), n_breeds, method, verbose,
+                               discover=discover)
+
+    # Seed the incremental path (update_correlation) with the same rows
+    if method == "pearson" and Path(analysis_file).resolve() == ANALYSIS_FILE.resolve():
+        CorrelationStats.from_matrix(traits, slugs, X).save()
+
+    _write_json(analysis_file, analysis)
     if verbose:
         print(f"\nWrote {analysis_file}")
 
     return analysis
 
 
+# ── Incremental correlation ───────────────────────────────────────────────────
+class CorrelationStats:
+    """
+    Sufficient statistics for the pairwise-masked Pearson matrix.
+
+    Keeps per trait pair the number of breeds with both traits present (n),
+    the sums Σa and Σa² over those breeds (sx, sxx) and the sum of products
+    Σa·b (sxy).  Adding, removing or changing one breed is an O(traits²)
+    rank-one update.  The correlation matrix can be rebuilt from the sums
+    without looking at any other breed.
+
+    Each breed's row is kept too, so a later remove/change knows what to
+    subtract.  Ratings are small integers, so the sums are exact in float64
+    and the result matches the batch computation to rounding.
+    """
+
+    def __init__(self, traits: list[str]):
+        k = len(traits)
+        self.traits = list(traits)
+        self.rows: dict[str, list[float | None]] = {}
+        self.n   = np.zeros((k, k))
+        self.sx  = np.zeros((k, k))
+        self.sxx = np.zeros((k, k))
+        self.sxy = np.zeros((k, k))
+
+    @classmethod
+    def from_matrix(cls, traits, slugs, X) -> "CorrelationStats":
+        stats = cls(traits)
+        stats.n, stats.sx, stats.sxx, stats.sxy = _pairwise_sums(X)
+        for slug, row in zip(slugs, X):
+            if not np.isnan(row).all():
+                stats.rows[slug] = [None if math.isnan(v) else v for v in row.tolist()]
+        return stats
+
+    @classmethod
+    def from_ratings(cls, ratings_file: Path = RATINGS_FILE, traits=None) -> "CorrelationStats":
+        traits = list(traits) if traits is not None else list(ALL_TRAITS)
+        slugs, X = _rating_matrix(load_ratings(ratings_file), REGISTRY.trait_ids(traits))
+        return cls.from_matrix(traits, slugs, X)
+
+    # ── Rank-one updates ─────────────────────────────────────────────────────
+
+    def _apply(self, row, sign: float):
+        x = np.array([np.nan if v is None else v for v in row], dtype=float)
+        m = (~np.isnan(x)).astype(float)
+        z = np.nan_to_num(x)
+        self.n   += sign * np.outer(m, m)
+        self.sx  += sign * np.outer(z, m)
+        self.sxx += sign * np.outer(z * z, m)
+        self.sxy += sign * np.outer(z, z)
+
+    def remove(self, slug: str) -> bool:
+        row = self.rows.pop(slug, None)
+        if row is None:
+            return False
+        self._apply(row, -1.0)
+        return True
+
+    def upsert(self, slug: str, ratings) -> None:
+        """Add or replace a breed.  ratings: a Ratings vector, or None to remove."""
+        self.remove(slug)
+        if ratings is None:
+            return
+        row = [ratings[tid] for tid in REGISTRY.trait_ids(self.traits)]
+        row = [None if v is None else float(v) for v in row]
+        if all(v is None for v in row):
+            return
+        self.rows[slug] = row
+        self._apply(row, 1.0)
+
+    # ── Results ──────────────────────────────────────────────────────────────
+
+    @property
+    def count(self) -> int:
+        """Breeds in the analysis: rows with at least two traits rated (see _breeds_in_analysis)."""
+        return sum(1 for row in self.rows.values() if sum(v is not None for v in row) >= 2)
+
+    def correlation(self) -> np.ndarray:
+        return _pearson_from_sums(self.n, self.sx, self.sxx, self.sxy)
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def to_json(self) -> dict:
+        return {
+            "traits": self.traits,
+            "n":      self.n.tolist(),
+            "sx":     self.sx.tolist(),
+            "sxx":    self.sxx.tolist(),
+            "sxy":    self.sxy.tolist(),
+            "rows":   self.rows,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "CorrelationStats":
+        stats = cls(data["traits"])
+        stats.n   = np.array(data["n"], dtype=float)
+        stats.sx  = np.array(data["sx"], dtype=float)
+        stats.sxx = np.array(data["sxx"], dtype=float)
+        stats.sxy = np.array(data["sxy"], dtype=float)
+        stats.rows = data["rows"]
+        return stats
+
+    def save(self, stats_file: Path = STATS_FILE) -> None:
+        tmp = Path(stats_file).with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.to_json(), separators=(",", ":")))
+        os.replace(tmp, stats_file)
+
+    @classmethod
+    def load(cls, stats_file: Path = STATS_FILE) -> "CorrelationStats | None":
+        try:
+            return cls.from_json(json.loads(Path(stats_file).read_text()))
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def check_incremental(ratings_file: Path = RATINGS_FILE, traits=None, seed: int = 0) -> float:
+    """
+    Replay the catalog through CorrelationStats with random removes and
+    changes, and return the max |Δr| against the batch computation on the
+    same final rows.  Raises AssertionError above 1e-9.
+    """
+    import random
+    traits = list(traits) if traits is not None else list(ALL_TRAITS)
+    ratings = load_ratings(ratings_file)
+    rng     = random.Random(seed)
+    stats   = CorrelationStats(traits)
+    slugs   = list(ratings)
+    for slug in slugs:
+        stats.upsert(slug, ratings[slug])
+    for slug in rng.sample(slugs, k=min(10, len(slugs))):
+        stats.upsert(slug, None)                  # remove
+    for slug in rng.sample(list(stats.rows), k=min(10, len(stats.rows))):
+        changed = Ratings(ratings[slug].values[:])
+        for tid in REGISTRY.trait_ids(traits):
+            changed.values[tid] = rng.randint(1, 5)
+        stats.upsert(slug, changed)               # change
+
+    X = np.array([[np.nan if v is None else v for v in row] for row in stats.rows.values()])
+    batch = _correlation_matrix(X)
+    incr  = stats.correlation()
+    assert np.array_equal(np.isnan(batch), np.isnan(incr)), "NaN pattern differs"
+    diff = float(np.nanmax(np.abs(batch - incr))) if np.isfinite(batch).any() else 0.0
+    assert diff < 1e-9, f"incremental result differs from batch by {diff}"
+    return diff
+
+
+# ── Score cache ───────────────────────────────────────────────────────────────
+# score_cache.json: {"formula": <hash>, "breeds": {slug: [<vector hash>, score]}}
+# A cached score is reused while both the formula and the breed's ratings
+# vector hash the same; it is a pure function of the two.
+
+def _formula_hash(analysis: dict) -> str:
+    formula = {k: analysis.get(k) for k in ("groups", "standalone", "raw_min", "raw_max")}
+    return hashlib.blake2b(json.dumps(formula, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def _vector_hash(vec: Ratings) -> str:
+    return hashlib.blake2b(vec.values.tobytes(), digest_size=8).hexdigest()
+
+
+def _load_score_cache(cache_file: Path) -> dict:
+    try:
+        return json.loads(Path(cache_file).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_score_cache(cache_file: Path, cache: dict) -> None:
+    tmp = Path(cache_file).with_suffix(".tmp")
+    tmp.write_text(json.dumps(cache, separators=(",", ":"), sort_keys=True))
+    os.replace(tmp, cache_file)
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # PUBLIC FUNCTION 2: update_service_scores
 # ─────────────────────────────────────────────────────────────────────────────
@@ -305,71 +776,75 @@ def update_service_scores(
     ratings_file:  Path = RATINGS_FILE,
     analysis_file: Path = ANALYSIS_FILE,
     verbose:       bool = True,
+    cache_file:    Path | None = SCORE_CACHE_FILE,
 ) -> list:
     """
     Read the formula from service_score_analysis.json, compute a service-dog
     suitability score (0-100) for every breed that has all required traits,
     and write service_dog_score into large_dog_breeds.json.
 
+    Scores are cached in score_cache.json under a hash of the formula and of
+    each breed's ratings vector; only breeds whose key changed are rescored
+    (pass cache_file=None to rescore everything).  Each JSON file is only
+    rewritten when a score in it actually differs.
+
     Returns the sorted scores list.
     """
     with open(analysis_file) as f:
         analysis = json.load(f)
 
-    groups     = analysis["groups"]
-    standalones = analysis["standalone"]
-    raw_min    = analysis["raw_min"]
-    raw_max    = analysis["raw_max"]
-    raw_range  = raw_max - raw_min
-
-    grouped_traits = {t for g in groups for t in g["traits"]}
-
-    def score_breed(trait_vals):
-        """trait_vals: {trait_name: float}.  Returns float or None."""
-        raw = 0.0
-        for g in groups:
-            vals = [trait_vals[t] for t in g["traits"] if t in trait_vals]
-            if len(vals) < len(g["traits"]):
-                return None
-            avg = sum(vals) / len(vals)
-            raw += g["weight"] * avg if g["direction"] == "positive" else -g["weight"] * avg
-        for s in standalones:
-            v = trait_vals.get(s["trait"])
-            if v is None:
-                return None
-            raw += s["weight"] * v if s["direction"] == "positive" else -s["weight"] * v
-        return int(round((raw - raw_min) / raw_range * 4 + 1))
-
-    # Score every breed in breed_ratings.json
-    with open(ratings_file) as f:
-        ratings = json.load(f)
-
-    scores_by_slug = {}
-    for slug, traits in ratings.items():
-        trait_vals = {t: float(traits[t]) for t in ALL_TRAITS if t in traits}
-        s = score_breed(trait_vals)
-        if s is not None:
-            scores_by_slug[slug] = s
+    ratings = load_ratings(ratings_file)
+    fhash   = _formula_hash(analysis)
+    cache   = _load_score_cache(cache_file) if cache_file else {}
+    cached  = cache.get("breeds", {}) if cache.get("formula") == fhash else {}
+
+    entries = {}
+    stale   = {}
+    for slug, vec in ratings.items():
+        vhash = _vector_hash(vec)
+        hit   = cached.get(slug)
+        if hit is not None and hit[0] == vhash:
+            entries[slug] = hit
+        else:
+            entries[slug] = [vhash, None]
+            stale[slug]   = vec
+
+    # The formula compiles to one signed weight vector; the stale breeds are
+    # scored in a single matrix product (see scoring.py).
+    if stale:
+        engine = ScoringEngine.from_analysis(analysis, stale)
+        for slug, score in engine.base_scores().items():
+            entries[slug][1] = score
+    if cache_file and (stale or entries.keys() != cached.keys()):
+        _save_score_cache(cache_file, {"formula": fhash, "breeds": entries})
+    scores_by_slug = {slug: score for slug, (_h, score) in entries.items() if score is not None}
 
     # Update large_dog_breeds.json
     with open(breeds_file) as f:
         breeds = json.load(f)
 
-    n_scored = n_null = 0
+    n_scored = n_null = n_changed = 0
     for breed in breeds:
         slug  = breed.get("dogtime_slug", "")
         score = scores_by_slug.get(slug)
+        if "service_dog_score" not in breed or breed["service_dog_score"] != score:
+            n_changed += 1
         breed["service_dog_score"] = score
         if score is not None:
             n_scored += 1
         else:
             n_null += 1
 
-    with open(breeds_file, "w") as f:
-        json.dump(breeds, f, indent=2)
+    if n_changed:
+        _write_json(breeds_file, breeds)
 
     if verbose:
-        print(f"Updated service_dog_score in {breeds_file}")
+        print(f"Rescored {len(stale)} of {len(ratings)} rated breed(s) "
+              f"({len(ratings) - len(stale)} from {Path(cache_file).name if cache_file else 'no cache'})")
+        if n_changed:
+            print(f"Updated service_dog_score in {breeds_file} ({n_changed} changed)")
+        else:
+            print(f"No score changes; {breeds_file} left as is")
         print(f"  Scored: {n_scored}  |  Null (no ratings): {n_null}")
 
     # Build sorted scores list for analysis JSON
@@ -395,24 +870,303 @@ def update_service_scores(
                 print(f"  {nm}")
 
     # Write updated scores back into analysis JSON
-    analysis["scores"] = scored_list
-    with open(analysis_file, "w") as f:
-        json.dump(analysis, f, indent=2)
-    if verbose:
-        print(f"\nUpdated scores in {analysis_file}")
+    if analysis.get("scores") != scored_list:
+        analysis["scores"] = scored_list
+        _write_json(analysis_file, analysis)
+        if verbose:
+            print(f"\nUpdated scores in {analysis_file}")
 
     return scored_list
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# PUBLIC FUNCTION 3: update_correlation
+# ─────────────────────────────────────────────────────────────────────────────
+def update_correlation(
+    changes: dict,
+    ratings_file:  Path = RATINGS_FILE,
+    analysis_file: Path = ANALYSIS_FILE,
+    stats_file:    Path = STATS_FILE,
+    verbose:       bool = False,
+) -> dict:
+    """
+    Refresh service_score_analysis.json after some breeds changed, without
+    rescanning the catalog.  changes: {slug: Ratings or None (removed)}.
+
+    Applies each change to the persisted CorrelationStats in O(traits²),
+    rebuilds the matrix and group confirmation from the sums, and writes the
+    analysis.  The stored method, traits and discovery mode are kept, and so
+    are the blocks other steps add (the scores list for
+    update_service_scores(), the uncertainty block).  Falls back to building
+    the stats from breed_ratings.json once if the stats file is missing or
+    covers other traits.  The sums only give Pearson r; an analysis stored
+    with Spearman or Kendall is recomputed from breed_ratings.json.
+
+    Returns the analysis dict.
+    """
+    try:
+        previous = json.loads(Path(analysis_file).read_text())
+    except (OSError, ValueError):
+        previous = {}
+    method   = previous.get("corr_method", "pearson")
+    traits   = previous.get("traits") or list(ALL_TRAITS)
+    discover = (previous.get("discovery") or {}).get("linkage")   # keep discovery mode
+
+    stats = CorrelationStats.load(stats_file)
+    if stats is None or stats.traits != traits:
+        stats = CorrelationStats.from_ratings(ratings_file, traits)
+    else:
+        for slug, vec in changes.items():
+            stats.upsert(slug, vec)
+    stats.save(stats_file)
+
+    if method == "pearson":
+        corr, n_breeds = stats.correlation(), stats.count
+    else:
+        _, X = _rating_matrix(load_ratings(ratings_file), REGISTRY.trait_ids(traits))
+        corr, n_breeds = _correlation_matrix(X, method), _breeds_in_analysis(X)
+    analysis = _build_analysis(traits, corr, n_breeds, method, verbose, discover=discover)
+    analysis["scores"] = previous.get("scores", [])
+    analysis.update({k: v for k, v in previous.items() if k not in analysis})   # e.g. uncertainty
+    _write_json(analysis_file, analysis)
+    return analysis
+
+
+# ── Bootstrap / weight sensitivity ────────────────────────────────────────────
+UNCERTAINTY_CHUNK = 500      # replicates per task; fixed so results don't depend on --workers
+
+
+def _formula_configs(engine):
+    """
+    Signed weight rows (in engine.traits order) for every subset of confirmed
+    predefined groups.  Row index bit g set ⇔ PREDEFINED_GROUPS[g] confirmed.
+    """
+    from scoring import compile_formula
+    rows = []
+    for mask in range(1 << len(PREDEFINED_GROUPS)):
+        names = {pg["name"] for g, pg in enumerate(PREDEFINED_GROUPS) if mask >> g & 1}
+        groups, standalones = _formula_for(names)
+        traits, w = compile_formula({"groups": groups, "standalone": standalones})
+        rows.append(engine.vector(dict(zip(traits, w))))
+    return np.array(rows)
+
+
+def _uncertainty_chunk(task):
+    """
+    One chunk of replicates (runs in a worker process).  Each replicate
+    resamples breeds with replacement, recomputes the pairwise-masked
+    Pearson matrix from weighted sums, decides which groups it confirms,
+    and scores every breed under that formula with log-normally perturbed
+    weights.
+
+    Returns (upper-triangle r, confirmed flags, 1–5 scores, ranks).
+    """
+    seed, n_rep, engine, configs, group_pairs, sigma = task
+    rng = np.random.default_rng(seed)
+    n, k = engine.X.shape
+
+    # Per-breed pair features; a replicate's sums are counts @ features.
+    M   = (~engine.missing).astype(float)
+    Z   = engine.X
+    def outer(a, b):
+        return (a[:, :, None] * b[:, None, :]).reshape(n, k * k)
+    feats  = [outer(M, M), outer(Z, M), outer(Z * Z, M), outer(Z, Z)]
+    counts = rng.multinomial(n, np.full(n, 1.0 / n), size=n_rep).astype(float)
+    sums   = [(counts @ f).reshape(n_rep, k, k) for f in feats]
+    r      = _pearson_from_sums(*sums)
+
+    confirmed = np.ones((n_rep, len(group_pairs)), dtype=bool)
+    for g, (ia, ib) in enumerate(group_pairs):
+        with np.errstate(invalid="ignore"):
+            confirmed[:, g] = np.all(np.abs(r[:, ia, ib]) >= CORR_THRESHOLD, axis=1)
+    config = confirmed @ (1 << np.arange(len(group_pairs)))
+
+    W      = configs[config] * np.exp(sigma * rng.standard_normal((n_rep, k)))
+    scaled = engine.scale(W)
+    order  = np.argsort(-np.nan_to_num(scaled, nan=-np.inf), axis=1, kind="stable")
+    ranks  = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(1, n + 1)[None, :], axis=1)
+
+    iu = np.triu_indices(k, 1)
+    return r[:, iu[0], iu[1]].astype(np.float32), confirmed, np.rint(scaled), ranks.astype(np.int32)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PUBLIC FUNCTION 4: estimate_uncertainty
+# ─────────────────────────────────────────────────────────────────────────────
+def estimate_uncertainty(
+    n_boot:        int   = 10_000,
+    sigma:         float = 0.2,
+    seed:          int   = 0,
+    workers:       int | None = None,
+    ratings_file:  Path  = RATINGS_FILE,
+    analysis_file: Path  = ANALYSIS_FILE,
+    verbose:       bool  = True,
+) -> dict:
+    """
+    Bootstrap the correlation analysis and perturb the weights to see how
+    stable the formula and the scores are.
+
+    Each replicate resamples the breeds with replacement (for correlation
+    and group-confirmation stability) and multiplies every weight by
+    exp(N(0, sigma²)) (for score and rank stability).  Replicates run in
+    chunks of UNCERTAINTY_CHUNK on a process pool.  Each chunk gets its own
+    child of SeedSequence(seed), so a given seed gives the same result for
+    any number of workers.
+
+    Writes an "uncertainty" block into service_score_analysis.json with
+    95 % intervals per correlation pair, group confirmation rates and
+    per-breed score / rank intervals.  Returns that block.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from scoring import ScoringEngine
+
+    with open(analysis_file) as f:
+        analysis = json.load(f)
+
+    traits   = list(ALL_TRAITS)
+    ratings  = load_ratings(ratings_file)
+    engine   = ScoringEngine(traits, np.zeros(len(traits)), ratings)
+    configs  = _formula_configs(engine)
+
+    col = {t: i for i, t in enumerate(traits)}
+    group_pairs = []
+    for pg in PREDEFINED_GROUPS:
+        ia, ib = np.triu_indices(len(pg["traits"]), 1)
+        cols   = np.array([col[t] for t in pg["traits"]])
+        group_pairs.append((cols[ia], cols[ib]))
+
+    # Base formula (as written in the analysis file) for the point estimate
+    from scoring import compile_formula
+    base_traits, base_w = compile_formula(analysis)
+    base = engine.scale(engine.vector(dict(zip(base_traits, base_w))))[0]
+
+    sizes = [UNCERTAINTY_CHUNK] * (n_boot // UNCERTAINTY_CHUNK)
+    if n_boot % UNCERTAINTY_CHUNK:
+        sizes.append(n_boot % UNCERTAINTY_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(sq, m, engine, configs, group_pairs, sigma) for sq, m in zip(seeds, sizes)]
+
+    workers = workers or os.cpu_count() or 1
+    if verbose:
+        print(f"Uncertainty: {n_boot} replicates × {len(engine.slugs)} breeds "
+              f"(weight σ = {sigma}, seed {seed}, {workers} worker(s))")
+    if workers == 1 or len(tasks) == 1:
+        parts = [_uncertainty_chunk(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_uncertainty_chunk, tasks))
+
+    r, confirmed, scores, ranks = (np.concatenate(x) for x in zip(*parts))
+
+    # Correlation intervals back into traits × traits matrices
+    iu = np.triu_indices(len(traits), 1)
+    with np.errstate(invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        r_lo, r_hi = np.nanpercentile(r, [2.5, 97.5], axis=0)
+    lo, hi = np.eye(len(traits)), np.eye(len(traits))
+    lo[iu], hi[iu] = r_lo, r_hi
+    lo[iu[1], iu[0]], hi[iu[1], iu[0]] = r_lo, r_hi
+
+    base_order = np.argsort(-np.nan_to_num(base, nan=-np.inf), kind="stable")
+    base_rank  = np.empty(len(base), dtype=int)
+    base_rank[base_order] = np.arange(1, len(base) + 1)
+
+    breeds = {}
+    for j, slug in enumerate(engine.slugs):
+        if np.isnan(base[j]):
+            continue
+        col_scores = scores[:, j]
+        s_lo, s_hi = np.percentile(col_scores, [2.5, 97.5])
+        k_lo, k_med, k_hi = np.percentile(ranks[:, j], [2.5, 50, 97.5])
+        breeds[slug] = {
+            "score":        int(np.rint(base[j])),
+            "score_lo":     int(np.floor(s_lo)),
+            "score_hi":     int(np.ceil(s_hi)),
+            "p_same_score": round(float(np.mean(col_scores == np.rint(base[j]))), 4),
+            "rank":         int(base_rank[j]),
+            "rank_median":  int(k_med),
+            "rank_lo":      int(np.floor(k_lo)),
+            "rank_hi":      int(np.ceil(k_hi)),
+        }
+
+    block = {
+        "n_bootstrap":        n_boot,
+        "weight_sigma":       sigma,
+        "seed":               seed,
+        "interval":           0.95,
+        "group_confirmation": {pg["name"]: round(float(confirmed[:, g].mean()), 4)
+                               for g, pg in enumerate(PREDEFINED_GROUPS)},
+        "traits":             traits,
+        "correlation_lo":     _matrix_json(lo),
+        "correlation_hi":     _matrix_json(hi),
+        "breeds":             breeds,
+    }
+
+    if verbose:
+        print("\n── Group confirmation rate (bootstrap) ──")
+        for name, p in block["group_confirmation"].items():
+            print(f"  {p:6.1%}  {name}")
+        widest = sorted(breeds.items(), key=lambda kv: kv[1]["rank_lo"] - kv[1]["rank_hi"])[:10]
+        print("\n── Least stable ranks (95 % interval) ──")
+        for slug, b in widest:
+            print(f"  #{b['rank']:<3d} [{b['rank_lo']:>2d}–{b['rank_hi']:<2d}]  "
+                  f"score {b['score']} [{b['score_lo']}–{b['score_hi']}]  {slug}")
+
+    analysis["uncertainty"] = block
+    _write_json(analysis_file, analysis)
+    if verbose:
+        print(f"\nWrote uncertainty to {analysis_file}")
+    return block
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # CLI entry point
 # ─────────────────────────────────────────────────────────────────────────────
-if __name__ == "__main__":
-    args = set(sys.argv[1:])
-    run_analysis = "--scores" not in args   # default: run analysis
-    run_scores   = "--analysis" not in args  # default: run scores
+def main():
+    ap = argparse.ArgumentParser(description="Correlation analysis and service dog scores")
+    ap.add_argument("--analysis",   action="store_true", help="Correlation analysis only")
+    ap.add_argument("--scores",     action="store_true", help="Update scores only (analysis must exist)")
+    ap.add_argument("--method",     choices=CORR_METHODS, default="pearson", help="Correlation method")
+    ap.add_argument("--all-traits", action="store_true",
+                    help="Correlate all 31 DogTime traits instead of the 12 formula traits")
+    ap.add_argument("--discover",   choices=LINKAGES, nargs="?", const="complete",
+                    help="Propose groups by clustering 1 − |r| (default linkage: complete) "
+                         "instead of testing the predefined groups")
+    ap.add_argument("--check-incremental", action="store_true",
+                    help="Check incremental sufficient-statistics updates against the batch matrix")
+    ap.add_argument("--no-cache",   action="store_true", help="Rescore every breed, ignoring score_cache.json")
+    ap.add_argument("--uncertainty", type=int, nargs="?", const=10_000, metavar="N",
+                    help="Bootstrap + weight-perturbation intervals over N replicates (default 10000)")
+    ap.add_argument("--sigma",   type=float, default=0.2, help="Log-normal weight perturbation σ (default 0.2)")
+    ap.add_argument("--seed",    type=int,   default=0,   help="Seed for --uncertainty")
+    ap.add_argument("--workers", type=int,   default=None, help="Processes for --uncertainty (default: all cores)")
+    metrics.add_argument(ap)
+    args = ap.parse_args()
+    metrics.dump_at_exit(args.metrics_json)
+
+    if args.uncertainty:
+        estimate_uncertainty(n_boot=args.uncertainty, sigma=args.sigma,
+                             seed=args.seed, workers=args.workers)
+        return
+
+    if args.check_incremental:
+        diff = check_incremental(traits=SCHEMA_TRAITS if args.all_traits else None)
+        print(f"Incremental vs batch: max |Δr| = {diff:.2e}  (ok)")
+        return
+
+    run_analysis = not args.scores     # default: run analysis
+    run_scores   = not args.analysis   # default: run scores
 
     if run_analysis:
-        run_correlation_analysis()
+        with metrics.stage("analysis"):
+            run_correlation_analysis(method=args.method,
+                                     traits=SCHEMA_TRAITS if args.all_traits else None,
+                                     discover=args.discover)
     if run_scores:
-        update_service_scores()
+        with metrics.stage("score"):
+            update_service_scores(cache_file=None if args.no_cache else SCORE_CACHE_FILE)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,17 +19,19 @@ import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import numpy as np
 
+from models import load_breeds, load_ratings
+
 ROOT = Path(__file__).parent
 CHARTS_DIR = ROOT / "charts"
 CHARTS_DIR.mkdir(exist_ok=True)
 
 # ── Load data ────────────────────────────────────────────────────────────────
-breeds = json.loads((ROOT / "large_dog_breeds.json").read_text())
-ratings = json.loads((ROOT / "breed_ratings.json").read_text())
+breeds = load_breeds(ROOT / "large_dog_breeds.json")
+ratings = load_ratings(ROOT / "breed_ratings.json")
 analysis = json.loads((ROOT / "service_score_analysis.json").read_text())
 
 # Build lookup: slug -> breed dict
-slug_to_breed = {b.get("dogtime_slug", ""): b for b in breeds}
+slug_to_breed = {b.dogtime_slug: b for b in breeds}
 
 # ── Style defaults ───────────────────────────────────────────────────────────
 plt.rcParams.update({
@@ -59,14 +61,10 @@ def chart_weight_vs_height():
     fig, ax = plt.subplots(figsize=(14, 9))
     xs, ys, names, colors = [], [], [], []
     for b in breeds:
-        w = b["weight_lbs"]
-        h = b["height_in"]
-        avg_w = (w["min"] + w["max"]) / 2
-        avg_h = (h["min"] + h["max"]) / 2
-        xs.append(avg_w)
-        ys.append(avg_h)
-        names.append(b["name"])
-        colors.append(b.get("color", ACCENT))
+        xs.append(b.weight_lbs.mid)
+        ys.append(b.height_in.mid)
+        names.append(b.name)
+        colors.append(b.color or ACCENT)
 
     ax.scatter(xs, ys, c=colors, s=80, alpha=0.85, edgecolors="white", linewidths=0.5, zorder=3)
 
@@ -90,10 +88,10 @@ def chart_weight_vs_height():
 # CHART 2: Lifespan range chart (horizontal bar)
 # ══════════════════════════════════════════════════════════════════════════════
 def chart_lifespan_ranges():
-    sorted_breeds = sorted(breeds, key=lambda b: (b["lifespan_yrs"]["min"] + b["lifespan_yrs"]["max"]) / 2)
-    names = [b["name"] for b in sorted_breeds]
-    mins = [b["lifespan_yrs"]["min"] for b in sorted_breeds]
-    maxs = [b["lifespan_yrs"]["max"] for b in sorted_breeds]
+    sorted_breeds = sorted(breeds, key=lambda b: b.lifespan_yrs.mid)
+    names = [b.name for b in sorted_breeds]
+    mins = [b.lifespan_yrs.min for b in sorted_breeds]
+    maxs = [b.lifespan_yrs.max for b in sorted_breeds]
     ranges = [mx - mn for mn, mx in zip(mins, maxs)]
 
     fig, ax = plt.subplots(figsize=(12, max(16, len(names) * 0.28)))
@@ -119,7 +117,7 @@ def chart_lifespan_ranges():
 # CHART 3: Service Dog Suitability Score distribution
 # ══════════════════════════════════════════════════════════════════════════════
 def chart_service_scores():
-    scored = [(b["name"], b["service_dog_score"]) for b in breeds if b.get("service_dog_score") is not None]
+    scored = [(b.name, b.service_dog_score) for b in breeds if b.service_dog_score is not None]
     scored.sort(key=lambda x: x[1], reverse=True)
 
     names = [s[0] for s in scored]
@@ -150,7 +148,7 @@ def chart_service_scores():
 # CHART 4: Top-10 / Bottom-10 service score comparison
 # ══════════════════════════════════════════════════════════════════════════════
 def chart_top_bottom_service():
-    scored = [(b["name"], b["service_dog_score"]) for b in breeds if b.get("service_dog_score") is not None]
+    scored = [(b.name, b.service_dog_score) for b in breeds if b.service_dog_score is not None]
     scored.sort(key=lambda x: x[1], reverse=True)
     top = scored[:10]
     bottom = scored[-10:]
@@ -199,7 +197,7 @@ def chart_trait_heatmap():
     data_rows = []
     breed_names = []
     for b in breeds:
-        slug = b.get("dogtime_slug", "")
+        slug = b.dogtime_slug
         if slug not in ratings:
             continue
         r = ratings[slug]
@@ -213,7 +211,7 @@ def chart_trait_heatmap():
             row.append(v)
         if complete:
             data_rows.append(row)
-            breed_names.append(b["name"])
+            breed_names.append(b.name)
 
     if not data_rows:
         print("  [skip] trait heatmap — no complete data")
@@ -252,7 +250,7 @@ def chart_origin_distribution():
     from collections import Counter
     origins = Counter()
     for b in breeds:
-        o = b.get("origin", "Unknown")
+        o = b.origin
         # Normalize multi-origin like "Belgium/France"
         if "/" in o:
             for part in o.split("/"):
@@ -287,7 +285,7 @@ def chart_origin_distribution():
 
 
 # ══════════════════════════════════════════════════════════════════════════════
-# CHART 7: Correlation matrix (12 service-score traits)
+# CHART 7: Correlation matrix (traits from service_score_analysis.json)
 # ══════════════════════════════════════════════════════════════════════════════
 def chart_correlation_matrix():
     traits = analysis["traits"]
@@ -316,7 +314,8 @@ def chart_correlation_matrix():
     ax.set_xticklabels(short_names, rotation=45, ha="right", fontsize=8.5)
     ax.set_yticks(range(len(short_names)))
     ax.set_yticklabels(short_names, fontsize=8.5)
-    ax.set_title("Pearson Correlation Matrix (12 Service-Score Traits)", fontweight="bold", pad=15)
+    method = analysis.get("corr_method", "pearson").title()
+    ax.set_title(f"{method} Correlation Matrix ({len(traits)} Traits)", fontweight="bold", pad=15)
 
     for i in range(len(traits)):
         for j in range(len(traits)):
@@ -326,7 +325,7 @@ def chart_correlation_matrix():
                 ax.text(j, i, f"{val:.2f}", ha="center", va="center", fontsize=6.5, color=color)
 
     cbar = fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
-    cbar.set_label("Pearson r")
+    cbar.set_label(f"{method} r")
 
     fig.tight_layout()
     fig.savefig(CHARTS_DIR / "correlation_matrix.png", dpi=150)
@@ -387,7 +386,7 @@ def chart_category_averages():
 # CHART 9: Weight distribution histogram
 # ══════════════════════════════════════════════════════════════════════════════
 def chart_weight_distribution():
-    avg_weights = [(b["weight_lbs"]["min"] + b["weight_lbs"]["max"]) / 2 for b in breeds]
+    avg_weights = [b.weight_lbs.mid for b in breeds]
 
     fig, ax = plt.subplots(figsize=(10, 5))
     n, bins, patches = ax.hist(avg_weights, bins=15, color=ACCENT, alpha=0.8, edgecolor="white", linewidth=0.8)
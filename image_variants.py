@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+image_variants.py — resized WebP / JPEG derivatives of the breed photos.
+
+server.py serves GET /img/<slug>?w=320&fmt=webp from here.  The photos in
+images/ are kept at whatever size DogTime had them, often 1200–2100 px wide,
+while a card or table thumbnail needs a few hundred pixels.  A variant is:
+
+  decoded in JPEG draft mode   libjpeg scales by 1/2, 1/4 or 1/8 while
+                               decoding, so a 2121 px photo wanted at 320 px
+                               is decoded at 1/4 size, never in full
+  resized with Lanczos         down to the requested width (never up)
+  encoded as WebP or JPEG      quality 80 / 82
+
+Widths snap up to one of WIDTHS, so arbitrary ?w= values can't fill the cache
+with near-duplicates.  Variants are written to image_cache/ under a name that
+includes the source image's content hash (from asset_manifest.py).  A
+replaced photo therefore gets fresh variants, and the old ones age out.  The
+directory is an LRU bounded to CACHE_MAX_BYTES: the least recently served
+variants are deleted first.  Generation is single-flight.  When a burst of requests asks
+for a variant that isn't cached yet, one thread renders it and the rest wait
+for that result.
+
+Usage:
+    python image_variants.py                          # render 320 px WebP for every image
+    python image_variants.py --widths 160,320,640 --fmt webp,jpeg
+    python image_variants.py --clear                  # empty image_cache/
+
+As a callable module:
+    from image_variants import get_variant
+    variant = get_variant("great-dane", "320", "webp")
+    # Variant(path=Path("image_cache/great-dane.<hash>.w320.webp"), mime="image/webp", source_hash=...)
+    # or None when the breed has no image; VariantError for a bad width / format
+    variant, f = open_variant("great-dane", "320", "webp")   # the same, plus the file opened for serving
+"""
+
+import argparse
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+
+import metrics
+from asset_manifest import get_manifest
+
+ROOT            = Path(__file__).parent
+CACHE_DIR       = ROOT / "image_cache"
+CACHE_MAX_BYTES = 128 << 20
+WIDTHS          = (160, 320, 480, 640, 960, 1280)
+DEFAULT_WIDTH   = 640
+WARM_WIDTHS     = (160, 320)       # the table and card thumbnails at 1×; server.py --warm
+
+# fmt → (PIL format, file suffix, MIME type, encoder options)
+FORMATS = {
+    "webp": ("WEBP", ".webp", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", ".jpg",  "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+FORMAT_ALIASES = {"jpg": "jpeg"}
+
+VARIANTS = metrics.METRICS.counter("image_variants_total", "Image variant lookups", ("result",))
+
+
+class VariantError(ValueError):
+    """A malformed width or unknown format (→ 400)."""
+
+
+@dataclass(frozen=True, slots=True)
+class Variant:
+    path:        Path
+    mime:        str
+    source_hash: str
+
+
+def snap_width(value: str | int | None) -> int:
+    """The smallest of WIDTHS ≥ value (the largest if value exceeds them all)."""
+    if value in (None, ""):
+        return DEFAULT_WIDTH
+    try:
+        width = int(value)
+    except ValueError:
+        raise VariantError("w must be an integer") from None
+    if width < 1:
+        raise VariantError("w must be positive")
+    return next((w for w in WIDTHS if w >= width), WIDTHS[-1])
+
+
+def parse_format(value: str | None) -> str:
+    fmt = (value or "jpeg").lower()
+    fmt = FORMAT_ALIASES.get(fmt, fmt)
+    if fmt not in FORMATS:
+        raise VariantError(f"fmt must be one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def render(source: Path, dest: Path, width: int, fmt: str) -> int:
+    """Write source resized to width as fmt to dest (atomically).  Returns its size."""
+    from PIL import Image
+    pil_format, _, _, options = FORMATS[fmt]
+    with metrics.stage("resize"), Image.open(source) as img:
+        height = max(1, round(img.height * width / img.width))
+        img.draft("RGB", (width, height))          # JPEG: decode at the smallest scale ≥ the target
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        if img.width > width:                       # draft output is still ≥ width; finish with Lanczos
+            img = img.resize((width, max(1, round(img.height * width / img.width))), Image.LANCZOS)
+        tmp = dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        img.save(tmp, pil_format, **options)
+    os.replace(tmp, dest)
+    return dest.stat().st_size
+
+
+class VariantCache:
+    """
+    Size-bounded LRU of rendered variants in one directory.  Recency lives in
+    memory; on startup the existing files are loaded oldest-mtime first.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.size      = 0
+        self._lock     = threading.Lock()
+        self._entries: OrderedDict[str, int]   = OrderedDict()   # file name → bytes, LRU first
+        self._inflight: dict[str, Future]      = {}
+        self.cache_dir.mkdir(exist_ok=True)
+        existing = [e for e in os.scandir(self.cache_dir) if e.is_file() and not e.name.endswith(".tmp")]
+        for e in sorted(existing, key=lambda e: e.stat().st_mtime):
+            self._entries[e.name] = e.stat().st_size           # DirEntry caches its stat()
+            self.size += e.stat().st_size
+        with self._lock:
+            self._evict()
+
+    def get(self, source: Path, source_hash: str, width: int, fmt: str) -> Path:
+        """Path of the variant, rendering it (once, however many callers ask) if needed."""
+        return self._lookup(source, source_hash, width, fmt, lambda path: path if path.exists() else None)
+
+    def open(self, source: Path, source_hash: str, width: int, fmt: str):
+        """
+        The variant opened for reading, rendering it if needed.  It is opened
+        under the lock, so _evict() can't delete it between lookup and open;
+        once open, a later eviction no longer matters.
+        """
+        def opener(path):
+            try:
+                return open(path, "rb")
+            except FileNotFoundError:
+                return None
+        return self._lookup(source, source_hash, width, fmt, opener)
+
+    def _lookup(self, source: Path, source_hash: str, width: int, fmt: str, use):
+        """use(path) under the lock once the variant is cached; None from use means it's gone."""
+        name   = f"{source.stem}.{source_hash}.w{width}{FORMATS[fmt][1]}"
+        path   = self.cache_dir / name
+        waited = False
+        while True:
+            with self._lock:
+                if name in self._entries:
+                    result = use(path)
+                    if result is not None:
+                        self._entries.move_to_end(name)
+                        if not waited:
+                            VARIANTS.inc(result="hit")
+                        return result
+                    self.size -= self._entries.pop(name)        # deleted behind our back
+                future = self._inflight.get(name)
+                owner  = future is None
+                if owner:
+                    future = self._inflight[name] = Future()
+            if not owner:
+                if not waited:
+                    VARIANTS.inc(result="wait")
+                waited = True
+                future.result()
+                continue                                        # now cached, unless already evicted
+
+            VARIANTS.inc(result="render")
+            try:
+                size = render(source, path, width, fmt)
+            except BaseException as exc:
+                with self._lock:
+                    self._inflight.pop(name, None)
+                future.set_exception(exc)
+                raise
+            with self._lock:
+                self._inflight.pop(name, None)
+                self._entries[name] = size
+                self.size += size
+                self._evict(keep=name)
+                result = use(path)
+            future.set_result(path)
+            if result is not None:
+                return result
+
+    def _evict(self, keep: str | None = None) -> None:
+        while self.size > self.max_bytes and self._entries:
+            name, size = next(iter(self._entries.items()))
+            if name == keep:
+                break
+            del self._entries[name]
+            self.size -= size
+            try:
+                os.unlink(self.cache_dir / name)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self.cache_dir.mkdir(exist_ok=True)
+            self._entries.clear()
+            self.size = 0
+
+
+# ── Shared cache ─────────────────────────────────────────────────────────────
+
+_lock   = threading.Lock()
+_shared: dict = {"cache": None}
+
+
+def get_cache() -> VariantCache:
+    with _lock:
+        if _shared["cache"] is None:
+            _shared["cache"] = VariantCache()
+            metrics.METRICS.gauge("image_cache_bytes", "Bytes of rendered image variants on disk") \
+                .set_function(lambda: _shared["cache"].size)
+        return _shared["cache"]
+
+
+def _variant(slug: str, width: str | int | None, fmt: str | None, lookup):
+    """(Variant, lookup(cache, source, hash, width, fmt)) for images/<slug>.jpg, or None."""
+    width, fmt = snap_width(width), parse_format(fmt)
+    manifest   = get_manifest()
+    logical    = f"images/{slug}.jpg"
+    entry      = manifest.assets.get(logical)
+    if entry is None:
+        return None
+    result = lookup(get_cache(), manifest.root / logical, entry["hash"], width, fmt)
+    path   = result if isinstance(result, Path) else Path(result.name)
+    return Variant(path, FORMATS[fmt][2], entry["hash"]), result
+
+
+def get_variant(slug: str, width: str | int | None, fmt: str | None) -> Variant | None:
+    """The variant of images/<slug>.jpg, or None if there's no such image."""
+    found = _variant(slug, width, fmt, VariantCache.get)
+    return found and found[0]
+
+
+def open_variant(slug: str, width: str | int | None, fmt: str | None):
+    """
+    (Variant, its file opened for reading), or None if there's no such image.
+    server.py sends the open file, which an eviction can't delete from under it.
+    """
+    return _variant(slug, width, fmt, VariantCache.open)
+
+
+def image_slugs(manifest) -> list[str]:
+    return sorted(Path(logical).stem for logical in manifest.assets if logical.startswith("images/"))
+
+
+def warm(widths=WARM_WIDTHS, formats=("webp",)) -> int:
+    """Render every image's variants at widths × formats.  Returns how many there are."""
+    slugs = image_slugs(get_manifest())
+    for fmt in formats:
+        for width in widths:
+            for slug in slugs:
+                get_variant(slug, width, fmt)
+    return len(slugs) * len(widths) * len(formats)
+
+
+def variant_base(slug: str, manifest) -> str | None:
+    """/img/<slug>?v=<source hash>: add &w= and &fmt=.  With v current, it's served as immutable."""
+    entry = manifest.assets.get(f"images/{slug}.jpg")
+    return f"/img/{slug}?v={entry['hash']}" if entry else None
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Render resized WebP / JPEG variants of the breed images")
+    ap.add_argument("--widths", default="320", help=f"Comma-separated widths, snapped to {WIDTHS} (default 320)")
+    ap.add_argument("--fmt",    default="webp", help="Comma-separated formats: webp, jpeg (default webp)")
+    ap.add_argument("--clear",  action="store_true", help="Delete every cached variant and exit")
+    args = ap.parse_args()
+
+    cache = get_cache()
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {CACHE_DIR.name}/")
+        return
+
+    try:
+        widths  = sorted({snap_width(w) for w in args.widths.split(",")})
+        formats = [parse_format(f) for f in args.fmt.split(",")]
+    except VariantError as exc:
+        ap.error(str(exc))
+    slugs = image_slugs(get_manifest())
+
+    for fmt in formats:
+        for width in widths:
+            t0 = time.perf_counter()
+            original = derived = 0
+            for slug in slugs:
+                variant   = get_variant(slug, width, fmt)
+                original += (ROOT / "images" / f"{slug}.jpg").stat().st_size
+                derived  += variant.path.stat().st_size
+            print(f"  {fmt:4s} w={width:<5d} {len(slugs)} images  {original / 1e6:6.1f} MB → "
+                  f"{derived / 1e6:5.2f} MB  ({original / max(derived, 1):.0f}× smaller)  "
+                  f"{time.perf_counter() - t0:.2f}s")
+    print(f"{CACHE_DIR.name}/: {cache.size / 2**20:.1f} MiB of {cache.max_bytes >> 20} MiB")
+
+
+if __name__ == "__main__":
+    main()
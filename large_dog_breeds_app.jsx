@@ -1,8 +1,32 @@
 import { useState, useEffect, useMemo, useRef } from "react";
 
 const DATA_URL    = "large_dog_breeds.json";
+const API_URL     = "/api/breeds";    // same data plus fingerprinted image_url (server.py only)
 const RATINGS_URL = "breed_ratings.json";
 
+// Prefer the API so images get immutable, cache-forever URLs; a plain static
+// server (python -m http.server) only has the JSON file.  Resolves to
+// { breeds, version }; version (for ?since= and /api/events) is null without
+// the API.
+const loadBreeds = () =>
+  fetch(API_URL)
+    .then(r => r.ok
+      ? r.json().then(breeds => ({ breeds, version: Number(r.headers.get("X-Breeds-Version")) || null }))
+      : Promise.reject(r.status))
+    .catch(() => fetch(DATA_URL).then(r => r.json()).then(breeds => ({ breeds, version: null })));
+
+const breedKey = b => b.dogtime_slug || b.name;
+
+const imageSrc = b => b.image_url || `images/${b.dogtime_slug}.jpg`;
+
+// Resized WebP variants from server.py's /img/ endpoint, as a srcSet over
+// the given widths; without the API the full-size image stands in.
+const thumbProps = (b, widths, sizes) => b.thumb_url
+  ? { src:    `${b.thumb_url}&w=${widths[0]}&fmt=webp`,
+      srcSet: widths.map(w => `${b.thumb_url}&w=${w}&fmt=webp ${w}w`).join(", "),
+      sizes }
+  : { src: imageSrc(b) };
+
 const INLINE_DATA = [{"name":"Great Dane","origin":"Germany","weight_lbs":{"min":110,"max":175},"height_in":{"min":28,"max":32},"lifespan_yrs":{"min":7,"max":10},"temperament":["Friendly","Patient","Gentle"],"purpose":["Guardian","Companion"],"grooming":"Low","exercise":"Moderate","good_with_kids":true,"good_with_dogs":true,"coat":"Short, smooth","shedding":"Moderate","trainability":"Easy","health_notes":"Prone to bloat (GDV), hip dysplasia, heart disease","color":"#c8a96e"},{"name":"Irish Wolfhound","origin":"Ireland","weight_lbs":{"min":105,"max":120},"height_in":{"min":30,"max":35},"lifespan_yrs":{"min":6,"max":8},"temperament":["Dignified","Calm","Loyal"],"purpose":["Hunter","Companion"],"grooming":"Moderate","exercise":"Moderate","good_with_kids":true,"good_with_dogs":true,"coat":"Rough, wiry","shedding":"Low","trainability":"Moderate","health_notes":"Prone to hip dysplasia, GDV, heart disease","color":"#8b9e7a"},{"name":"Saint Bernard","origin":"Switzerland","weight_lbs":{"min":120,"max":180},"height_in":{"min":26,"max":30},"lifespan_yrs":{"min":8,"max":10},"temperament":["Playful","Charming","Gentle"],"purpose":["Rescue","Companion"],"grooming":"High","exercise":"Moderate","good_with_kids":true,"good_with_dogs":true,"coat":"Dense, smooth or rough","shedding":"High","trainability":"Moderate","health_notes":"Hip/elbow dysplasia, heart disease, drools heavily","color":"#c77b3a"},{"name":"Mastiff","origin":"England","weight_lbs":{"min":120,"max":230},"height_in":{"min":27,"max":30},"lifespan_yrs":{"min":6,"max":10},"temperament":["Courageous","Dignified","Docile"],"purpose":["Guardian"],"grooming":"Low","exercise":"Low","good_with_kids":true,"good_with_dogs":false,"coat":"Short, straight","shedding":"Moderate","trainability":"Moderate","health_notes":"Hip dysplasia, bloat, progressive retinal atrophy","color":"#b07840"},{"name":"Newfoundland","origin":"Canada","weight_lbs":{"min":100,"max":150},"height_in":{"min":26,"max":28},"lifespan_yrs":{"min":9,"max":10},"temperament":["Sweet","Patient","Devoted"],"purpose":["Water Rescue","Companion"],"grooming":"High","exercise":"Moderate","good_with_kids":true,"good_with_dogs":true,"coat":"Thick, oily double coat","shedding":"High","trainability":"Easy","health_notes":"Hip/elbow dysplasia, heart disease (SAS)","color":"#3a3a3a"},{"name":"Bernese Mountain Dog","origin":"Switzerland","weight_lbs":{"min":70,"max":115},"height_in":{"min":23,"max":27.5},"lifespan_yrs":{"min":7,"max":10},"temperament":["Affectionate","Loyal","Intelligent"],"purpose":["Farm","Draft","Companion"],"grooming":"High","exercise":"Moderate","good_with_kids":true,"good_with_dogs":true,"coat":"Thick, tri-color double coat","shedding":"High","trainability":"Easy","health_notes":"Cancer-prone, hip/elbow dysplasia, bloat","color":"#2c2c2c"},{"name":"Leonberger","origin":"Germany","weight_lbs":{"min":90,"max":170},"height_in":{"min":25,"max":31.5},"lifespan_yrs":{"min":7,"max":7},"temperament":["Gentle","Playful","Obedient"],"purpose":["Companion","Draft"],"grooming":"High","exercise":"High","good_with_kids":true,"good_with_dogs":true,"coat":"Long, lion-like mane","shedding":"High","trainability":"Moderate","health_notes":"Joint problems, heart disease, polyneuropathy","color":"#c4a062"},{"name":"Rottweiler","origin":"Germany","weight_lbs":{"min":80,"max":135},"height_in":{"min":22,"max":27},"lifespan_yrs":{"min":9,"max":10},"temperament":["Loyal","Confident","Courageous"],"purpose":["Guard","Police","Companion"],"grooming":"Low","exercise":"High","good_with_kids":true,"good_with_dogs":false,"coat":"Short, dense double coat","shedding":"Moderate","trainability":"Easy","health_notes":"Hip/elbow dysplasia, aortic stenosis, osteosarcoma","color":"#2a2a1a"},{"name":"German Shepherd","origin":"Germany","weight_lbs":{"min":50,"max":90},"height_in":{"min":22,"max":26},"lifespan_yrs":{"min":9,"max":13},"temperament":["Intelligent","Loyal","Obedient"],"purpose":["Police","Military","Companion"],"grooming":"Moderate","exercise":"High","good_with_kids":true,"good_with_dogs":true,"coat":"Medium double coat","shedding":"High","trainability":"Very Easy","health_notes":"Hip dysplasia, degenerative myelopathy, bloat","color":"#8b6914"},{"name":"Labrador Retriever","origin":"Canada","weight_lbs":{"min":55,"max":80},"height_in":{"min":21.5,"max":24.5},"lifespan_yrs":{"min":10,"max":12},"temperament":["Friendly","Active","Outgoing"],"purpose":["Hunting","Guide","Companion"],"grooming":"Low","exercise":"High","good_with_kids":true,"good_with_dogs":true,"coat":"Short, dense double coat","shedding":"High","trainability":"Very Easy","health_notes":"Hip/elbow dysplasia, obesity-prone, eye conditions","color":"#c8a96e"},{"name":"Golden Retriever","origin":"Scotland","weight_lbs":{"min":55,"max":75},"height_in":{"min":21.5,"max":24},"lifespan_yrs":{"min":10,"max":12},"temperament":["Reliable","Trustworthy","Friendly"],"purpose":["Hunting","Guide","Companion"],"grooming":"Moderate","exercise":"High","good_with_kids":true,"good_with_dogs":true,"coat":"Dense golden double coat","shedding":"High","trainability":"Very Easy","health_notes":"Cancer-prone, hip dysplasia, heart disease","color":"#d4a843"},{"name":"Doberman Pinscher","origin":"Germany","weight_lbs":{"min":60,"max":100},"height_in":{"min":24,"max":28},"lifespan_yrs":{"min":10,"max":12},"temperament":["Alert","Loyal","Fearless"],"purpose":["Guard","Police"],"grooming":"Low","exercise":"High","good_with_kids":true,"good_with_dogs":false,"coat":"Short, sleek","shedding":"Low","trainability":"Very Easy","health_notes":"Cardiomyopathy, von Willebrand's disease, wobbler syndrome","color":"#1a1a2e"},{"name":"Anatolian Shepherd","origin":"Turkey","weight_lbs":{"min":80,"max":150},"height_in":{"min":27,"max":29},"lifespan_yrs":{"min":11,"max":13},"temperament":["Independent","Loyal","Reserved"],"purpose":["Livestock Guardian"],"grooming":"Moderate","exercise":"Moderate","good_with_kids":false,"good_with_dogs":false,"coat":"Short or rough double coat","shedding":"High","trainability":"Hard","health_notes":"Hip dysplasia, entropion (eye condition)","color":"#b09060"},{"name":"Cane Corso","origin":"Italy","weight_lbs":{"min":88,"max":110},"height_in":{"min":23.5,"max":27.5},"lifespan_yrs":{"min":9,"max":12},"temperament":["Majestic","Loyal","Protective"],"purpose":["Guardian","Companion"],"grooming":"Low","exercise":"High","good_with_kids":true,"good_with_dogs":false,"coat":"Short, stiff","shedding":"Moderate","trainability":"Moderate","health_notes":"Hip dysplasia, gastric torsion, eye conditions","color":"#2d3436"},{"name":"Bullmastiff","origin":"England","weight_lbs":{"min":100,"max":130},"height_in":{"min":24,"max":27},"lifespan_yrs":{"min":7,"max":9},"temperament":["Affectionate","Reliable","Brave"],"purpose":["Guardian"],"grooming":"Low","exercise":"Moderate","good_with_kids":true,"good_with_dogs":false,"coat":"Short, dense","shedding":"Moderate","trainability":"Moderate","health_notes":"Hip/elbow dysplasia, subaortic valvular stenosis, cancer","color":"#c07840"},{"name":"Alaskan Malamute","origin":"USA (Alaska)","weight_lbs":{"min":75,"max":85},"height_in":{"min":23,"max":25},"lifespan_yrs":{"min":10,"max":14},"temperament":["Playful","Affectionate","Dignified"],"purpose":["Sled","Pack"],"grooming":"High","exercise":"High","good_with_kids":true,"good_with_dogs":false,"coat":"Thick double coat","shedding":"High","trainability":"Hard","health_notes":"Hip dysplasia, inherited polyneuropathy, day blindness","color":"#6e7f80"},{"name":"Akita","origin":"Japan","weight_lbs":{"min":70,"max":130},"height_in":{"min":24,"max":28},"lifespan_yrs":{"min":10,"max":13},"temperament":["Loyal","Courageous","Dignified"],"purpose":["Guardian","Hunter"],"grooming":"High","exercise":"Moderate","good_with_kids":false,"good_with_dogs":false,"coat":"Thick double coat","shedding":"High","trainability":"Hard","health_notes":"Hip dysplasia, autoimmune disorders, hypothyroidism","color":"#c87941"},{"name":"Bloodhound","origin":"Belgium/France","weight_lbs":{"min":80,"max":110},"height_in":{"min":23,"max":27},"lifespan_yrs":{"min":10,"max":12},"temperament":["Tenacious","Gentle","Affectionate"],"purpose":["Tracking","Search & Rescue"],"grooming":"Low","exercise":"High","good_with_kids":true,"good_with_dogs":true,"coat":"Short, loose skin","shedding":"Moderate","trainability":"Hard","health_notes":"Hip/elbow dysplasia, bloat, ear infections","color":"#7b4e2d"},{"name":"Dogue de Bordeaux","origin":"France","weight_lbs":{"min":99,"max":140},"height_in":{"min":23,"max":26},"lifespan_yrs":{"min":5,"max":8},"temperament":["Affectionate","Loyal","Stubborn"],"purpose":["Guardian","Draft"],"grooming":"Low","exercise":"Moderate","good_with_kids":true,"good_with_dogs":false,"coat":"Short, fine","shedding":"Moderate","trainability":"Moderate","health_notes":"Brachycephalic issues, hip dysplasia, heart disease, heavy drooling","color":"#b5622a"},{"name":"Boxer","origin":"Germany","weight_lbs":{"min":50,"max":80},"height_in":{"min":21.5,"max":25},"lifespan_yrs":{"min":10,"max":12},"temperament":["Playful","Loyal","Energetic"],"purpose":["Guard","Companion"],"grooming":"Low","exercise":"High","good_with_kids":true,"good_with_dogs":true,"coat":"Short, shiny","shedding":"Low","trainability":"Moderate","health_notes":"Brachycephalic issues, heart conditions, cancer-prone","color":"#c8854d"},{"name":"Weimaraner","origin":"Germany","weight_lbs":{"min":55,"max":90},"height_in":{"min":23,"max":27},"lifespan_yrs":{"min":10,"max":13},"temperament":["Friendly","Fearless","Obedient"],"purpose":["Hunting","Companion"],"grooming":"Low","exercise":"High","good_with_kids":true,"good_with_dogs":true,"coat":"Short, sleek silver-grey","shedding":"Low","trainability":"Moderate","health_notes":"Bloat, hip dysplasia, von Willebrand's disease","color":"#9aabb0"},{"name":"Rhodesian Ridgeback","origin":"Zimbabwe","weight_lbs":{"min":70,"max":85},"height_in":{"min":24,"max":27},"lifespan_yrs":{"min":10,"max":12},"temperament":["Loyal","Strong-willed","Mischievous"],"purpose":["Hunting","Guardian"],"grooming":"Low","exercise":"High","good_with_kids":true,"good_with_dogs":false,"coat":"Short, dense with distinctive ridge","shedding":"Low","trainability":"Moderate","health_notes":"Hip dysplasia, dermoid sinus, hypothyroidism","color":"#b5713a"},{"name":"Greater Swiss Mountain Dog","origin":"Switzerland","weight_lbs":{"min":85,"max":140},"height_in":{"min":23.5,"max":28.5},"lifespan_yrs":{"min":8,"max":11},"temperament":["Bold","Faithful","Enthusiastic"],"purpose":["Draft","Herding","Guardian"],"grooming":"Low","exercise":"Moderate","good_with_kids":true,"good_with_dogs":true,"coat":"Short tri-color double coat","shedding":"Moderate","trainability":"Easy","health_notes":"Hip/elbow dysplasia, bloat, splenic torsion","color":"#2a2a2a"},{"name":"Black Russian Terrier","origin":"Russia","weight_lbs":{"min":80,"max":130},"height_in":{"min":26,"max":30},"lifespan_yrs":{"min":10,"max":12},"temperament":["Confident","Calm","Intelligent"],"purpose":["Guardian","Military"],"grooming":"High","exercise":"High","good_with_kids":true,"good_with_dogs":false,"coat":"Thick, wavy double coat","shedding":"Low","trainability":"Easy","health_notes":"Hip/elbow dysplasia, JLPP (neurological condition), progressive retinal atrophy","color":"#111827"},{"name":"Boerboel","origin":"South Africa","weight_lbs":{"min":150,"max":200},"height_in":{"min":22,"max":27},"lifespan_yrs":{"min":9,"max":11},"temperament":["Dominant","Intelligent","Loyal"],"purpose":["Farm Guardian","Companion"],"grooming":"Low","exercise":"Moderate","good_with_kids":true,"good_with_dogs":false,"coat":"Short, dense","shedding":"Moderate","trainability":"Moderate","health_notes":"Hip/elbow dysplasia, ectropion, vaginal hyperplasia","color":"#8b6340"},{"name":"Great Pyrenees","origin":"France/Spain","weight_lbs":{"min":85,"max":115},"height_in":{"min":25,"max":32},"lifespan_yrs":{"min":10,"max":12},"temperament":["Gentle","Patient","Strong-willed"],"purpose":["Livestock Guardian","Companion"],"grooming":"High","exercise":"Moderate","good_with_kids":true,"good_with_dogs":true,"coat":"Thick white double coat","shedding":"High","trainability":"Hard","health_notes":"Hip dysplasia, bloat, bone cancer","color":"#e8e0d0"}];
 
 const LEVEL       = { Low: 0, Moderate: 1, High: 2, "Very Easy": 0, Easy: 1, Hard: 3 };
@@ -295,6 +319,7 @@ export default function App() {
   // Remove breed modal state
   const [removeTarget, setRemoveTarget] = useState(null);  // null | breed object
   const [removeStatus, setRemoveStatus] = useState(null);  // null | "loading" | {ok, ...}
+  const [jobProgress, setJobProgress]   = useState("");    // latest message from a running add/remove job
 
   // Row selection & export
   const [selectedRows,   setSelectedRows]   = useState(new Set());
@@ -326,14 +351,68 @@ export default function App() {
     new Set(["coat", "temperament", "rat_adaptability", "rat_friendliness", "rat_health", "rat_trainability", "rat_exercise"])
   );
   const rangesInited = useRef(false);
+  const dataVersion  = useRef(null);
 
   useEffect(() => {
-    fetch(DATA_URL)
-      .then(r => r.json())
-      .then(data => { setBreeds(data); setLoading(false); })
+    loadBreeds()
+      .then(({ breeds, version }) => { setBreeds(breeds); dataVersion.current = version; setLoading(false); })
       .catch(() => { setBreeds(INLINE_DATA); setLoading(false); });
   }, []);
 
+  // Apply per-breed upserts / deletes from the server's change feed
+  const applyChanges = changes => {
+    if (!changes.length) return;
+    setBreeds(prev => {
+      const byKey = new Map(prev.map(b => [breedKey(b), b]));
+      for (const c of changes) c.op === "delete" ? byKey.delete(c.slug) : byKey.set(c.slug, c.breed);
+      return [...byKey.values()];
+    });
+    setRatingsData(prev => {
+      const next = { ...(prev || {}) };
+      for (const c of changes) {
+        if (c.op === "delete" || !c.ratings) delete next[c.slug];
+        else next[c.slug] = c.ratings;
+      }
+      return next;
+    });
+  };
+
+  // Fetch only what changed since the version we hold (everything if that's too old)
+  const syncChanges = () => {
+    if (dataVersion.current == null) return Promise.resolve();
+    return fetch(`${API_URL}?since=${dataVersion.current}`)
+      .then(r => r.json())
+      .then(d => {
+        if (!d.ok) return;
+        if (d.full) { setBreeds(d.breeds); setRatingsData(d.ratings); }
+        else applyChanges(d.changes);
+        dataVersion.current = d.version;
+      })
+      .catch(() => {});
+  };
+
+  // Live updates from other tabs / CLI edits.  A plain static server has no
+  // /api/events; EventSource then fails once and stays closed.
+  useEffect(() => {
+    if (typeof EventSource === "undefined") return;
+    const events = new EventSource("/api/events");
+    events.addEventListener("ready", e => {
+      const { version } = JSON.parse(e.data);
+      if (dataVersion.current != null && version > dataVersion.current) syncChanges();
+    });
+    events.addEventListener("change", e => {
+      const c = JSON.parse(e.data);
+      if (dataVersion.current != null && c.version <= dataVersion.current) return;
+      applyChanges([c]);
+      dataVersion.current = c.version;
+    });
+    events.addEventListener("reset", () => {
+      dataVersion.current = -1;          // older than any retained version → full reload
+      syncChanges();
+    });
+    return () => events.close();
+  }, []);
+
   useEffect(() => {
     fetch(RATINGS_URL)
       .then(r => r.json())
@@ -459,26 +538,43 @@ export default function App() {
   const activeCount = (field) => (activeFilters[field] || new Set()).size;
   const rangeActive = (range, dataRange) => range[0] > dataRange[0] || range[1] < dataRange[1];
 
+  // Add/remove run as background jobs on the local API server: the POST
+  // returns 202 with a job, which is polled until it finishes.  Resolves to
+  // the job's result ({ok, ...}), or to the error body if it was refused.
+  const runJob = async (url, body) => {
+    const resp = await fetch(url, {
+      method:  "POST",
+      headers: { "Content-Type": "application/json" },
+      body:    JSON.stringify(body),
+    });
+    const data = await resp.json();
+    if (resp.status !== 202) return data;
+    let job = data.job;
+    while (job.status === "queued" || job.status === "running") {
+      setJobProgress(job.status === "queued"
+        ? `Queued${job.position ? ` (${job.position} ahead)` : ""}…`
+        : job.progress?.message || "Working…");
+      await new Promise(r => setTimeout(r, 1000));
+      job = await (await fetch(`/api/jobs/${job.id}`)).json();
+    }
+    setJobProgress("");
+    return job.result;
+  };
+
   // Add breed: POST to local API server
   const handleAddBreed = async () => {
     const name = addInput.trim();
     if (!name) return;
     setAddStatus("loading");
     try {
-      const resp = await fetch("/api/add-breed", {
-        method:  "POST",
-        headers: { "Content-Type": "application/json" },
-        body:    JSON.stringify({ name }),
-      });
-      const data = await resp.json();
+      const data = await runJob("/api/add-breed", { name });
       setAddStatus(data);
       if (data.ok) {
-        // Reload breeds list
-        fetch(DATA_URL).then(r => r.json()).then(setBreeds).catch(() => {});
-        fetch(RATINGS_URL).then(r => r.json()).then(setRatingsData).catch(() => {});
+        syncChanges();
         setAddInput("");
       }
     } catch {
+      setJobProgress("");
       setAddStatus({
         ok:    false,
         error: "Could not reach the API. Make sure you are running server.py (not python -m http.server).",
@@ -491,18 +587,11 @@ export default function App() {
     if (!removeTarget) return;
     setRemoveStatus("loading");
     try {
-      const resp = await fetch("/api/remove-breed", {
-        method:  "POST",
-        headers: { "Content-Type": "application/json" },
-        body:    JSON.stringify({ name: removeTarget.name }),
-      });
-      const data = await resp.json();
+      const data = await runJob("/api/remove-breed", { name: removeTarget.name });
       setRemoveStatus(data);
-      if (data.ok) {
-        fetch(DATA_URL).then(r => r.json()).then(setBreeds).catch(() => {});
-        fetch(RATINGS_URL).then(r => r.json()).then(setRatingsData).catch(() => {});
-      }
+      if (data.ok) syncChanges();
     } catch {
+      setJobProgress("");
       setRemoveStatus({
         ok:    false,
         error: "Could not reach the API. Make sure you are running server.py.",
@@ -660,6 +749,9 @@ export default function App() {
                 {addStatus === "loading" ? "Adding…" : "Add"}
               </button>
             </div>
+            {addStatus === "loading" && jobProgress && (
+              <div style={{ fontSize: "0.7rem", color: "#888", marginBottom: "0.8rem" }}>{jobProgress}</div>
+            )}
 
             {/* Result area */}
             {addStatus && addStatus !== "loading" && (
@@ -735,6 +827,9 @@ export default function App() {
                     )}
                   </div>
                 )}
+                {removeStatus === "loading" && jobProgress && (
+                  <div style={{ fontSize: "0.7rem", color: "#888", marginBottom: "0.8rem" }}>{jobProgress}</div>
+                )}
                 <div style={{ display: "flex", gap: "0.6rem" }}>
                   <button onClick={handleRemoveBreed}
                     disabled={removeStatus === "loading"}
@@ -757,7 +852,7 @@ export default function App() {
       {photoModal && (
         <div onClick={() => setPhotoModal(null)}
           style={{ position: "fixed", inset: 0, background: "rgba(0,0,0,0.88)", zIndex: 100, display: "flex", flexDirection: "column", alignItems: "center", justifyContent: "center", cursor: "zoom-out" }}>
-          <img src={`images/${photoModal.dogtime_slug}.jpg`} alt={photoModal.name}
+          <img src={imageSrc(photoModal)} alt={photoModal.name}
             onClick={e => e.stopPropagation()}
             style={{ maxWidth: "80vw", maxHeight: "78vh", objectFit: "contain", boxShadow: "0 0 60px rgba(0,0,0,0.8)", cursor: "default" }}
             onError={e => { e.target.style.display = "none"; }} />
@@ -1174,7 +1269,7 @@ export default function App() {
                               style={{ accentColor: "#c8a96e", cursor: "pointer", width: 13, height: 13 }} />
                           </td>
                           <td style={{ padding: "0.3rem 0.5rem", position: "sticky", left: 0, zIndex: 4, background: rowBg }}>
-                            <img src={`images/${b.dogtime_slug}.jpg`} alt={b.name}
+                            <img {...thumbProps(b, [160], "48px")} alt={b.name} loading="lazy"
                               onClick={() => setPhotoModal(b)}
                               style={{ width: 48, height: 36, objectFit: "cover", display: "block", cursor: "zoom-in" }}
                               onError={e => { e.target.style.display = "none"; }} />
@@ -1245,8 +1340,8 @@ export default function App() {
             <div style={{ display: "grid", gridTemplateColumns: "repeat(auto-fill, minmax(280px, 1fr))", gap: "1rem" }}>
               {filtered.map(b => (
                 <div key={b.name} style={{ background: "#111", border: "1px solid #1e1e1e", padding: "1.1rem 1.2rem" }}>
-                  <img src={`images/${b.dogtime_slug}.jpg`} alt={b.name}
-                    onClick={() => setPhotoModal(b)}
+                  <img {...thumbProps(b, [320, 480, 640, 960], "(max-width: 640px) 100vw, 360px")} alt={b.name}
+                    loading="lazy" onClick={() => setPhotoModal(b)}
                     style={{ width: "100%", height: 140, objectFit: "cover", marginBottom: "0.8rem", cursor: "zoom-in" }}
                     onError={e => { e.target.style.display = "none"; }} />
                   <div style={{ display: "flex", justifyContent: "space-between", alignItems: "flex-start", marginBottom: "0.5rem" }}>
@@ -19,8 +19,11 @@ Usage:
 
 import argparse
 import json
+import os
 from pathlib import Path
 
+from trait_registry import REGISTRY
+
 IN_DIR   = Path(__file__).parent / "breed_details"
 OUT_FILE = Path(__file__).parent / "breed_ratings.json"
 
@@ -39,18 +42,21 @@ def main():
     for f in files:
         data = json.loads(f.read_text())
         slug = data["slug"]
-        flat = {}
-        for cat_traits in data["ratings"].values():
-            flat.update(cat_traits)
+        flat = REGISTRY.flatten(data["ratings"])   # {trait_id: stars}
         merged[slug] = flat
         print(f"  {slug}: {len(flat)} traits")
 
     print(f"\nTotal: {len(merged)} breeds")
 
+    # Back to names, in trait-ID order, for the JSON consumers
+    merged = {slug: REGISTRY.names(flat) for slug, flat in merged.items()}
+
     if args.dry_run:
         print(json.dumps(merged, indent=2, ensure_ascii=False))
     else:
-        OUT_FILE.write_text(json.dumps(merged, indent=2, ensure_ascii=False))
+        tmp = OUT_FILE.with_suffix(".tmp")      # rename into place: readers never see a partial file
+        tmp.write_text(json.dumps(merged, indent=2, ensure_ascii=False))
+        os.replace(tmp, OUT_FILE)
         print(f"Written: {OUT_FILE}")
 
 
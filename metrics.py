@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+metrics.py — in-process counters, gauges and latency histograms.
+
+A dependency-free metrics registry in the Prometheus data model.  server.py
+exposes it at GET /metrics in the Prometheus text format, and the pipeline
+CLIs can dump it as JSON on exit.  What's recorded:
+
+  http_requests_total{route, method, status}      server.py, per response
+  http_request_duration_seconds{route}             histogram
+  http_requests_in_flight                          gauge
+  fetch_requests_total{host, status}               every DogTime / image GET
+  fetch_duration_seconds{host}                     histogram
+  pipeline_stage_seconds{stage}                    fetch, parse, write, merge, score, index, analysis
+
+Routes are normalized to keep label sets small: "/api/jobs/:id",
+"/images/*", and "unmatched" for any 404.  Each metric has one lock, and
+recording is a dict update under it, cheap enough for every request.
+
+Usage:
+    METRICS_JSON=metrics.json python add_breed.py 'Samoyed'    # any script, via the environment
+    python add_breed.py 'Samoyed' --metrics-json metrics.json   # CLIs with the flag
+    python metrics.py metrics.json                              # print a dump in the /metrics text format
+
+As a callable module:
+    import metrics
+    with metrics.stage("parse"):
+        ...
+    metrics.record_fetch(url, resp.status_code, seconds)
+    text = metrics.METRICS.render()
+"""
+
+import argparse
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a cached API hit (~1 ms) to a slow DogTime fetch with retries
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# ── Metric types ─────────────────────────────────────────────────────────────
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name   = name
+        self.help   = help
+        self.labels = tuple(labels)
+        self._lock  = threading.Lock()
+        self._values: dict[tuple, object] = {}
+        self._fn    = None
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple(labels[n] for n in self.labels)
+
+    def set_function(self, fn) -> None:
+        """Read the (unlabelled) value from fn() at collection time instead."""
+        self._fn = fn
+
+    def samples(self) -> list[tuple[tuple, object]]:
+        if self._fn is not None:
+            return [((), self._fn())]
+        with self._lock:
+            return sorted(self._values.items(), key=lambda kv: tuple(map(str, kv[0])))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram; each series is [bucket counts..., sum, count]."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def samples(self) -> list[tuple[tuple, object]]:
+        with self._lock:
+            return sorted(((k, list(v)) for k, v in self._values.items()), key=lambda kv: tuple(map(str, kv[0])))
+
+
+# ── Registry ─────────────────────────────────────────────────────────────────
+
+class Registry:
+
+    def __init__(self):
+        self._lock    = threading.Lock()
+        self._metrics: dict[str, Metric] = {}
+
+    def _get(self, cls, name: str, help: str, labels, **kw) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, tuple(labels), **kw)
+            elif not isinstance(metric, cls) or metric.labels != tuple(labels):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}{metric.labels}")
+            return metric
+
+    def counter(self, name: str, help: str, labels=()) -> Counter:
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels=()) -> Gauge:
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str, labels=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for key, value in m.samples():
+                if isinstance(m, Histogram):
+                    cumulative = 0
+                    for bound, n in zip(m.buckets, value):
+                        cumulative += n
+                        le = 'le="' + _number(bound) + '"'
+                        lines.append(f"{m.name}_bucket{_labels(m.labels, key, le)} {cumulative}")
+                    lines.append(f"{m.name}_sum{_labels(m.labels, key)} {_number(value[-2])}")
+                    lines.append(f"{m.name}_count{_labels(m.labels, key)} {value[-1]}")
+                else:
+                    lines.append(f"{m.name}{_labels(m.labels, key)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """
+        JSON-friendly dump: {name: {"type", "help", "samples": [{"labels", ...}]}}.
+        A histogram sample's "buckets" maps each upper bound to the number of
+        observations in that bucket alone; render() makes them cumulative.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        out = {}
+        for m in metrics:
+            samples = []
+            for key, value in m.samples():
+                labels = dict(zip(m.labels, key))
+                if isinstance(m, Histogram):
+                    buckets = {_number(b): n for b, n in zip(m.buckets, value)}
+                    samples.append({"labels": labels, "count": value[-1], "sum": round(value[-2], 6),
+                                    "buckets": buckets})
+                else:
+                    samples.append({"labels": labels, "value": value})
+            out[m.name] = {"type": m.kind, "help": m.help, "samples": samples}
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            for m in self._metrics.values():
+                m.reset()
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "Registry":
+        """A registry holding the values of a snapshot(), e.g. to render() a --metrics-json dump."""
+        registry = cls()
+        kinds    = {"counter": registry.counter, "gauge": registry.gauge}
+        for name, m in snapshot.items():
+            labels = tuple(m["samples"][0]["labels"]) if m["samples"] else ()
+            if m["type"] == "histogram":
+                bounds = [float(b) for b in (m["samples"][0]["buckets"] if m["samples"] else {})
+                          if b != "+Inf"]
+                metric = registry.histogram(name, m["help"], labels, buckets=bounds or DEFAULT_BUCKETS)
+            else:
+                metric = kinds.get(m["type"], registry.gauge)(name, m["help"], labels)
+            for sample in m["samples"]:
+                key = tuple(sample["labels"][n] for n in labels)
+                if m["type"] == "histogram":
+                    metric._values[key] = [*sample["buckets"].values(), sample["sum"], sample["count"]]
+                else:
+                    metric._values[key] = sample["value"]
+        return registry
+
+
+METRICS = Registry()
+
+HTTP_REQUESTS  = METRICS.counter("http_requests_total", "HTTP responses sent", ("route", "method", "status"))
+HTTP_SECONDS   = METRICS.histogram("http_request_duration_seconds", "Time to handle a request", ("route",))
+HTTP_IN_FLIGHT = METRICS.gauge("http_requests_in_flight", "Requests being handled right now")
+FETCHES        = METRICS.counter("fetch_requests_total", "Outbound HTTP GETs", ("host", "status"))
+FETCH_SECONDS  = METRICS.histogram("fetch_duration_seconds", "Outbound HTTP GET latency", ("host",))
+STAGE_SECONDS  = METRICS.histogram("pipeline_stage_seconds", "Time spent per pipeline stage", ("stage",))
+
+
+# ── Recording helpers ────────────────────────────────────────────────────────
+
+def record_fetch(url: str, status, seconds: float) -> None:
+    """One outbound GET: status is the HTTP status code, or "error" for a failure."""
+    host = urlsplit(url).hostname or "unknown"
+    FETCHES.inc(host=host, status=str(status))
+    FETCH_SECONDS.observe(seconds, host=host)
+
+
+def stage(name: str):
+    """Context manager timing one pipeline stage: with stage("merge"): ..."""
+    return STAGE_SECONDS.time(stage=name)
+
+
+# ── JSON dumps for the CLIs ──────────────────────────────────────────────────
+
+def dump_json(path: str | Path) -> None:
+    tmp = Path(path).with_suffix(".tmp")
+    tmp.write_text(json.dumps({"time": time.time(), "metrics": METRICS.snapshot()}, indent=1))
+    os.replace(tmp, path)
+
+
+_dump_paths: set[str] = set()
+
+
+def dump_at_exit(path: str | Path | None) -> None:
+    """Write the registry to path as JSON when the process exits (no-op for None)."""
+    if path and str(path) not in _dump_paths:
+        _dump_paths.add(str(path))
+        atexit.register(dump_json, path)
+
+
+def add_argument(ap: argparse.ArgumentParser) -> None:
+    """Give a CLI the --metrics-json PATH flag; pair with dump_at_exit(args.metrics_json)."""
+    ap.add_argument("--metrics-json", metavar="PATH",
+                    help="Write counters and stage timings as JSON to PATH on exit")
+
+
+dump_at_exit(os.environ.get("METRICS_JSON"))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Print a --metrics-json dump in Prometheus text format")
+    ap.add_argument("dump", help="JSON file written by --metrics-json / METRICS_JSON")
+    args = ap.parse_args()
+
+    snapshot = json.loads(Path(args.dump).read_text())["metrics"]
+    print(Registry.from_snapshot(snapshot).render(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+models.py — typed, compact records for breeds and star ratings.
+
+The JSON files stay the interchange format; these classes are what the Python
+side works with in memory:
+
+  Range     slotted (min, max) pair replacing {"min": ..., "max": ...} dicts
+  Breed     slotted record for one large_dog_breeds.json entry
+  Ratings   fixed-layout vector of star ratings indexed by trait ID, replacing
+            the {trait_name: stars} dicts from breed_ratings.json
+
+Trait IDs come from trait_registry.REGISTRY (criteria_schema.json order), so
+slot i of a Ratings vector is trait ID i.
+
+Usage:
+    python models.py --bench 100000    # tracemalloc: dicts vs models at N synthetic breeds
+
+As a callable module:
+    from models import Breed, Ratings, load_breeds, load_ratings
+    breeds  = load_breeds()                    # list[Breed]
+    ratings = load_ratings()                   # {slug: Ratings}
+    breeds[0].weight_lbs.mid
+"""
+
+import argparse
+import json
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from trait_registry import REGISTRY
+
+ROOT         = Path(__file__).parent
+BREEDS_FILE  = ROOT / "large_dog_breeds.json"
+RATINGS_FILE = ROOT / "breed_ratings.json"
+
+MISSING = -1   # stored in a Ratings slot when the trait was not scraped
+
+# The vector layout covers the schema traits; IDs come from trait_registry.
+TRAIT_NAMES: tuple[str, ...] = tuple(REGISTRY.trait_names[:REGISTRY.n_schema_traits])
+TRAIT_ID: dict[str, int]     = {name: i for i, name in enumerate(TRAIT_NAMES)}
+
+
+# ── Range ─────────────────────────────────────────────────────────────────────
+
+@dataclass(slots=True)
+class Range:
+    min: float
+    max: float
+
+    @property
+    def mid(self) -> float:
+        return (self.min + self.max) / 2
+
+    @property
+    def is_placeholder(self) -> bool:
+        return self.min == 0 and self.max == 0
+
+    @classmethod
+    def from_dict(cls, d: dict | None) -> "Range":
+        if not d:
+            return cls(0, 0)
+        return cls(d.get("min", 0), d.get("max", 0))
+
+    def to_dict(self) -> dict:
+        return {"min": self.min, "max": self.max}
+
+
+# ── Breed ─────────────────────────────────────────────────────────────────────
+
+# Optional keys are written only when set, so entries without them round-trip
+# unchanged.
+_OPTIONAL = ("dogtime_image_url", "verified", "verification_date", "corrections")
+
+
+@dataclass(slots=True)
+class Breed:
+    name:           str
+    origin:         str            = "Unknown"
+    weight_lbs:     Range          = field(default_factory=lambda: Range(0, 0))
+    height_in:      Range          = field(default_factory=lambda: Range(0, 0))
+    lifespan_yrs:   Range          = field(default_factory=lambda: Range(0, 0))
+    temperament:    list[str]      = field(default_factory=list)
+    purpose:        list[str]      = field(default_factory=list)
+    grooming:       str            = "Moderate"
+    exercise:       str            = "Moderate"
+    good_with_kids: bool           = True
+    good_with_dogs: bool           = False
+    coat:           str            = "Unknown"
+    shedding:       str            = "Moderate"
+    trainability:   str            = "Moderate"
+    health_notes:   str            = "See DogTime for details"
+    color:          str            = ""
+    dogtime_slug:   str            = ""
+    source_url:     str            = ""
+    dogtime_image_url: str | None  = None
+    verified:          bool | None = None
+    verification_date: str | None  = None
+    corrections:       list | None = None
+    service_dog_score: int | None  = None
+    extra:          dict           = field(default_factory=dict)   # unknown keys, kept verbatim
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Breed":
+        extra = {k: v for k, v in d.items() if k not in _FIELD_SET}
+        return cls(
+            name=d["name"],
+            origin=d.get("origin", "Unknown"),
+            weight_lbs=Range.from_dict(d.get("weight_lbs")),
+            height_in=Range.from_dict(d.get("height_in")),
+            lifespan_yrs=Range.from_dict(d.get("lifespan_yrs")),
+            temperament=d.get("temperament", []),
+            purpose=d.get("purpose", []),
+            grooming=d.get("grooming", "Moderate"),
+            exercise=d.get("exercise", "Moderate"),
+            good_with_kids=d.get("good_with_kids", True),
+            good_with_dogs=d.get("good_with_dogs", False),
+            coat=d.get("coat", "Unknown"),
+            shedding=d.get("shedding", "Moderate"),
+            trainability=d.get("trainability", "Moderate"),
+            health_notes=d.get("health_notes", "See DogTime for details"),
+            color=d.get("color", ""),
+            dogtime_slug=d.get("dogtime_slug", ""),
+            source_url=d.get("source_url", ""),
+            dogtime_image_url=d.get("dogtime_image_url"),
+            verified=d.get("verified"),
+            verification_date=d.get("verification_date"),
+            corrections=d.get("corrections"),
+            service_dog_score=d.get("service_dog_score"),
+            extra=extra,
+        )
+
+    def to_dict(self) -> dict:
+        """JSON-ready dict in the key order add_breed_entry() writes."""
+        d = {
+            "name":           self.name,
+            "origin":         self.origin,
+            "weight_lbs":     self.weight_lbs.to_dict(),
+            "height_in":      self.height_in.to_dict(),
+            "lifespan_yrs":   self.lifespan_yrs.to_dict(),
+            "temperament":    self.temperament,
+            "purpose":        self.purpose,
+            "grooming":       self.grooming,
+            "exercise":       self.exercise,
+            "good_with_kids": self.good_with_kids,
+            "good_with_dogs": self.good_with_dogs,
+            "coat":           self.coat,
+            "shedding":       self.shedding,
+            "trainability":   self.trainability,
+            "health_notes":   self.health_notes,
+            "color":          self.color,
+            "dogtime_slug":   self.dogtime_slug,
+            "source_url":     self.source_url,
+        }
+        for key in _OPTIONAL:
+            val = getattr(self, key)
+            if val is not None:
+                d[key] = val
+        d["service_dog_score"] = self.service_dog_score
+        d.update(self.extra)
+        return d
+
+
+_FIELD_SET = frozenset(Breed.__dataclass_fields__) - {"extra"}
+
+
+# ── Ratings ───────────────────────────────────────────────────────────────────
+
+class Ratings:
+    """
+    Star ratings for one breed as a signed-byte vector indexed by trait ID.
+
+    One byte per trait instead of a dict entry keyed by a long string; missing
+    traits hold MISSING.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: array | None = None):
+        self.values = values if values is not None else array("b", [MISSING]) * len(TRAIT_NAMES)
+
+    @classmethod
+    def from_ids(cls, by_id: dict[int, int]) -> "Ratings":
+        """Build from {trait_id: stars}; IDs outside the schema layout are dropped."""
+        n      = len(TRAIT_NAMES)
+        values = array("b", [MISSING]) * n
+        for tid, v in by_id.items():
+            if tid < n and v is not None:
+                values[tid] = int(v)
+        return cls(values)
+
+    @classmethod
+    def from_flat(cls, flat: dict) -> "Ratings":
+        """Build from a breed_ratings.json entry ({trait_name: stars})."""
+        values = array("b", [MISSING]) * len(TRAIT_NAMES)
+        for name, v in flat.items():
+            tid = TRAIT_ID.get(name)
+            if tid is not None and v is not None:
+                values[tid] = int(v)
+        return cls(values)
+
+    def to_flat(self) -> dict:
+        """{trait_name: stars} in schema order, skipping missing traits."""
+        return {TRAIT_NAMES[i]: v for i, v in enumerate(self.values) if v != MISSING}
+
+    def __getitem__(self, trait_id: int) -> int | None:
+        v = self.values[trait_id]
+        return None if v == MISSING else v
+
+    def get(self, name: str) -> int | None:
+        tid = TRAIT_ID.get(name)
+        return None if tid is None else self[tid]
+
+    def has_all(self, trait_ids) -> bool:
+        values = self.values
+        return all(values[i] != MISSING for i in trait_ids)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Ratings) and self.values == other.values
+
+    def __repr__(self) -> str:
+        return f"Ratings({self.to_flat()!r})"
+
+
+# ── Loaders ───────────────────────────────────────────────────────────────────
+
+def load_breeds(path: Path = BREEDS_FILE) -> list[Breed]:
+    return [Breed.from_dict(d) for d in json.loads(Path(path).read_text())]
+
+
+def load_ratings(path: Path = RATINGS_FILE) -> dict[str, Ratings]:
+    return {slug: Ratings.from_flat(flat) for slug, flat in json.loads(Path(path).read_text()).items()}
+
+
+# ── Benchmark ─────────────────────────────────────────────────────────────────
+
+def _bench(n: int) -> None:
+    import random
+    import time
+    import tracemalloc
+
+    template = json.loads(BREEDS_FILE.read_text())[0]
+    rng      = random.Random(0)
+
+    def synth_breed(i):
+        d = json.loads(json.dumps(template))
+        d["name"] = f"Synthetic Breed {i}"
+        d["dogtime_slug"] = f"synthetic-breed-{i}"
+        d["weight_lbs"] = {"min": rng.randint(40, 120), "max": rng.randint(120, 200)}
+        return d
+
+    def synth_ratings():
+        return {t: rng.randint(1, 5) for t in TRAIT_NAMES}
+
+    def measure(build):
+        tracemalloc.start()
+        t0   = time.perf_counter()
+        objs = build()
+        dt   = time.perf_counter() - t0
+        size, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return objs, size, dt
+
+    # Raw JSON text is built outside the traced region so only the parsed
+    # objects are counted.
+    breeds_json  = json.dumps([synth_breed(i) for i in range(n)])
+    ratings_json = json.dumps([synth_ratings() for _ in range(n)])
+
+    dicts, dict_bytes, dict_t = measure(lambda: json.loads(breeds_json))
+    models, model_bytes, model_t = measure(lambda: [Breed.from_dict(d) for d in json.loads(breeds_json)])
+    rdicts, rdict_bytes, _ = measure(lambda: json.loads(ratings_json))
+    rvecs, rvec_bytes, _ = measure(lambda: [Ratings.from_flat(r) for r in json.loads(ratings_json)])
+
+    def access(fn, items, reps=3):
+        t0 = time.perf_counter()
+        for _ in range(reps):
+            total = 0.0
+            for b in items:
+                total += fn(b)
+        return (time.perf_counter() - t0) / (reps * len(items)) * 1e9
+
+    dict_ns  = access(lambda b: (b["weight_lbs"]["min"] + b["weight_lbs"]["max"]) / 2, dicts)
+    model_ns = access(lambda b: b.weight_lbs.mid, models)
+    tid      = TRAIT_ID["Easy To Train"]
+    rdict_ns = access(lambda r: r["Easy To Train"], rdicts)
+    rvec_ns  = access(lambda r: r.values[tid], rvecs)
+
+    print(f"{n:,} synthetic breeds")
+    print(f"  Breed  dicts:   {dict_bytes / n:8.0f} B/breed   parse {dict_t:6.2f}s   "
+          f"weight mid {dict_ns:5.0f} ns")
+    print(f"  Breed  models:  {model_bytes / n:8.0f} B/breed   parse {model_t:6.2f}s   "
+          f"weight mid {model_ns:5.0f} ns")
+    print(f"  Rating dicts:   {rdict_bytes / n:8.0f} B/breed   lookup {rdict_ns:5.0f} ns")
+    print(f"  Rating vectors: {rvec_bytes / n:8.0f} B/breed   lookup {rvec_ns:5.0f} ns")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Typed breed/rating records")
+    ap.add_argument("--bench", type=int, metavar="N", help="Memory/access benchmark at N synthetic breeds")
+    args = ap.parse_args()
+    if args.bench:
+        _bench(args.bench)
+    else:
+        ap.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+precompress.py — gzip / brotli siblings for the app's static text assets.
+
+For every text asset (HTML, JSX, JSON, CSS, …) of at least MIN_SIZE bytes,
+writes name.gz and, when the optional brotli package is installed, name.br
+next to it.  server.py sends the sibling that matches the request's
+Accept-Encoding.  Siblings are built at maximum compression, since that cost
+is paid once per change, not per request.
+
+A sibling is fresh while its mtime equals the source's (os.utime copies it
+over), so editing or atomically replacing the source makes it stale.  The
+server rebuilds stale siblings on first request.  This CLI rebuilds them all
+up front.
+
+JSON API responses are compressed on the fly at a faster level
+(compress_bytes(..., fast=True)).
+
+Usage:
+    python precompress.py            # build missing / stale siblings
+    python precompress.py --force    # rebuild all
+    python precompress.py --clean    # delete all siblings
+
+As a callable module:
+    from precompress import negotiate, compressed_sibling, compress_bytes
+    enc = negotiate(request.headers.get("Accept-Encoding"))   # "br" | "gzip" | None
+    path = compressed_sibling(Path("large_dog_breeds_app.jsx"), enc)
+"""
+
+import argparse
+import gzip
+import os
+import threading
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:          # optional: without it only gzip is offered
+    brotli = None
+
+ROOT = Path(__file__).parent
+
+MIN_SIZE      = 1024         # smaller payloads aren't worth a Content-Encoding
+TEXT_SUFFIXES = {".html", ".js", ".jsx", ".json", ".css", ".svg", ".txt", ".csv", ".md"}
+SUFFIX        = {"br": ".br", "gzip": ".gz"}
+ENCODINGS     = ("br", "gzip") if brotli else ("gzip",)   # server preference order
+SKIP_DIRS     = {"__pycache__", "venv"}
+
+
+# ── Compression ──────────────────────────────────────────────────────────────
+
+def compress_bytes(data: bytes, encoding: str, fast: bool = False) -> bytes:
+    """data compressed for a Content-Encoding ("br" or "gzip")."""
+    if encoding == "br":
+        return brotli.compress(data, quality=5 if fast else 11)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6 if fast else 9, mtime=0)
+    raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def negotiate(accept_encoding: str | None, available: tuple[str, ...] = ENCODINGS) -> str | None:
+    """
+    Best of `available` for an Accept-Encoding header, or None for identity.
+    Highest q-value wins, ties go to the order of `available`, q=0 excludes,
+    and "*" covers encodings not listed by name.
+    """
+    if not accept_encoding:
+        return None
+    q = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        for p in params.split(";"):
+            k, _, v = p.strip().partition("=")
+            if k.strip().lower() == "q":
+                try:
+                    weight = float(v)
+                except ValueError:
+                    weight = 0.0
+        q[name.strip().lower()] = weight
+    best, best_q = None, 0.0
+    for enc in available:
+        weight = q.get(enc, q.get("*", 0.0))
+        if weight > best_q:
+            best, best_q = enc, weight
+    return best
+
+
+def is_compressible(path: Path, size: int) -> bool:
+    return path.suffix.lower() in TEXT_SUFFIXES and size >= MIN_SIZE
+
+
+# ── Siblings ─────────────────────────────────────────────────────────────────
+
+_lock = threading.Lock()    # one build at a time; rare, and avoids duplicate work
+
+
+def _sibling_path(path: Path, encoding: str) -> Path:
+    return path.with_name(path.name + SUFFIX[encoding])
+
+
+def _fresh(sibling: Path, source_mtime_ns: int) -> bool:
+    try:
+        return sibling.stat().st_mtime_ns == source_mtime_ns
+    except OSError:
+        return False
+
+
+def build_sibling(path: Path, encoding: str) -> Path:
+    """Write path's compressed sibling (temp file + rename) and return it."""
+    st      = path.stat()
+    sibling = _sibling_path(path, encoding)
+    tmp     = sibling.with_name(f".{sibling.name}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(compress_bytes(path.read_bytes(), encoding))
+    os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp, sibling)
+    return sibling
+
+
+def compressed_sibling(path: Path, encoding: str | None) -> Path | None:
+    """
+    Fresh compressed sibling of path for encoding, building it if missing or
+    stale.  None for identity, or when compression didn't make it smaller.
+    """
+    if encoding is None:
+        return None
+    source  = path.stat()
+    sibling = _sibling_path(path, encoding)
+    if not _fresh(sibling, source.st_mtime_ns):
+        with _lock:
+            if not _fresh(sibling, source.st_mtime_ns):
+                build_sibling(path, encoding)
+    return sibling if sibling.stat().st_size < source.st_size else None
+
+
+def assets(root: Path = ROOT) -> list[Path]:
+    """Compressible files under root, skipping dot-directories and caches."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS]
+        for name in filenames:
+            path = Path(dirpath) / name
+            if not name.startswith(".") and is_compressible(path, path.stat().st_size):
+                found.append(path)
+    return sorted(found)
+
+
+def precompress_all(root: Path = ROOT, force: bool = False, verbose: bool = True) -> dict:
+    """Build every missing or stale sibling.  Returns {"built", "fresh", "raw", "compressed"}."""
+    stats = {"built": 0, "fresh": 0, "raw": 0, "compressed": {e: 0 for e in ENCODINGS}}
+    for path in assets(root):
+        mtime = path.stat().st_mtime_ns
+        stats["raw"] += path.stat().st_size
+        for enc in ENCODINGS:
+            sibling = _sibling_path(path, enc)
+            if force or not _fresh(sibling, mtime):
+                build_sibling(path, enc)
+                stats["built"] += 1
+            else:
+                stats["fresh"] += 1
+            stats["compressed"][enc] += sibling.stat().st_size
+    if verbose:
+        sizes = ", ".join(f"{enc} {n / 1024:,.0f} KB ({stats['raw'] / max(n, 1):.1f}×)"
+                          for enc, n in stats["compressed"].items())
+        print(f"{len(assets(root))} assets, {stats['raw'] / 1024:,.0f} KB → {sizes}  "
+              f"[{stats['built']} built, {stats['fresh']} fresh]")
+        if not brotli:
+            print("  (brotli not installed — only .gz siblings; pip install brotli for .br)")
+    return stats
+
+
+def clean(root: Path = ROOT, verbose: bool = True) -> int:
+    removed = 0
+    for path in assets(root):
+        for enc in SUFFIX:
+            sibling = _sibling_path(path, enc)
+            if sibling.exists():
+                sibling.unlink()
+                removed += 1
+    if verbose:
+        print(f"Removed {removed} compressed siblings")
+    return removed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Precompress static text assets (.gz / .br siblings)")
+    ap.add_argument("--force", action="store_true", help="Rebuild every sibling")
+    ap.add_argument("--clean", action="store_true", help="Delete every sibling")
+    args = ap.parse_args()
+
+    if args.clean:
+        clean()
+    else:
+        precompress_all(force=args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+profiles.py — score every breed under several suitability profiles at once.
+
+A profile is a JSON file in profiles/ with the same formula shape as
+service_score_analysis.json:
+
+  {
+    "name":  "family",
+    "label": "Family dog",
+    "description": "...",
+    "groups":     [{"name": ..., "traits": [...], "weight": 3.0, "direction": "positive"}],
+    "standalone": [{"trait": ..., "weight": 1.5, "direction": "negative"}]
+  }
+
+A group scores as weight × mean(traits).  A profile can instead point at an
+analysis file ("analysis": "service_score_analysis.json") to use its
+data-confirmed formula.  profiles/service.json does this, so the service
+profile always matches service_dog_score.
+
+All profiles compile to one P × T signed weight matrix over the 31 DogTime
+traits.  The ratings are loaded once and scored in a single matrix product
+(scoring.ScoringEngine).  Each profile is normalized to 1–5 on its own, and a
+breed is null for a profile when it lacks one of that profile's traits.
+Adding a profile adds a row to the matrix, not another pass over the ratings.
+
+Output (profile_scores.json), a breeds × profiles table:
+  {"profiles": [{"name", "label", "description"}, ...],
+   "scores":   {slug: [score per profile, ...]}}
+
+Usage:
+    python profiles.py                 # recompute profile_scores.json
+    python profiles.py --top family    # best breeds for one profile
+
+As a callable module:
+    from profiles import update_profile_scores
+    table = update_profile_scores(verbose=False)
+"""
+
+import argparse
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from models import TRAIT_NAMES, load_ratings
+from scoring import ScoringEngine, compile_formula
+
+ROOT         = Path(__file__).parent
+PROFILES_DIR = ROOT / "profiles"
+RATINGS_FILE = ROOT / "breed_ratings.json"
+SCORES_FILE  = ROOT / "profile_scores.json"
+
+DIRECTIONS = ("positive", "negative")
+
+
+# ── Loading ──────────────────────────────────────────────────────────────────
+
+def _check_formula(profile: dict, source: str) -> None:
+    known = set(TRAIT_NAMES)
+    terms = [(g.get("traits", []), g) for g in profile.get("groups", [])] + \
+            [([s.get("trait")], s) for s in profile.get("standalone", [])]
+    if not terms:
+        raise ValueError(f"{source}: profile has no groups or standalone traits")
+    for traits, term in terms:
+        unknown = [t for t in traits if t not in known]
+        if unknown or not traits:
+            raise ValueError(f"{source}: unknown trait(s) {unknown or traits}")
+        if term.get("direction") not in DIRECTIONS:
+            raise ValueError(f"{source}: direction must be one of {DIRECTIONS}, got {term.get('direction')!r}")
+        if not isinstance(term.get("weight"), (int, float)):
+            raise ValueError(f"{source}: weight must be a number for {traits}")
+
+
+def load_profiles(profiles_dir: Path = PROFILES_DIR) -> list[dict]:
+    """
+    Every profiles/*.json definition, ordered by file name, with "analysis"
+    references resolved to that file's groups/standalone.  Raises ValueError
+    naming the file for a malformed profile.
+    """
+    profiles = []
+    for path in sorted(Path(profiles_dir).glob("*.json")):
+        profile = json.loads(path.read_text())
+        profile.setdefault("name", path.stem)
+        if profile.get("analysis"):
+            analysis = json.loads((ROOT / profile["analysis"]).read_text())
+            profile["groups"]     = analysis.get("groups", [])
+            profile["standalone"] = analysis.get("standalone", [])
+        _check_formula(profile, path.name)
+        profiles.append(profile)
+    names = [p["name"] for p in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate profile names in {profiles_dir}: {names}")
+    return profiles
+
+
+# ── Engine ───────────────────────────────────────────────────────────────────
+
+class ProfileEngine:
+    """P profiles × the breeds × traits rating matrix, scored in one pass."""
+
+    def __init__(self, profiles: list[dict], ratings: dict):
+        self.profiles = profiles
+        self.engine   = ScoringEngine(TRAIT_NAMES, np.zeros(len(TRAIT_NAMES)), ratings)
+        rows = []
+        for p in profiles:
+            traits, w = compile_formula(p)
+            rows.append(self.engine.vector(dict(zip(traits, w))))
+        self.W = np.array(rows).reshape(len(profiles), len(TRAIT_NAMES))
+
+    @property
+    def slugs(self) -> list[str]:
+        return self.engine.slugs
+
+    def scores(self) -> np.ndarray:
+        """P × N integer-valued scores, NaN where a breed can't be scored."""
+        if not len(self.W):
+            return np.empty((0, len(self.slugs)))
+        return self.engine.score(self.W)
+
+    def table(self) -> dict:
+        S = self.scores()
+        return {
+            "profiles": [{"name": p["name"], "label": p.get("label", p["name"]),
+                          "description": p.get("description", "")} for p in self.profiles],
+            "scores":   {slug: [None if np.isnan(v) else int(v) for v in S[:, j]]
+                         for j, slug in enumerate(self.slugs)},
+        }
+
+
+def update_profile_scores(
+    profiles_dir: Path = PROFILES_DIR,
+    ratings_file: Path = RATINGS_FILE,
+    scores_file:  Path = SCORES_FILE,
+    verbose:      bool = True,
+) -> dict:
+    """
+    Score all breeds under all profiles and write profile_scores.json (only
+    if the table changed).  Returns the table.
+    """
+    profiles = load_profiles(profiles_dir)
+    table    = ProfileEngine(profiles, load_ratings(ratings_file)).table()
+
+    try:
+        previous = json.loads(Path(scores_file).read_text())
+    except (OSError, ValueError):
+        previous = None
+    if previous != table:
+        tmp = Path(scores_file).with_suffix(".tmp")
+        tmp.write_text(json.dumps(table, indent=1, ensure_ascii=False))
+        os.replace(tmp, scores_file)
+    if verbose:
+        state = "Wrote" if previous != table else "Unchanged:"
+        print(f"{state} {scores_file}  ({len(table['scores'])} breeds × {len(profiles)} profiles)")
+    return table
+
+
+def ranked(table: dict, profile: str, top: int | None = None) -> list[dict]:
+    """
+    [{slug, score}] for one profile, best first, skipping unscored breeds.
+    top keeps the first top rows (None or 0: all); a negative top is a ValueError.
+    """
+    if top is not None and top < 0:
+        raise ValueError("top must be a non-negative integer")
+    names = [p["name"] for p in table["profiles"]]
+    if profile not in names:
+        raise KeyError(profile)
+    col  = names.index(profile)
+    rows = [{"slug": slug, "score": s[col]} for slug, s in table["scores"].items() if s[col] is not None]
+    rows.sort(key=lambda r: -r["score"])
+    return rows[:top] if top else rows
+
+
+# ── Shared table ─────────────────────────────────────────────────────────────
+# Recomputed when profile_scores.json is older than the ratings, the analysis
+# or any profile definition.
+
+_lock = threading.Lock()
+
+
+def _inputs_mtime(profiles_dir: Path = PROFILES_DIR) -> int:
+    paths = [RATINGS_FILE, ROOT / "service_score_analysis.json", Path(profiles_dir),
+             *Path(profiles_dir).glob("*.json")]
+    return max((p.stat().st_mtime_ns for p in paths if p.exists()), default=0)
+
+
+def get_table() -> dict:
+    with _lock:
+        if not SCORES_FILE.exists() or SCORES_FILE.stat().st_mtime_ns < _inputs_mtime():
+            table = update_profile_scores(verbose=False)
+            SCORES_FILE.touch()
+            return table
+        return json.loads(SCORES_FILE.read_text())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Multi-profile breed scoring")
+    ap.add_argument("--top", metavar="PROFILE", help="List the best breeds for one profile")
+    ap.add_argument("-n",    type=int, default=10, help="How many breeds to list with --top (default 10)")
+    args = ap.parse_args()
+
+    table = update_profile_scores()
+    if args.top:
+        for row in ranked(table, args.top, args.n):
+            print(f"  {row['score']:3d}  {row['slug']}")
+    else:
+        names = [p["name"] for p in table["profiles"]]
+        print("\n" + " " * 28 + "".join(f"{n[:10]:>11}" for n in names))
+        for slug, row in list(table["scores"].items())[:15]:
+            print(f"  {slug[:26]:26s}" + "".join(f"{'—' if v is None else v:>11}" for v in row))
+        if len(table["scores"]) > 15:
+            print(f"  … {len(table['scores']) - 15} more")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+scoring.py — vectorized service-dog scoring for one or many weight vectors.
+
+Compiles the formula in service_score_analysis.json into a signed weight per
+trait (a group's weight is spread evenly over its traits, since the group
+term is the mean of its members) plus the raw → 1–5 normalization.  Scoring
+is then one matrix product:
+
+    raw    = W @ Xᵀ                       K candidates × N breeds
+    score  = round((raw − raw_min) / (raw_max − raw_min) × 4 + 1)
+
+where each candidate row gets its own raw_min / raw_max (Σ min/max of w·1 and
+w·5).  A breed is null for a candidate when it lacks a trait that candidate
+weights, matching update_service_scores().
+
+Weights are signed: a negative weight is a "negative" direction trait.
+
+Usage:
+    python scoring.py                                   # top 10 under the current formula
+    python scoring.py --weights '{"Easy To Train": 4, "Prey Drive": -1}'
+    python scoring.py --bench 10000                     # time a 10k-vector sweep
+
+As a callable module:
+    from scoring import ScoringEngine
+    engine = ScoringEngine.from_files()
+    engine.score_dicts([{"Easy To Train": 3.0, "Prey Drive": -2.0}])
+    engine.score(np.random.uniform(-2, 2, (10_000, len(engine.traits))))
+"""
+
+import argparse
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from models import MISSING, load_ratings
+from trait_registry import REGISTRY
+
+ROOT          = Path(__file__).parent
+RATINGS_FILE  = ROOT / "breed_ratings.json"
+ANALYSIS_FILE = ROOT / "service_score_analysis.json"
+
+
+def compile_formula(analysis: dict) -> tuple[list[str], np.ndarray]:
+    """
+    Formula section of an analysis dict → (trait names, signed weights).
+
+    A group contributes w · mean(traits), i.e. w / len(traits) per member.
+    """
+    weights: dict[str, float] = {}
+
+    def add(trait, w, direction):
+        weights[trait] = weights.get(trait, 0.0) + (w if direction == "positive" else -w)
+
+    for g in analysis.get("groups", []):
+        for t in g["traits"]:
+            add(t, g["weight"] / len(g["traits"]), g["direction"])
+    for s in analysis.get("standalone", []):
+        add(s["trait"], s["weight"], s["direction"])
+    traits = list(weights)
+    return traits, np.array([weights[t] for t in traits], dtype=float)
+
+
+def normalization(W: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per-row (raw_min, raw_max) of signed weight vectors over 1–5 stars."""
+    lo, hi = W * 1.0, W * 5.0
+    return np.minimum(lo, hi).sum(axis=-1), np.maximum(lo, hi).sum(axis=-1)
+
+
+class ScoringEngine:
+    """
+    Breeds × traits rating matrix over the formula's traits, ready for
+    batch scoring.
+
+    traits       column order for weight vectors
+    base_weights the formula's own signed weights
+    slugs        row order of the matrix / columns of score()
+    """
+
+    def __init__(self, traits: list[str], base_weights: np.ndarray, ratings: dict):
+        self.traits       = list(traits)
+        self.base_weights = np.asarray(base_weights, dtype=float)
+        self._col         = {t: i for i, t in enumerate(self.traits)}
+
+        ids        = REGISTRY.trait_ids(self.traits)
+        self.slugs = list(ratings)
+        if self.slugs:
+            raw = np.array([ratings[s].values for s in self.slugs], dtype=np.int8)[:, ids]
+        else:
+            raw = np.empty((0, len(ids)), dtype=np.int8)
+        self.missing = raw == MISSING                             # N × T bool
+        self.X       = np.where(self.missing, 0, raw).astype(float)
+
+    @classmethod
+    def from_analysis(cls, analysis: dict, ratings: dict) -> "ScoringEngine":
+        traits, weights = compile_formula(analysis)
+        return cls(traits, weights, ratings)
+
+    @classmethod
+    def from_files(cls, analysis_file: Path = ANALYSIS_FILE,
+                   ratings_file: Path = RATINGS_FILE) -> "ScoringEngine":
+        analysis = json.loads(Path(analysis_file).read_text())
+        return cls.from_analysis(analysis, load_ratings(ratings_file))
+
+    # ── Weight vectors ───────────────────────────────────────────────────────
+
+    def vector(self, weights: dict) -> np.ndarray:
+        """{trait name: signed weight} → row in self.traits order (others 0)."""
+        row = np.zeros(len(self.traits))
+        for name, w in weights.items():
+            col = self._col.get(name)
+            if col is None:
+                raise ValueError(f"Unknown formula trait: {name!r}")
+            row[col] = float(w)
+        return row
+
+    def weights_dict(self, row: np.ndarray | None = None) -> dict:
+        row = self.base_weights if row is None else row
+        return {t: float(w) for t, w in zip(self.traits, row)}
+
+    # ── Scoring ──────────────────────────────────────────────────────────────
+
+    def raw(self, W: np.ndarray) -> np.ndarray:
+        """K × N raw scores (before normalization, ignoring missing data)."""
+        return np.atleast_2d(W) @ self.X.T
+
+    def scale(self, W: np.ndarray) -> np.ndarray:
+        """
+        K × N float array of unrounded 1–5 scores (NaN where the breed lacks
+        a weighted trait or the candidate has no weights).  W is K × T in
+        self.traits order, or a single T-vector.
+        """
+        W = np.atleast_2d(np.asarray(W, dtype=float))
+        if W.shape[1] != len(self.traits):
+            raise ValueError(f"Expected {len(self.traits)} weights per vector, got {W.shape[1]}")
+        raw_min, raw_max = normalization(W)
+        span = raw_max - raw_min
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scaled = (self.raw(W) - raw_min[:, None]) / span[:, None] * 4 + 1
+        incomplete = (W != 0).astype(np.int32) @ self.missing.T.astype(np.int32) > 0
+        scaled[incomplete] = np.nan
+        scaled[span == 0] = np.nan
+        return scaled
+
+    def score(self, W: np.ndarray) -> np.ndarray:
+        """scale() rounded to the integer 1–5 scale (NaN kept)."""
+        return np.rint(self.scale(W))
+
+    def score_dicts(self, candidates: list[dict]) -> np.ndarray:
+        """score() for a list of {trait: signed weight} dicts."""
+        if not candidates:
+            return np.empty((0, len(self.slugs)))
+        return self.score(np.array([self.vector(c) for c in candidates]))
+
+    def base_scores(self) -> dict[str, int]:
+        """{slug: score} under the formula itself, skipping null scores."""
+        row = self.score(self.base_weights)[0]
+        return {s: int(v) for s, v in zip(self.slugs, row) if not np.isnan(v)}
+
+
+# ── Shared engine ─────────────────────────────────────────────────────────────
+# Rebuilt only when the analysis or ratings file changes on disk.
+
+_cache_lock = threading.Lock()
+_cache: dict = {"key": None, "engine": None}
+
+
+def get_engine(analysis_file: Path = ANALYSIS_FILE,
+               ratings_file: Path = RATINGS_FILE) -> ScoringEngine:
+    key = tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size)
+                for p in (Path(analysis_file), Path(ratings_file)))
+    with _cache_lock:
+        if _cache["key"] != key:
+            _cache["engine"] = ScoringEngine.from_files(analysis_file, ratings_file)
+            _cache["key"]    = key
+        return _cache["engine"]
+
+
+def score_request(data: dict) -> dict:
+    """
+    Body of POST /api/score → response dict.
+
+        {"weights": [{trait: signed weight, ...}, ...]   # or a list of lists
+         "top": 10}                                      # optional: ranked slugs per vector
+
+    Returns {"ok": true, "traits": [...], "slugs": [...], "scores": [[...]]}
+    with null for unscored breeds, or {"ok": true, ..., "top": [[{slug, score}]]}
+    when top is given.
+    """
+    engine     = get_engine()
+    candidates = data.get("weights")
+    if candidates is None:
+        candidates = [engine.weights_dict()]
+    if not isinstance(candidates, list):
+        raise ValueError("'weights' must be a list of weight vectors")
+    rows = [engine.vector(c) if isinstance(c, dict) else c for c in candidates]
+    if rows:
+        scores = engine.score(np.array(rows, dtype=float))
+    else:
+        scores = np.empty((0, len(engine.slugs)))
+
+    result = {"ok": True, "traits": engine.traits, "base_weights": engine.weights_dict()}
+    top = data.get("top")
+    if top is not None:
+        k     = int(top)
+        if k < 0:
+            raise ValueError("'top' must be a non-negative integer")
+        order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), axis=1, kind="stable")[:, :k]
+        result["top"] = [
+            [{"slug": engine.slugs[j], "score": int(row[j])} for j in idx if not np.isnan(row[j])]
+            for row, idx in zip(scores, order)
+        ]
+    else:
+        result["slugs"]  = engine.slugs
+        result["scores"] = [[None if np.isnan(v) else int(v) for v in row] for row in scores]
+    return result
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def _bench(engine: ScoringEngine, k: int) -> None:
+    import time
+    rng = np.random.default_rng(0)
+    W   = engine.base_weights * rng.uniform(0.5, 1.5, (k, len(engine.traits)))
+    engine.score(W[:10])   # warm-up
+    t0 = time.perf_counter()
+    S  = engine.score(W)
+    dt = time.perf_counter() - t0
+    print(f"{k:,} weight vectors × {len(engine.slugs)} breeds × {len(engine.traits)} traits "
+          f"→ {S.shape[0]}×{S.shape[1]} scores in {dt * 1000:.1f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Batch what-if service dog scoring")
+    ap.add_argument("--weights", metavar="JSON", help="Signed weights, e.g. '{\"Easy To Train\": 3}'")
+    ap.add_argument("--top",     type=int, default=10, help="Breeds to list (default 10)")
+    ap.add_argument("--bench",   type=int, metavar="K", help="Time scoring K perturbed weight vectors")
+    args = ap.parse_args()
+
+    engine = ScoringEngine.from_files()
+    if args.bench:
+        _bench(engine, args.bench)
+        return
+
+    weights = engine.weights_dict()
+    if args.weights:
+        weights = json.loads(args.weights)
+    row   = engine.score_dicts([weights])[0]
+    order = np.argsort(-np.nan_to_num(row, nan=-np.inf), kind="stable")
+    print("Weights: " + ", ".join(f"{t} {w:+g}" for t, w in weights.items()))
+    for j in order[:args.top]:
+        if not np.isnan(row[j]):
+            print(f"  {int(row[j]):3d}  {engine.slugs[j]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,10 @@ into a structured JSON hierarchy with sections, subsections, ratings, and text.
 Usage:
     python scrape_breed.py 'Great Dane'               # scrape & print
     python scrape_breed.py 'Great Dane' --pretty      # pretty-print JSON
-    python scrape_breed.py 'Great Dane' --save        # save to breed_details/
+    python scrape_breed.py 'Great Dane' --save        # save to breed_details/ + content.pack
     python scrape_breed.py --all                      # scrape all 26 breeds
     python scrape_breed.py --all --workers 4          # parallel, 4 threads
+    python scrape_breed.py --all --metrics-json m.json  # + fetch counts and latencies
 """
 
 import argparse
@@ -22,6 +23,8 @@ from pathlib import Path
 import requests
 from bs4 import BeautifulSoup, NavigableString, Tag
 
+import metrics
+
 DATA_FILE = Path(__file__).parent / "large_dog_breeds.json"
 OUT_DIR   = Path(__file__).parent / "breed_details"
 TODAY     = date.today().isoformat()
@@ -48,8 +51,10 @@ HEADING_TAGS  = list(HEADING_LEVEL.keys())
 
 def fetch_page(url: str, max_attempts: int = 3) -> str | None:
     for attempt in range(max_attempts):
+        t0 = time.perf_counter()
         try:
             resp = requests.get(url, headers=HEADERS, timeout=15)
+            metrics.record_fetch(url, resp.status_code, time.perf_counter() - t0)
             if resp.status_code == 200:
                 return resp.text
             if resp.status_code in (429, 503):
@@ -60,6 +65,7 @@ def fetch_page(url: str, max_attempts: int = 3) -> str | None:
                 print(f"  [HTTP {resp.status_code}] {url}")
                 return None
         except requests.RequestException as exc:
+            metrics.record_fetch(url, "error", time.perf_counter() - t0)
             print(f"  [error] {exc}")
             time.sleep(2 ** attempt)
     return None
@@ -439,7 +445,9 @@ def main():
     ap.add_argument("--save",  action="store_true", help="Save JSON to breed_details/<slug>.json")
     ap.add_argument("--pretty",action="store_true", help="Pretty-print JSON to stdout")
     ap.add_argument("--workers", type=int, default=6, help="Parallel workers for --all")
+    metrics.add_argument(ap)
     args = ap.parse_args()
+    metrics.dump_at_exit(args.metrics_json)
 
     breeds = json.loads(DATA_FILE.read_text())
 
@@ -482,10 +490,20 @@ def main():
     for name, data in results.items():
         if args.save:
             slug = data.get("slug") or name.lower().replace(" ", "-")
+            data["slug"] = slug
             path = OUT_DIR / f"{slug}.json"
             path.write_text(json.dumps(data, indent=2, ensure_ascii=False))
             print(f"  Saved → {path}")
 
+    if args.save and results:
+        from breed_archive import BreedArchive
+        with BreedArchive() as archive:
+            archive.put_many(list(results.values()))
+        print(f"  Packed {len(results)} record(s) → {archive.pack_file}")
+        from search_index import index_breeds
+        index_breeds([data["slug"] for data in results.values()])
+        print(f"  Indexed {len(results)} record(s) → search_index.json")
+
     if args.pretty or (not args.save and len(results) == 1):
         for data in results.values():
             print(json.dumps(data, indent=2, ensure_ascii=False))
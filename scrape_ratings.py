@@ -30,6 +30,7 @@ Usage:
     python scrape_ratings.py --breed 'Great Dane' # single breed
     python scrape_ratings.py --workers 4          # parallel, 4 threads
     python scrape_ratings.py --dry-run            # print JSON, don't save
+    python scrape_ratings.py --metrics-json m.json  # + fetch counts and latencies
 """
 
 import argparse
@@ -43,6 +44,9 @@ from pathlib import Path
 import requests
 from bs4 import BeautifulSoup
 
+import metrics
+from trait_registry import OVERALL_SUFFIX, REGISTRY
+
 DATA_FILE = Path(__file__).parent / "large_dog_breeds.json"
 OUT_DIR   = Path(__file__).parent / "breed_details"
 TODAY     = date.today().isoformat()
@@ -61,8 +65,10 @@ def clean(text: str) -> str:
 
 def fetch_page(url: str, max_attempts: int = 3) -> str | None:
     for attempt in range(max_attempts):
+        t0 = time.perf_counter()
         try:
             resp = requests.get(url, headers=HEADERS, timeout=15)
+            metrics.record_fetch(url, resp.status_code, time.perf_counter() - t0)
             if resp.status_code == 200:
                 return resp.text
             if resp.status_code in (429, 503):
@@ -73,6 +79,7 @@ def fetch_page(url: str, max_attempts: int = 3) -> str | None:
                 print(f"  [HTTP {resp.status_code}] {url}")
                 return None
         except requests.RequestException as exc:
+            metrics.record_fetch(url, "error", time.perf_counter() - t0)
             print(f"  [error] {exc}")
             time.sleep(2 ** attempt)
     return None
@@ -90,7 +97,7 @@ def extract_ratings(html: str) -> dict[str, dict[str, int]]:
     }
     """
     soup = BeautifulSoup(html, "lxml")
-    ratings: dict[str, dict[str, int]] = {}
+    items: list[tuple[int, int, int | None]] = []   # (category_id, trait_id, stars)
 
     for details in soup.find_all("details"):
         summary = details.find("summary", recursive=False)
@@ -101,13 +108,13 @@ def extract_ratings(html: str) -> dict[str, dict[str, int]]:
             continue
 
         category = clean(h2.get_text(" ", strip=True))
-        cat_ratings: dict[str, int] = {}
+        cid      = REGISTRY.intern_category(category)
 
         # Category-level overall rating (star span alongside the h2 in summary)
         cat_star_span = summary.find("span", class_="xe-breed-star-rating")
         if cat_star_span:
             filled = len(cat_star_span.find_all("span", class_="xe-breed-star--selected"))
-            cat_ratings[f"{category} - Overall"] = filled
+            items.append((cid, REGISTRY.intern(category + OVERALL_SUFFIX, cid), filled))
 
         for sub_details in details.find_all("details"):
             sub_summary = sub_details.find("summary", recursive=False)
@@ -125,12 +132,10 @@ def extract_ratings(html: str) -> dict[str, dict[str, int]]:
             else:
                 filled = None  # rating not found
 
-            cat_ratings[trait] = filled
-
-        if cat_ratings:
-            ratings[category] = cat_ratings
+            items.append((cid, REGISTRY.intern(trait, cid), filled))
 
-    return ratings
+    # Names only at the edge: the per-breed JSON files stay keyed by name
+    return REGISTRY.nest(items)
 
 
 def scrape_breed_ratings(breed: dict, dry_run: bool = False) -> dict | None:
@@ -178,7 +183,9 @@ def main():
     ap.add_argument("--all",     action="store_true", help="Scrape all breeds in JSON (default if no --breed)")
     ap.add_argument("--workers", type=int, default=6, help="Parallel workers")
     ap.add_argument("--dry-run", action="store_true", help="Print JSON, don't save files")
+    metrics.add_argument(ap)
     args = ap.parse_args()
+    metrics.dump_at_exit(args.metrics_json)
 
     breeds = json.loads(DATA_FILE.read_text())
 
@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+search_index.py — BM25 full-text search over breeds and their scraped articles.
+
+Each breed is one document made of fields, weighted by how much a match in
+that field should count:
+
+  name ×3   origin, purpose, temperament ×2   coat, health_notes ×1
+  scraped content (scrape_breed.py --save) ×1: intro, section / subsection /
+  tip titles, text and list items.  It is read from breed_details/
+  content.pack when the breed is packed there, else breed_details/<slug>.json.
+
+Text is case-folded, accent-stripped, split on non-alphanumerics, filtered
+for stopwords and Porter-stemmed, so "guarding", "guards" and "guard" all
+match.  Ranking is BM25 (k1 = 1.2, b = 0.75) with the field weights applied
+to term frequency.  The last query term also matches as a prefix, so
+as-you-type queries work ("newf" finds Newfoundland).
+
+The inverted index (term → {slug: weighted tf}, plus document lengths and
+each document's term list) is persisted to search_index.json.  It is updated
+one breed at a time when add_breed_entry / remove_breed_entry or
+scrape_breed.py --save write a breed.  It is rebuilt from scratch when the
+breeds file or content pack is newer than it.
+
+Usage:
+    python search_index.py 'gentle family guardian'      # top 10
+    python search_index.py --build                       # rebuild search_index.json
+    python search_index.py --bench 5000                  # synthetic corpus timing
+
+As a callable module:
+    from search_index import get_index
+    get_index().search("gentle family guardian", limit=5)
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from shared_index import SharedIndex
+
+ROOT         = Path(__file__).parent
+BREEDS_FILE  = ROOT / "large_dog_breeds.json"
+DETAILS_DIR  = ROOT / "breed_details"
+PACK_FILES   = (DETAILS_DIR / "content.pack", DETAILS_DIR / "content.idx.json")
+INDEX_FILE   = ROOT / "search_index.json"
+
+K1, B = 1.2, 0.75
+FIELD_WEIGHTS = {
+    "name":         3,
+    "origin":       2,
+    "purpose":      2,
+    "temperament":  2,
+    "coat":         1,
+    "health_notes": 1,
+}
+CONTENT_WEIGHT = 1
+PREFIX_LIMIT   = 20          # terms a trailing prefix may expand to
+
+STOPWORDS = frozenset("""
+    a an and are as at be been but by can do does for from had has have he her his
+    how i if in into is it its may more most no not of on or our she so some such
+    than that the their them then there these they this to too very was we were
+    what when which who will with you your
+""".split())
+
+
+# ── Tokenizing ───────────────────────────────────────────────────────────────
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_VOWELS   = frozenset("aeiou")
+
+
+def _consonant(word: str, i: int) -> bool:
+    ch = word[i]
+    if ch in _VOWELS:
+        return False
+    if ch == "y":
+        return i == 0 or not _consonant(word, i - 1)
+    return True
+
+
+def _measure(stem: str) -> int:
+    """Porter's m: the number of VC sequences in stem."""
+    m, prev_vowel = 0, False
+    for i in range(len(stem)):
+        vowel = not _consonant(stem, i)
+        if prev_vowel and not vowel:
+            m += 1
+        prev_vowel = vowel
+    return m
+
+
+def _has_vowel(stem: str) -> bool:
+    return any(not _consonant(stem, i) for i in range(len(stem)))
+
+
+def _double_consonant(word: str) -> bool:
+    return len(word) >= 2 and word[-1] == word[-2] and _consonant(word, len(word) - 1)
+
+
+def _cvc(word: str) -> bool:
+    """Ends consonant-vowel-consonant, the last not w, x or y."""
+    return (len(word) >= 3 and _consonant(word, len(word) - 1) and not _consonant(word, len(word) - 2)
+            and _consonant(word, len(word) - 3) and word[-1] not in "wxy")
+
+
+_STEP2 = [("ational", "ate"), ("tional", "tion"), ("enci", "ence"), ("anci", "ance"), ("izer", "ize"),
+          ("abli", "able"), ("alli", "al"), ("entli", "ent"), ("eli", "e"), ("ousli", "ous"),
+          ("ization", "ize"), ("ation", "ate"), ("ator", "ate"), ("alism", "al"), ("iveness", "ive"),
+          ("fulness", "ful"), ("ousness", "ous"), ("aliti", "al"), ("iviti", "ive"), ("biliti", "ble")]
+_STEP3 = [("icate", "ic"), ("ative", ""), ("alize", "al"), ("iciti", "ic"), ("ical", "ic"),
+          ("ful", ""), ("ness", "")]
+_STEP4 = ["ement", "ment", "ance", "ence", "able", "ible", "ant", "ent", "ism", "ate", "iti",
+          "ous", "ive", "ize", "ion", "al", "er", "ic", "ou"]
+
+
+def _replace(word: str, rules, min_m: int) -> str:
+    for suffix, repl in sorted(rules, key=lambda r: -len(r[0])):
+        if word.endswith(suffix):
+            stem = word[:-len(suffix)]
+            return stem + repl if _measure(stem) > min_m else word
+    return word
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """Porter (1980) stemmer.  Memoized: prose repeats a small vocabulary."""
+    if len(word) <= 2:
+        return word
+    # Step 1a
+    if word.endswith("sses") or word.endswith("ies"):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    # Step 1b
+    if word.endswith("eed"):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ("ed", "ing"):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(("at", "bl", "iz")):
+                    word += "e"
+                elif _double_consonant(word) and word[-1] not in "lsz":
+                    word = word[:-1]
+                elif _measure(word) == 1 and _cvc(word):
+                    word += "e"
+                break
+    # Step 1c
+    if word.endswith("y") and _has_vowel(word[:-1]):
+        word = word[:-1] + "i"
+    # Steps 2–3
+    word = _replace(word, _STEP2, 0)
+    word = _replace(word, _STEP3, 0)
+    # Step 4
+    for suffix in _STEP4:
+        if word.endswith(suffix):
+            stem_ = word[:-len(suffix)]
+            if _measure(stem_) > 1 and (suffix != "ion" or stem_.endswith(("s", "t"))):
+                word = stem_
+            break
+    # Step 5
+    if word.endswith("e"):
+        stem_ = word[:-1]
+        if _measure(stem_) > 1 or (_measure(stem_) == 1 and not _cvc(stem_)):
+            word = stem_
+    if _measure(word) > 1 and _double_consonant(word) and word.endswith("l"):
+        word = word[:-1]
+    return word
+
+
+def words(text: str) -> list[str]:
+    """Text → case-folded, accent-stripped words, stopwords included."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(text)
+
+
+def tokenize(text: str) -> list[str]:
+    """Text → stemmed, stopword-free terms."""
+    return [stem(t) for t in words(text) if t not in STOPWORDS]
+
+
+# ── Documents ────────────────────────────────────────────────────────────────
+
+def _strings(node, skip=("breed", "slug", "url", "scraped_at", "rating")):
+    """Every string inside a scraped-content record."""
+    if isinstance(node, str):
+        yield node
+    elif isinstance(node, list):
+        for v in node:
+            yield from _strings(v, skip)
+    elif isinstance(node, dict):
+        for k, v in node.items():
+            if k not in skip:
+                yield from _strings(v, skip)
+
+
+def load_content(slug: str, archive=None) -> dict | None:
+    """Scraped article for slug from the content pack, else breed_details/<slug>.json."""
+    if archive is not None and slug in archive:
+        return archive.get(slug)
+    path = DETAILS_DIR / f"{slug}.json"
+    if path.exists():
+        return json.loads(path.read_text())
+    return None
+
+
+def document_terms(breed: dict, content: dict | None) -> Counter:
+    """{term: field-weighted frequency} for one breed."""
+    tf = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = breed.get(field)
+        text  = " ".join(value) if isinstance(value, list) else str(value or "")
+        for term in tokenize(text):
+            tf[term] += weight
+    if content:
+        for text in _strings(content):
+            for term in tokenize(text):
+                tf[term] += CONTENT_WEIGHT
+    return tf
+
+
+def _slug(breed: dict) -> str:
+    return breed.get("dogtime_slug") or breed["name"]
+
+
+def _open_archive():
+    if not all(p.exists() for p in PACK_FILES):
+        return None
+    from breed_archive import BreedArchive
+    return BreedArchive()
+
+
+# ── Index ────────────────────────────────────────────────────────────────────
+
+class SearchIndex:
+    """Inverted index: term → {slug: weighted tf}, with per-document lengths."""
+
+    def __init__(self):
+        self.postings: dict[str, dict[str, float]] = {}
+        self.docs:     dict[str, dict]             = {}    # slug → {"name", "length", "terms"}
+        self.total_length = 0.0
+        self._vocab: list[str] | None = None               # sorted terms, for prefix lookups
+        self._owned: set[str] | None  = None               # terms whose postings this index may modify; None: all
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @classmethod
+    def build(cls, breeds: list[dict] | None = None) -> "SearchIndex":
+        breeds  = breeds if breeds is not None else json.loads(BREEDS_FILE.read_text())
+        index   = cls()
+        archive = _open_archive()
+        try:
+            for b in breeds:
+                slug = _slug(b)
+                index.upsert(slug, b["name"], document_terms(b, load_content(slug, archive)))
+        finally:
+            if archive is not None:
+                archive.close()
+        return index
+
+    # ── Incremental updates ──────────────────────────────────────────────────
+
+    def copy(self) -> "SearchIndex":
+        """
+        An index to apply changes to while readers keep using this one.  The
+        posting dicts are shared until the copy first modifies one.
+        """
+        other = self.__class__()
+        other.postings     = dict(self.postings)
+        other.docs         = dict(self.docs)               # entries are replaced, never modified
+        other.total_length = self.total_length
+        other._vocab       = self._vocab
+        other._owned       = set()
+        return other
+
+    def _writable(self, term: str) -> dict[str, float]:
+        postings = self.postings.get(term)
+        if postings is None or (self._owned is not None and term not in self._owned):
+            postings = self.postings[term] = dict(postings or {})
+            if self._owned is not None:
+                self._owned.add(term)
+        return postings
+
+    def upsert(self, slug: str, name: str, tf: Counter) -> None:
+        self.remove(slug)
+        for term, n in tf.items():
+            self._writable(term)[slug] = n
+        length = float(sum(tf.values()))
+        self.docs[slug] = {"name": name, "length": length, "terms": sorted(tf)}
+        self.total_length += length
+        self._vocab = None
+
+    def remove(self, slug: str) -> bool:
+        doc = self.docs.pop(slug, None)
+        if doc is None:
+            return False
+        for term in doc["terms"]:
+            if term in self.postings:
+                postings = self._writable(term)
+                postings.pop(slug, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= doc["length"]
+        self._vocab = None
+        return True
+
+    # ── Search ───────────────────────────────────────────────────────────────
+
+    def _expand(self, prefix: str) -> list[str]:
+        vocab = self._vocab
+        if vocab is None:
+            vocab = self._vocab = sorted(self.postings)
+        i, out = bisect_left(vocab, prefix), []
+        while i < len(vocab) and vocab[i].startswith(prefix) and len(out) < PREFIX_LIMIT:
+            out.append(vocab[i])
+            i += 1
+        return out
+
+    def search(self, query: str, limit: int = 10) -> list[dict]:
+        """[{slug, name, score}] best first; empty for an empty query."""
+        raw   = words(query)
+        terms = [stem(t) for t in raw if t not in STOPWORDS]
+        if not terms or not self.docs:
+            return []
+        groups = [[t] for t in terms[:-1]]
+        # The last word may still be being typed: match it as a prefix too.
+        # Not when it's a stopword: terms[-1] then comes from an earlier word,
+        # and "the*" expansions would count as matches for that word.
+        last = {terms[-1]}
+        if raw[-1] not in STOPWORDS:
+            last.update(self._expand(raw[-1]))
+        groups.append(sorted(last))
+
+        n, avg = len(self.docs), self.total_length / len(self.docs)
+        scores: dict[str, float] = {}
+        for group in groups:
+            best: dict[str, float] = {}            # one query word scores once per doc
+            for term in group:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for slug, tf in postings.items():
+                    norm = K1 * (1 - B + B * self.docs[slug]["length"] / avg)
+                    s    = idf * tf * (K1 + 1) / (tf + norm)
+                    if s > best.get(slug, 0.0):
+                        best[slug] = s
+            for slug, s in best.items():
+                scores[slug] = scores.get(slug, 0.0) + s
+
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+        return [{"slug": slug, "name": self.docs[slug]["name"], "score": round(s, 4)} for slug, s in ranked]
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def save(self, path: Path = INDEX_FILE) -> None:
+        tmp = Path(path).with_suffix(".tmp")
+        tmp.write_text(json.dumps({"docs": self.docs, "postings": self.postings},
+                                  ensure_ascii=False, separators=(",", ":")))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_FILE) -> "SearchIndex | None":
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError):
+            return None
+        index = cls()
+        index.docs         = data["docs"]
+        index.postings     = data["postings"]
+        index.total_length = float(sum(d["length"] for d in index.docs.values()))
+        return index
+
+
+# ── Shared index ─────────────────────────────────────────────────────────────
+# The server keeps one index in memory.  It is rebuilt when the breeds file or
+# the content pack is newer than search_index.json; add/remove and
+# scrape_breed.py --save keep the file current incrementally, on a copy that
+# replaces the shared index once saved (see shared_index.py).
+
+_shared = SharedIndex(SearchIndex, INDEX_FILE, sources=(BREEDS_FILE, *PACK_FILES))
+
+
+def get_index() -> SearchIndex:
+    return _shared.get()
+
+
+def index_breeds(slugs: list[str]) -> None:
+    """Re-index these breeds from large_dog_breeds.json and their scraped content."""
+    breeds = {_slug(b): b for b in json.loads(BREEDS_FILE.read_text())}
+
+    def apply(index: SearchIndex) -> None:
+        archive = _open_archive()
+        try:
+            for slug in slugs:
+                if slug in breeds:
+                    b = breeds[slug]
+                    index.upsert(slug, b["name"], document_terms(b, load_content(slug, archive)))
+                else:
+                    index.remove(slug)
+        finally:
+            if archive is not None:
+                archive.close()
+    _shared.update(apply)
+
+
+def remove_breed(slug: str) -> None:
+    """Drop one breed from search_index.json."""
+    _shared.update(lambda index: index.remove(slug))
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def _bench(n: int) -> None:
+    import random
+    rnd    = random.Random(0)
+    base   = json.loads(BREEDS_FILE.read_text())
+    words  = sorted({w for b in base for f in FIELD_WEIGHTS for w in re.findall(r"[A-Za-z]+", str(b.get(f)))})
+    words += [f"word{i}" for i in range(20_000)]               # long tail, like real article prose
+    breeds, contents = [], {}
+    for i in range(n):
+        b = dict(base[i % len(base)], name=f"{base[i % len(base)]['name']} {i}", dogtime_slug=f"s{i}")
+        breeds.append(b)
+        contents[b["dogtime_slug"]] = {"intro": " ".join(rnd.choices(words, k=150)),
+                                       "sections": [{"title": rnd.choice(words),
+                                                     "text": " ".join(rnd.choices(words, k=120))}
+                                                    for _ in range(6)]}
+    t0 = time.perf_counter()
+    index = SearchIndex()
+    for b in breeds:
+        index.upsert(b["dogtime_slug"], b["name"], document_terms(b, contents[b["dogtime_slug"]]))
+    print(f"{n:,} documents (~900 words each), {len(index.postings):,} terms: "
+          f"built in {time.perf_counter() - t0:.2f}s")
+    for q in ("gentle guardian", "hip dysplasia bloat", "newf", "friendly loyal family companion"):
+        index.search(q)
+        t0 = time.perf_counter()
+        for _ in range(20):
+            index.search(q)
+        print(f"  {(time.perf_counter() - t0) / 20 * 1e3:7.2f} ms  {q!r}")
+    extra = dict(breeds[0], dogtime_slug="new")
+    t0 = time.perf_counter()
+    index.upsert("new", "New", document_terms(extra, contents["s0"]))
+    print(f"  upsert one document {(time.perf_counter() - t0) * 1e3:.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="BM25 full-text search over breeds and scraped content")
+    ap.add_argument("query", nargs="?", help="Search text")
+    ap.add_argument("--limit", type=int, default=10, help="Results to show (default 10)")
+    ap.add_argument("--build", action="store_true", help=f"Rebuild {INDEX_FILE.name}")
+    ap.add_argument("--bench", type=int, metavar="N", help="Time build and queries on N synthetic documents")
+    args = ap.parse_args()
+
+    if args.bench:
+        _bench(args.bench)
+        return
+    if args.build:
+        index = SearchIndex.build()
+        index.save()
+        print(f"Built {INDEX_FILE.name}: {len(index)} documents, {len(index.postings):,} terms")
+    if args.query:
+        for hit in get_index().search(args.query, limit=args.limit):
+            print(f"  {hit['score']:7.3f}  {hit['name']}")
+    elif not args.build:
+        ap.print_help()
+
+
+if __name__ == "__main__":
+    main()
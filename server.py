@@ -9,147 +9,1263 @@ Replaces:  python -m http.server 8000
 Usage:     python server.py              # port 8000
            python server.py --port 8080
            python server.py --port 8000 --host 0.0.0.0  # LAN access
+           python server.py --workers 32 # handler threads (0 = single-threaded)
+           python server.py --job-workers 2
+           python server.py --warm       # preload everything; GET /api/ready says when
+
+Requests are served by a bounded thread pool, so static files and read-only
+API calls never wait behind anything.  Add/remove/refresh scrape DogTime, so
+they run as background jobs.  The POST returns 202 with a job right away and
+the client polls GET /api/jobs/<id>.
+
+Connections are HTTP/1.1 and persistent, so a page load's ~80 requests reuse
+a browser's handful of connections.  Every response has a Content-Length
+(except 304s and the SSE stream, which closes its connection).  Request
+bodies are always read or skipped in full, so pipelined requests parse
+cleanly.  A connection is closed after KEEPALIVE_MAX requests, after
+KEEPALIVE_IDLE idle seconds, or sooner while other connections are waiting for
+a pool thread.  The single-threaded server (--workers 0) closes after every
+response.
 
 API endpoints:
     POST /api/add-breed
         Body:    {"name": "Samoyed"}
-        Returns: {"ok": true,  "breed": {...}, "placeholders": [...]}
+        Returns: 202 {"ok": true, "job": {"id", "status": "queued", ...}, "coalesced": false}
+                 429 when JOB_QUEUE_DEPTH jobs are already waiting
+        The job's result is add_breed_entry()'s dict:
+                 {"ok": true,  "breed": {...}, "placeholders": [...]}
                  {"ok": false, "error": "..."}
+        A second request for a breed that already has a queued or running job of
+        the same kind returns that job ("coalesced": true) instead of a new one.
+
+    POST /api/add-breeds
+        Body:    {"names": ["Samoyed", "Borzoi", ...]}
+        Same job flow; result from add_breeds(): {"ok": true, "results": {name: result}}.
+        Pages are fetched concurrently and committed with one write and one
+        rescore; the job's progress message advances once per breed.
+
+    POST /api/remove-breed
+        Body:    {"name": "Samoyed"}       same job flow; result from remove_breed_entry()
+
+    POST /api/refresh-breed
+        Body:    {"name": "Samoyed"}       fill auto-extractable gaps for one breed
+                 {}                        ... or for every breed that has gaps
+
+    GET  /api/jobs/<id>
+        Returns: {"id", "kind", "name", "status": "queued"|"running"|"done"|"failed",
+                  "position", "progress": {"step", "message"}, "result", "elapsed"}
+    GET  /api/jobs
+        Returns: {"jobs": [...]}, most recent first
 
     GET  /api/breeds
-        Returns the current large_dog_breeds.json content as JSON.
+        Returns the current large_dog_breeds.json content as JSON, with each
+        breed's fingerprinted image_url and thumb_url.
+    GET  /api/breeds?weight=80-&rating=Easy To Train:4&origin=Germany&sort=-service_dog_score
+                    &fields=name,service_dog_score&limit=20&cursor=...
+        Returns: {"ok": true, "total", "count", "breeds": [...], "next_cursor"}
+        Filters, sorts, projects and pages on column indexes (see breed_query.py).
+    GET  /api/breeds?since=<version>
+        Returns: {"ok": true, "version", "full": false,
+                  "changes": [{"version", "op": "upsert"|"delete", "slug", "breed", "ratings"}, ...]}
+        Only the breeds changed after version (the X-Breeds-Version header of
+        a full /api/breeds).  A version too old to answer gets
+        {"full": true, "breeds": [...], "ratings": {...}} instead.
+    GET  /api/events
+        Server-Sent Events: "ready" {"version"}, then one "change" event (id =
+        version) per breed upsert or delete, and "reset" when a reconnect's
+        Last-Event-ID is too old.  See change_feed.py.
+
+    /api/breeds is served from an in-memory cache (FileCache) that is
+    revalidated with one stat() per request.  Static files are streamed from
+    disk with sendfile and support HEAD and single-range Range requests (206).
+    Everything carries a strong ETag, and a matching If-None-Match gets 304.
+
+    GET  /api/ready
+        Returns: 200 {"ready": true, "warm": false} without --warm.  With it,
+                 503 {"ready": false, "warm": true, "step", "steps": {name: seconds}}
+                 while warming up (Retry-After: 1), then 200 with "seconds" and
+                 any "errors".  The warm-up imports the add/remove stack, builds
+                 the query / similarity / search / profile / scoring indexes,
+                 caches /api/breeds in every encoding, precompresses the static
+                 assets and renders the 160 and 320 px WebP thumbnails.
+
+    GET  /metrics
+        Prometheus text format: request counts and latency histograms per
+        route, outbound fetches per host and status, pipeline stage timings
+        from jobs, payload-cache and job-queue gauges (see metrics.py).
+
+    GET  /img/<slug>?w=320&fmt=webp&v=<hash>
+        The breed's photo resized to w (snapped up to 160/320/480/640/960/1280)
+        as webp or jpeg, rendered once and kept in an LRU disk cache (see
+        image_variants.py).  Immutable when v is the photo's current hash, as
+        in each breed's thumb_url from /api/breeds.
+
+    GET  /api/assets
+        Returns: {"assets": {"images/great-dane.jpg": "/images/great-dane.<hash>.jpg", ...}}
+        Fingerprinted URLs (see asset_manifest.py) are served with
+        Cache-Control: public, max-age=31536000, immutable.
+
+    GET  /api/profiles
+        Returns: {"profiles": [{"name", "label", "description"}, ...],
+                  "scores": {slug: [score per profile, ...]}}
+    GET  /api/profiles?profile=family&top=10
+        Returns: {"ok": true, "profile": "family", "breeds": [{"slug", "score"}, ...]}
+
+    GET  /api/similar?slug=bernese-mountain-dog&k=10&exclude=newfoundland,leonberger
+        Returns: {"ok": true, "slug": ..., "similar": [{"slug", "name", "distance"}, ...]}
+        Nearest breeds by z-scored ratings and body size (see similarity.py).
+
+    GET  /api/search?q=gentle family guardian&limit=10
+        Returns: {"ok": true, "query": ..., "results": [{"slug", "name", "score"}, ...]}
+        BM25 full-text search over breed fields and scraped articles, with
+        stemming and prefix matching on the last word (see search_index.py).
+
+    POST /api/score
+        Body:    {"weights": [{"Easy To Train": 3, "Prey Drive": -2}, ...],
+                  "top": 10}                       # optional
+        Returns: {"ok": true, "traits": [...], "base_weights": {...},
+                  "slugs": [...], "scores": [[1-5 or null, ...], ...]}
+                 (or "top": [[{"slug", "score"}, ...], ...] when top is given)
+        Scores every weight vector against every breed in one matrix product.
 """
 
 import argparse
+import hashlib
 import json
 import mimetypes
 import os
+import select
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.utils import formatdate, parsedate_to_datetime
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
-from urllib.parse import unquote
+from typing import Callable
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import metrics
+from asset_manifest import IMMUTABLE, get_manifest, stat_key
+from precompress import ENCODINGS, MIN_SIZE, compress_bytes, compressed_sibling, is_compressible, negotiate
 
 ROOT = Path(__file__).parent
 
+mimetypes.add_type("text/javascript", ".jsx")    # unknown to mimetypes; the app fetches it as text
+
+DEFAULT_WORKERS = 16     # handler threads
+JOB_WORKERS     = 1      # background job threads
+JOB_QUEUE_DEPTH = 16     # waiting jobs before new submissions get 429
+JOB_HISTORY     = 200    # finished jobs kept for GET /api/jobs/<id>
+CACHE_MAX_BYTES = 64 << 20   # file bytes held in memory in total
+CACHE_MAX_FILE  = 8 << 20    # larger files are read per request, not cached
+EVENT_HEARTBEAT = 15         # seconds between SSE keep-alive comments
+KEEPALIVE_IDLE  = 5          # seconds an idle persistent connection is kept open
+KEEPALIVE_MAX   = 100        # requests per connection before it's closed
+IDLE_POLL       = 0.25       # seconds between checks for queued connections while idle
+MAX_BODY        = 4 << 20    # request body bytes
+
+BULK_MAX_NAMES  = 200        # breeds per POST /api/add-breeds
+
+JOB_ENDPOINTS = {
+    "/api/add-breed":     "add",
+    "/api/add-breeds":    "add-many",
+    "/api/remove-breed":  "remove",
+    "/api/refresh-breed": "refresh",
+}
+
+# Jobs rewrite the shared data files, so they hold _mutation_lock while they
+# run.  Extra job workers therefore only help once part of a job runs
+# outside the lock.  The data files are replaced atomically (temp file +
+# rename), so readers never need the lock.
+_mutation_lock = threading.Lock()
+
+
+# ── Background jobs ──────────────────────────────────────────────────────────
+
+@dataclass(slots=True)
+class Job:
+    kind:     str
+    name:     str
+    names:    tuple[str, ...] = ()    # "add-many" only; name is their comma-joined list
+    id:       str          = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    status:   str          = "queued"
+    step:     int          = 0
+    message:  str          = ""
+    result:   dict | None  = None
+    created:  float        = field(default_factory=time.time)
+    started:  float | None = None
+    finished: float | None = None
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return self.kind, self.name.casefold()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def report(self, message: str) -> None:
+        """Progress callback handed to add_breed_entry & co."""
+        self.step   += 1
+        self.message = message
+
+    def to_dict(self, position: int | None = None) -> dict:
+        end = self.finished or time.time()
+        d = {
+            "id":       self.id,
+            "kind":     self.kind,
+            "name":     self.name,
+            "status":   self.status,
+            "progress": {"step": self.step, "message": self.message},
+            "result":   self.result,
+            "elapsed":  round(end - (self.started or self.created), 3),
+        }
+        if self.names:
+            d["names"] = list(self.names)
+        if position is not None:
+            d["position"] = position
+        return d
+
+
+class QueueFull(Exception):
+    pass
+
+
+def run_job(job: Job) -> dict:
+    """Run one add/remove/refresh job under the mutation lock."""
+    import add_breed
+    with _mutation_lock:
+        if job.kind == "add":
+            return add_breed.add_breed_entry(job.name, progress=job.report)
+        if job.kind == "add-many":
+            return add_breed.add_breeds(list(job.names), progress=job.report)
+        if job.kind == "remove":
+            return add_breed.remove_breed_entry(job.name, progress=job.report)
+        if job.kind == "refresh" and job.name:
+            return add_breed.refresh_breed_entry(job.name, progress=job.report)
+        if job.kind == "refresh":
+            return add_breed.refresh_all_breeds(progress=job.report)
+    raise ValueError(f"Unknown job kind {job.kind!r}")
+
+
+class JobQueue:
+    """
+    FIFO of Jobs run by a fixed number of worker threads.
+
+    submit() coalesces with a queued or running job of the same (kind, breed)
+    and raises QueueFull once max_queued jobs are waiting.  Finished jobs
+    stay readable until more than `history` jobs are tracked.
+    """
+
+    def __init__(self, run=run_job, workers: int = JOB_WORKERS,
+                 max_queued: int = JOB_QUEUE_DEPTH, history: int = JOB_HISTORY, on_finish=None):
+        self.run        = run
+        self.on_finish  = on_finish      # called after each job, before it's marked finished
+        self.max_queued = max_queued
+        self.history    = history
+        self._lock      = threading.Lock()
+        self._ready     = threading.Condition(self._lock)
+        self._jobs:     dict[str, Job]             = {}    # id → job, oldest first
+        self._inflight: dict[tuple[str, str], Job] = {}    # key → queued/running job
+        self._pending:  deque[Job]                 = deque()
+        for i in range(max(1, workers)):
+            threading.Thread(target=self._worker, name=f"job-{i}", daemon=True).start()
+
+    def submit(self, kind: str, name: str, names: tuple[str, ...] = ()) -> tuple[Job, bool]:
+        """(job, created) — created is False when an in-flight job was reused."""
+        with self._lock:
+            job = self._inflight.get((kind, name.casefold()))
+            if job is not None:
+                return job, False
+            if len(self._pending) >= self.max_queued:
+                raise QueueFull(f"{len(self._pending)} jobs already waiting")
+            job = Job(kind, name, names)
+            self._jobs[job.id]      = job
+            self._inflight[job.key] = job
+            self._pending.append(job)
+            self._trim()
+            self._ready.notify()
+            return job, True
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job and job.to_dict(self._position(job))
+
+    def queued(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def recent(self) -> list[dict]:
+        with self._lock:
+            return [j.to_dict(self._position(j)) for j in reversed(self._jobs.values())]
+
+    def _position(self, job: Job) -> int | None:
+        """Jobs ahead of a queued job, None once it has started."""
+        return self._pending.index(job) if job.status == "queued" else None
+
+    def _trim(self) -> None:
+        excess = len(self._jobs) - self.history
+        for job_id in [j.id for j in self._jobs.values() if j.done][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def _worker(self) -> None:
+        while True:
+            with self._ready:
+                while not self._pending:
+                    self._ready.wait()
+                job = self._pending.popleft()
+                job.status, job.started = "running", time.time()
+            try:
+                result = self.run(job)
+            except Exception as exc:
+                result = {"ok": False, "error": str(exc)}
+            if self.on_finish:
+                try:
+                    self.on_finish(job)
+                except Exception as exc:
+                    print(f"  on_finish failed for job {job.id}: {exc}")
+            with self._lock:
+                job.result   = result
+                job.status   = "done" if result.get("ok") else "failed"
+                job.finished = time.time()
+                self._inflight.pop(job.key, None)
+
+
+# ── Payload cache ────────────────────────────────────────────────────────────
+
+class FileCache:
+    """
+    File bytes and a strong ETag, kept in memory per path, together with
+    any compressed variants requested so far.
+
+    Each lookup stat()s the file and reuses the entry while its (inode,
+    mtime, size) is unchanged.  Writers replace files by rename, so the inode
+    changes on every write.  The file is read through the opened descriptor,
+    so the bytes always match the key stored with them.  LRU-evicted down to
+    max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES, max_file: int = CACHE_MAX_FILE):
+        self.max_bytes = max_bytes
+        self.max_file  = max_file
+        self.size      = 0
+        self.hits      = 0
+        self.misses    = 0
+        self._lock     = threading.Lock()
+        # path → (key, {encoding or None: bytes}, etag of the identity bytes)
+        self._entries: OrderedDict[Path, tuple[tuple, dict, str]] = OrderedDict()
+
+    @staticmethod
+    def _key(st: os.stat_result) -> tuple:
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def get(self, path: Path, encoding: str | None = None, render=None, version=None) -> tuple[bytes, str]:
+        """
+        (body, etag) for path, compressed for encoding ("br" / "gzip") if
+        given.  render(raw) → bytes transforms the file before caching.  The
+        entry is also keyed on version, so bump it when render's output would
+        change.  Raises OSError if it can't be read.
+        """
+        key = (*self._key(os.stat(path)), version)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == key and encoding in entry[1]:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1][encoding], variant_etag(entry[2], encoding)
+
+        if entry and entry[0] == key:
+            bodies, etag = entry[1], entry[2]
+        else:
+            with open(path, "rb") as f:
+                key  = (*self._key(os.fstat(f.fileno())), version)
+                raw  = f.read()
+            if render is not None:
+                raw = render(raw)
+            bodies = {None: raw}
+            etag   = '"' + hashlib.blake2b(raw, digest_size=16).hexdigest() + '"'
+        if encoding not in bodies:
+            bodies = {**bodies, encoding: compress_bytes(bodies[None], encoding)}
+
+        with self._lock:
+            self.misses += 1
+            old = self._entries.pop(path, None)
+            if old:
+                self.size -= sum(map(len, old[1].values()))
+            if len(bodies[None]) <= self.max_file:
+                self._entries[path] = (key, bodies, etag)
+                self.size += sum(map(len, bodies.values()))
+                while self.size > self.max_bytes:
+                    _, (_, evicted, _) = self._entries.popitem(last=False)
+                    self.size -= sum(map(len, evicted.values()))
+        return bodies[encoding], variant_etag(etag, encoding)
+
+
+_files = FileCache()
+
+metrics.METRICS.gauge("file_cache_bytes", "Bytes held by the payload cache").set_function(lambda: _files.size)
+metrics.METRICS.counter("file_cache_hits_total", "Payload cache hits").set_function(lambda: _files.hits)
+metrics.METRICS.counter("file_cache_misses_total", "Payload cache misses").set_function(lambda: _files.misses)
+
+
+def variant_etag(etag: str, encoding: str | None) -> str:
+    """Strong ETags must differ per Content-Encoding: "abc" → "abc-gzip"."""
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def stat_etag(st: os.stat_result) -> str:
+    """Strong ETag from (inode, mtime, size).  Every writer replaces files by
+    rename, so the inode alone changes whenever the content does."""
+    return f'"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """
+    A single "bytes=" Range header → inclusive (start, end) within size.
+    None means serve the whole file: the header is malformed or asks for
+    several ranges, which RFC 9110 allows a server to ignore.  Raises
+    ValueError when the range can't be satisfied (→ 416).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash or not (first + last).isdigit():
+        return None
+    if not first:                                   # bytes=-N: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError(header)
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    end   = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise ValueError(header)
+    if start > end:
+        return None
+    return start, end
+
+
+def static_path(url_path: str) -> Path | None:
+    """URL path → file under ROOT, or None for anything that would escape
+    ROOT (../, symlinks) or touch a dot-file such as .git/."""
+    rel = url_path.lstrip("/")
+    if any(part.startswith(".") for part in Path(rel).parts):
+        return None
+    path = (ROOT / rel).resolve()
+    if not path.is_relative_to(ROOT.resolve()) or not path.is_file():
+        return None
+    return path
+
+
+def route_label(path: str, status: int | None) -> str:
+    """
+    A bounded metrics label for a request path: API routes as-is, job ids
+    collapsed to "/api/jobs/:id", static files under a directory to
+    "/images/*" etc., and every 404 to "unmatched".
+    """
+    if status == 404 or not path.startswith("/"):
+        return "unmatched"
+    if path.startswith("/api/jobs/"):
+        return "/api/jobs/:id"
+    first, sep, _ = path[1:].partition("/")
+    if sep and first != "api":
+        return f"/{first}/*"
+    return path
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(t.strip().removeprefix("W/") == etag for t in if_none_match.split(","))
+
+
+def not_modified_since(if_modified_since: str | None, mtime: float) -> bool:
+    """If-Modified-Since check, to the second (HTTP dates have no fractions)."""
+    if not if_modified_since:
+        return False
+    try:
+        return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+# ── Warm start ───────────────────────────────────────────────────────────────
+
+class WarmUp:
+    """
+    Named steps run once, in order, on a background thread.  ready is set
+    when the last one finishes; a step that fails is recorded in errors and
+    the rest still run, since its cache will simply be built on first use.
+    """
+
+    def __init__(self, steps: list[tuple[str, Callable[[], None]]]):
+        self.steps   = steps
+        self.timings: dict[str, float] = {}
+        self.errors:  dict[str, str]   = {}
+        self.current = None
+        self.started = None
+        self.ready   = threading.Event()
+
+    def start(self) -> "WarmUp":
+        threading.Thread(target=self.run, name="warm-up", daemon=True).start()
+        return self
+
+    def run(self) -> None:
+        self.started = time.perf_counter()
+        for name, step in self.steps:
+            self.current = name
+            t0 = time.perf_counter()
+            try:
+                step()
+            except Exception as exc:
+                self.errors[name] = f"{type(exc).__name__}: {exc}"
+            self.timings[name] = round(time.perf_counter() - t0, 3)
+        self.current = None
+        self.ready.set()
+
+    def to_dict(self) -> dict:
+        d = {"ready": self.ready.is_set(), "warm": True, "steps": self.timings}
+        if self.current:
+            d["step"] = self.current
+        if self.ready.is_set():
+            d["seconds"] = round(sum(self.timings.values()), 3)
+        if self.errors:
+            d["errors"] = self.errors
+        return d
+
+
+def warm_steps(server) -> list[tuple[str, Callable[[], None]]]:
+    """What --warm does before GET /api/ready reports ready."""
+
+    def imports():
+        # The add / remove / refresh stack: requests, bs4, lxml, PIL, numpy
+        import add_breed, compute_service_score, profiles, scoring, similarity  # noqa: F401
+
+    def datasets():
+        from breed_query import get_index as get_query_index
+        from profiles import get_table
+        from scoring import get_engine
+        from search_index import get_index as get_search_index
+        from similarity import get_index as get_similarity_index
+        server.feed.sync()
+        get_query_index()
+        get_similarity_index()
+        get_search_index()
+        get_table()
+        get_engine()
+
+    def payloads():
+        # /api/breeds in every encoding, and the .br / .gz siblings of the static text assets
+        from precompress import precompress_all
+        manifest = get_manifest()
+        for encoding in (None, *ENCODINGS):
+            _files.get(ROOT / "large_dog_breeds.json", encoding, with_image_urls, manifest.version)
+        precompress_all(ROOT, verbose=False)
+
+    def thumbnails():
+        from image_variants import warm
+        warm()
+
+    return [("imports", imports), ("datasets", datasets), ("payloads", payloads), ("thumbnails", thumbnails)]
+
+
+def with_image_url(breed: dict, manifest) -> dict:
+    """
+    breed plus its fingerprinted image_url and thumb_url (the base of its
+    resized /img/ variants), if it has an image.  A copy; breed is untouched.
+    """
+    from image_variants import variant_base
+    slug = breed.get("dogtime_slug") or ""
+    url  = manifest.image_url(slug)
+    return {**breed, "image_url": url, "thumb_url": variant_base(slug, manifest)} if url else breed
+
+
+def with_image_urls(raw: bytes) -> bytes:
+    """large_dog_breeds.json with each breed's fingerprinted image_url added."""
+    manifest = get_manifest()
+    return json.dumps([with_image_url(b, manifest) for b in json.loads(raw)], ensure_ascii=False).encode()
+
+
+def change_payload(change: dict, manifest) -> dict:
+    return {**change, "breed": with_image_url(change["breed"], manifest)} if "breed" in change else change
+
 
 class Handler(BaseHTTPRequestHandler):
 
+    protocol_version = "HTTP/1.1"    # persistent connections; see handle()
+    disable_nagle_algorithm = True   # headers and body are separate writes; don't hold the body for an ACK
+    timeout = 30    # seconds; a stalled client can't pin a pool thread forever
+
     def log_message(self, fmt, *args):
         # Quieter logging: only print non-static-file requests
         if not any(self.path.startswith(p) for p in ("/images/", "/favicon")):
             print(f"  {self.address_string()} {self.command} {self.path}")
 
+    # ── Connections ──────────────────────────────────────────────────────────
+
+    _served = 0    # responses sent on this connection
+
+    def handle(self):
+        """
+        Serve requests on one connection until it closes.  Between requests
+        the thread waits at most KEEPALIVE_IDLE, and gives up sooner if
+        other connections are queued for a pool thread.
+        """
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self._next_request_ready():
+            self.handle_one_request()
+
+    def _next_request_ready(self) -> bool:
+        if not isinstance(self.server, PooledHTTPServer):
+            return False                            # single-threaded: an idle wait blocks everyone
+        sock = self.connection
+        sock.settimeout(0)
+        try:
+            if self.rfile.peek(1):                  # pipelined: already buffered or on the socket
+                return True
+        except OSError:
+            return False
+        finally:
+            sock.settimeout(self.timeout)
+        deadline = time.monotonic() + KEEPALIVE_IDLE
+        while (remaining := deadline - time.monotonic()) > 0 and not self.server.saturated():
+            if select.select([sock], [], [], min(remaining, IDLE_POLL))[0]:
+                return True                         # next request, or EOF (readline sees b"")
+        return False
+
+    def end_headers(self):
+        """Advertise how long this connection stays open, or close it."""
+        if not self.close_connection:
+            self._served += 1
+            if (self._served >= KEEPALIVE_MAX or not isinstance(self.server, PooledHTTPServer)
+                    or self.server.saturated()):
+                self.send_header("Connection", "close")
+            else:
+                if self.request_version == "HTTP/1.0":   # 1.1 is persistent by default; 1.0 must opt in
+                    self.send_header("Connection", "keep-alive")
+                self.send_header("Keep-Alive", f"timeout={KEEPALIVE_IDLE}, max={KEEPALIVE_MAX - self._served}")
+        super().end_headers()
+
+    def _read_body(self) -> bytes | None:
+        """
+        The request body, read exactly once so the next request on the
+        connection starts where it should.  None after answering 400 / 411 /
+        413 for a body that can't be framed or is too big; the connection
+        closes then, since the unread bytes can't be skipped.
+        """
+        if self._body is None:
+            length = self._body_length()
+            if isinstance(length, tuple):
+                self.close_connection = True
+                self._send(*length, {"Connection": "close"})
+                return None
+            self._body = self.rfile.read(length) if length else b""
+        return self._body
+
+    def _body_length(self) -> int | tuple[int, str, bytes]:
+        if self.headers.get("Transfer-Encoding"):
+            return 411, "text/plain", b"Length Required"
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            return 400, "text/plain", b"Bad Content-Length"
+        if length > MAX_BODY:
+            return 413, "text/plain", b"Payload Too Large"
+        return length
+
+    def _discard_body(self):
+        """Skip a body the handler didn't read (POST to an unknown path, GET with a body)."""
+        if self._body is None and not self.close_connection and self.command:
+            length = self._body_length()
+            if isinstance(length, tuple):
+                self.close_connection = True
+            elif length:
+                self.rfile.read(length)
+
+    # ── Metrics ──────────────────────────────────────────────────────────────
+
+    def handle_one_request(self):
+        """One request/response, counted and timed from its request line to the last byte."""
+        self._t0, self._status, self.path, self._body = None, None, "", None
+        try:
+            super().handle_one_request()
+            if self._t0 is not None:
+                self._discard_body()
+        finally:
+            if self._t0 is not None:
+                route = route_label(unquote(self.path.split("?")[0]), self._status)
+                metrics.HTTP_IN_FLIGHT.dec()
+                metrics.HTTP_REQUESTS.inc(route=route, method=self.command or "-", status=str(self._status or "-"))
+                metrics.HTTP_SECONDS.observe(time.perf_counter() - self._t0, route=route)
+
+    def parse_request(self):
+        self._t0 = time.perf_counter()
+        metrics.HTTP_IN_FLIGHT.inc()
+        return super().parse_request()
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
     # ── GET ──────────────────────────────────────────────────────────────────
 
+    def do_HEAD(self):
+        self._head = True
+        try:
+            self.do_GET()
+        finally:
+            self._head = False
+
     def do_GET(self):
         path = unquote(self.path.split("?")[0])
 
         if path == "/api/breeds":
-            self._json_response(json.loads((ROOT / "large_dog_breeds.json").read_text()))
+            query = urlsplit(self.path).query
+            if not query:
+                version = self.server.feed.sync()
+                self._send_file(ROOT / "large_dog_breeds.json", "application/json; charset=utf-8",
+                                render=with_image_urls, version=get_manifest().version,
+                                headers={"X-Breeds-Version": str(version)})
+                return
+            params = parse_qs(query)
+            if "since" in params:
+                self._changes_since(params)
+                return
+            from breed_query import QueryError, query_string
+            try:
+                result   = query_string(query)
+                manifest = get_manifest()
+                result["breeds"] = [with_image_url(b, manifest) for b in result["breeds"]]
+                self._json_response(result)
+            except QueryError as exc:
+                self._json_response({"ok": False, "error": str(exc)}, 400)
+            return
+
+        if path == "/api/events":
+            self._event_stream()
+            return
+
+        if path == "/api/assets":
+            self._json_response({"assets": get_manifest().urls()})
+            return
+
+        if path == "/api/ready":
+            warm = self.server.warm
+            if warm is None:
+                self._json_response({"ready": True, "warm": False})
+            elif warm.ready.is_set():
+                self._json_response(warm.to_dict())
+            else:
+                self._json_response(warm.to_dict(), 503, {"Retry-After": "1"})
+            return
+
+        if path == "/metrics":
+            self._send(200, metrics.CONTENT_TYPE, metrics.METRICS.render().encode(), {"Cache-Control": "no-cache"})
+            return
+
+        if path == "/api/jobs":
+            self._json_response({"jobs": self.server.jobs.recent()})
+            return
+
+        if path.startswith("/api/jobs/"):
+            job = self.server.jobs.get(path.removeprefix("/api/jobs/"))
+            if job is None:
+                self._json_response({"ok": False, "error": "Unknown job"}, 404)
+            else:
+                self._json_response(job)
+            return
+
+        if path == "/api/profiles":
+            from profiles import get_table, ranked
+            params  = parse_qs(urlsplit(self.path).query)
+            profile = params.get("profile", [""])[0]
+            table   = get_table()
+            if not profile:
+                self._json_response(table)
+                return
+            try:
+                top = int(params.get("top", ["0"])[0])
+            except ValueError:
+                top = -1
+            if top < 0:
+                self._json_response({"ok": False, "error": "top must be a non-negative integer"}, 400)
+                return
+            try:
+                self._json_response({"ok": True, "profile": profile, "breeds": ranked(table, profile, top or None)})
+            except KeyError:
+                self._json_response({"ok": False, "error": f"Unknown profile '{profile}'"}, 404)
+            return
+
+        if path == "/api/similar":
+            params = parse_qs(urlsplit(self.path).query)
+            slug   = params.get("slug", [""])[0].strip()
+            try:
+                k = int(params.get("k", ["10"])[0])
+            except ValueError:
+                self._json_response({"ok": False, "error": "k must be an integer"}, 400)
+                return
+            exclude = [s for v in params.get("exclude", []) for s in v.split(",") if s]
+            if not slug:
+                self._json_response({"ok": False, "error": "Missing slug"}, 400)
+                return
+
+            from similarity import get_index
+            index = get_index()
+            if slug not in index.row:
+                self._json_response({"ok": False, "error": f"Unknown breed slug '{slug}'"}, 404)
+                return
+            self._json_response({"ok": True, "slug": slug,
+                                 "similar": index.similar(slug, k=max(1, min(k, 100)), exclude=exclude)})
+            return
+
+        if path == "/api/search":
+            params = parse_qs(urlsplit(self.path).query)
+            q      = params.get("q", [""])[0].strip()
+            try:
+                limit = int(params.get("limit", ["10"])[0])
+            except ValueError:
+                self._json_response({"ok": False, "error": "limit must be an integer"}, 400)
+                return
+            if not q:
+                self._json_response({"ok": False, "error": "Missing q"}, 400)
+                return
+
+            from search_index import get_index as get_search_index
+            self._json_response({"ok": True, "query": q,
+                                 "results": get_search_index().search(q, limit=max(1, min(limit, 100)))})
+            return
+
+        if path.startswith("/img/"):
+            self._send_variant(path.removeprefix("/img/"), parse_qs(urlsplit(self.path).query))
             return
 
         # Static file serving
         if path == "/" or path == "":
             path = "/index.html"
 
-        file_path = ROOT / path.lstrip("/")
-        if not file_path.exists() or not file_path.is_file():
+        # Fingerprinted asset URL: /images/<slug>.<hash>.jpg.  An outdated
+        # hash still gets the current file, but not as immutable.
+        asset_key = None
+        if static_path(path) is None and (asset := get_manifest().resolve(path)):
+            path, asset_key = "/" + asset[0], asset[1]
+
+        file_path = static_path(path)
+        if file_path is None:
             self._send(404, "text/plain", b"Not Found")
             return
 
         mime = mimetypes.guess_type(str(file_path))[0] or "application/octet-stream"
-        self._send(200, mime, file_path.read_bytes())
+        self._send_static(file_path, mime, IMMUTABLE if asset_key else "no-cache", asset_key)
 
     # ── POST ─────────────────────────────────────────────────────────────────
 
     def do_POST(self):
         path = unquote(self.path.split("?")[0])
 
-        if path == "/api/add-breed":
-            length = int(self.headers.get("Content-Length", 0))
-            body   = self.rfile.read(length)
+        if path in JOB_ENDPOINTS:
+            kind = JOB_ENDPOINTS[path]
+            body = self._read_body()
+            if body is None:
+                return
             try:
-                data = json.loads(body)
-                name = data.get("name", "").strip()
-                if not name:
-                    self._json_response({"ok": False, "error": "Missing breed name"}, 400)
-                    return
+                data  = json.loads(body) if body else {}
+                name  = data.get("name", "").strip()
+                names = data.get("names", []) if kind == "add-many" else []
+                if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+                    raise AttributeError
             except (json.JSONDecodeError, AttributeError):
                 self._json_response({"ok": False, "error": "Invalid JSON body"}, 400)
                 return
+            if kind == "add-many":
+                names = tuple(dict.fromkeys(n.strip() for n in names if n.strip()))
+                if not names or len(names) > BULK_MAX_NAMES:
+                    self._json_response({"ok": False, "error": f"names must list 1–{BULK_MAX_NAMES} breeds"}, 400)
+                    return
+                name = ", ".join(names)
+            elif not name and kind != "refresh":
+                self._json_response({"ok": False, "error": "Missing breed name"}, 400)
+                return
 
             try:
-                from add_breed import add_breed_entry
-                result = add_breed_entry(name)
-            except Exception as exc:
-                self._json_response({"ok": False, "error": str(exc)}, 500)
+                job, created = self.server.jobs.submit(kind, name, names)
+            except QueueFull:
+                self._json_response({"ok": False, "error": "Too many jobs waiting, try again shortly"},
+                                    429, {"Retry-After": "10"})
                 return
-
-            status = 200 if result["ok"] else 422
-            self._json_response(result, status)
+            self._json_response({"ok": True, "job": self.server.jobs.get(job.id), "coalesced": not created},
+                                202, {"Location": f"/api/jobs/{job.id}"})
             return
 
-        if path == "/api/remove-breed":
-            length = int(self.headers.get("Content-Length", 0))
-            body   = self.rfile.read(length)
+        if path == "/api/score":
+            body = self._read_body()
+            if body is None:
+                return
             try:
-                data = json.loads(body)
-                name = data.get("name", "").strip()
-                if not name:
-                    self._json_response({"ok": False, "error": "Missing breed name"}, 400)
-                    return
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise AttributeError
             except (json.JSONDecodeError, AttributeError):
                 self._json_response({"ok": False, "error": "Invalid JSON body"}, 400)
                 return
 
             try:
-                from add_breed import remove_breed_entry
-                result = remove_breed_entry(name)
+                from scoring import score_request
+                result = score_request(data)
+            except (ValueError, TypeError) as exc:
+                self._json_response({"ok": False, "error": str(exc)}, 400)
+                return
             except Exception as exc:
                 self._json_response({"ok": False, "error": str(exc)}, 500)
                 return
 
-            status = 200 if result["ok"] else 422
-            self._json_response(result, status)
+            self._json_response(result)
             return
 
         self._send(404, "text/plain", b"Not Found")
 
     # ── Helpers ───────────────────────────────────────────────────────────────
 
-    def _send(self, status: int, content_type: str, body: bytes):
+    _head = False    # set by do_HEAD: send headers only
+
+    # ── Image variants ───────────────────────────────────────────────────────
+
+    def _send_variant(self, slug: str, params: dict):
+        """GET /img/<slug>?w=&fmt=&v=: a resized photo, immutable when v is its current source hash."""
+        from image_variants import VariantError, open_variant
+        try:
+            opened = open_variant(slug, params.get("w", [""])[0], params.get("fmt", [""])[0])
+        except VariantError as exc:
+            self._send(400, "text/plain", str(exc).encode())
+            return
+        except OSError:                             # unreadable or corrupt source
+            opened = None
+        if opened is None:
+            self._send(404, "text/plain", b"Not Found")
+            return
+        variant, f = opened
+        current = params.get("v", [""])[0] == variant.source_hash
+        self._send_static(variant.path, variant.mime, IMMUTABLE if current else "no-cache", f=f)
+
+    # ── Change feed ──────────────────────────────────────────────────────────
+
+    def _changes_since(self, params: dict):
+        """GET /api/breeds?since=<version>: changed breeds only, or everything if too old."""
+        if set(params) != {"since"}:
+            self._json_response({"ok": False, "error": "since can't be combined with other parameters"}, 400)
+            return
+        try:
+            since = int(params["since"][0])
+        except ValueError:
+            self._json_response({"ok": False, "error": "since must be an integer version"}, 400)
+            return
+        feed     = self.server.feed
+        version  = feed.sync()
+        changes  = feed.since(since)
+        manifest = get_manifest()
+        if changes is None:
+            version, breeds, ratings = feed.snapshot()
+            self._json_response({"ok": True, "version": version, "full": True,
+                                 "breeds": [with_image_url(b, manifest) for b in breeds], "ratings": ratings})
+            return
+        self._json_response({"ok": True, "version": max([version, *(c["version"] for c in changes)]),
+                             "full": False, "changes": [change_payload(c, manifest) for c in changes]})
+
+    def _event_stream(self):
+        """
+        GET /api/events: Server-Sent Events, one "change" event per breed
+        upsert or delete, with the feed version as the event id.  A
+        reconnecting EventSource sends Last-Event-ID and gets what it
+        missed, or a "reset" event when that's no longer retained.  Each
+        stream holds a pool thread, so only server.event_slots may be open.
+        """
+        slots = self.server.event_slots
+        if not slots.acquire(blocking=False):
+            self._json_response({"ok": False, "error": "Too many open event streams"}, 503,
+                                {"Retry-After": str(EVENT_HEARTBEAT)})
+            return
+        try:
+            feed, manifest = self.server.feed, get_manifest()
+            last = self.headers.get("Last-Event-ID") or parse_qs(urlsplit(self.path).query).get("since", [""])[0]
+            self._send_headers(200, "text/event-stream; charset=utf-8", None,    # ends when the connection does
+                               {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Connection": "close"})
+            if self._head:
+                return
+            version = feed.sync()
+            self._sse("ready", {"version": version}, event_id=None, retry=3000)
+            if last.isdigit():
+                changes = feed.since(int(last))
+                if changes is None:
+                    self._sse("reset", {"version": version})
+                version = int(last) if changes else version
+            while not feed.closed:
+                changes = feed.wait(version, EVENT_HEARTBEAT)
+                if changes is None:
+                    self._sse("reset", {"version": feed.version})
+                    version = feed.version
+                elif changes:
+                    for c in changes:
+                        self._sse("change", change_payload(c, manifest), event_id=c["version"])
+                    version = changes[-1]["version"]
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                    self.wfile.flush()
+                    feed.sync()                     # pick up edits made outside the server
+        except (BrokenPipeError, ConnectionResetError, TimeoutError):
+            pass                                    # client went away
+        finally:
+            slots.release()
+            self.close_connection = True
+
+    def _sse(self, event: str, data: dict, event_id: int | None = None, retry: int | None = None):
+        lines = [f"event: {event}"]
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        if retry is not None:
+            lines.append(f"retry: {retry}")
+        lines.append("data: " + json.dumps(data, ensure_ascii=False))
+        self.wfile.write(("\n".join(lines) + "\n\n").encode())
+        self.wfile.flush()
+
+    def _send_headers(self, status: int, content_type: str | None, length: int | None,
+                      headers: dict | None = None):
         self.send_response(status)
-        self.send_header("Content-Type", content_type)
-        self.send_header("Content-Length", str(len(body)))
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if length is not None:
+            self.send_header("Content-Length", str(length))
         self.send_header("Access-Control-Allow-Origin", "*")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
         self.end_headers()
-        self.wfile.write(body)
 
-    def _json_response(self, data, status: int = 200):
+    def _send(self, status: int, content_type: str, body: bytes, headers: dict | None = None):
+        self._send_headers(status, content_type, len(body), headers)
+        if not self._head:
+            self.wfile.write(body)
+
+    def _send_static(self, path: Path, content_type: str, cache_control: str = "no-cache",
+                     asset_key: list[int] | None = None, f=None):
+        """
+        Stream a file with socket.sendfile, which uses os.sendfile and falls
+        back to a chunked copy, so the file is never read into Python
+        memory.  Text assets are sent as their precompressed .br / .gz
+        sibling when the client accepts it.  Handles If-None-Match (or
+        If-Modified-Since without it), Range / If-Range (on the
+        representation sent) and HEAD.
+
+        asset_key is the manifest's stat key for a fingerprinted URL.  If the
+        file opened no longer has it, the file changed after it was hashed,
+        so it is sent as no-cache rather than cache_control.
+
+        f is path already opened by the caller (e.g. an image variant that
+        may be evicted at any moment); it is closed here.
+        """
+        try:
+            st = os.fstat(f.fileno()) if f is not None else os.stat(path)
+        except OSError:
+            if f is not None:
+                f.close()
+            self._send(404, "text/plain", b"Not Found")
+            return
+        etag    = stat_etag(st)
+        headers = {"Cache-Control": cache_control, "Accept-Ranges": "bytes",
+                   "Last-Modified": formatdate(st.st_mtime, usegmt=True)}
+        source  = path
+        if is_compressible(path, st.st_size):
+            headers["Vary"] = "Accept-Encoding"
+            encoding = negotiate(self.headers.get("Accept-Encoding"))
+            try:
+                sibling = compressed_sibling(path, encoding)
+            except OSError:                        # e.g. read-only checkout: send identity
+                sibling = None
+            if sibling:
+                path, etag = sibling, variant_etag(etag, encoding)
+                headers["Content-Encoding"] = encoding
+                if f is not None:
+                    f.close()
+                    f = None
+        headers["ETag"] = etag
+
+        if f is None:
+            try:
+                f = open(path, "rb")
+            except OSError:
+                self._send(404, "text/plain", b"Not Found")
+                return
+        with f:
+            fst  = os.fstat(f.fileno())
+            size = fst.st_size
+            if asset_key is not None and stat_key(fst if path == source else st) != asset_key:
+                headers["Cache-Control"] = "no-cache"
+            inm  = self.headers.get("If-None-Match")
+            if etag_matches(inm, etag) or (
+                    inm is None and not_modified_since(self.headers.get("If-Modified-Since"), st.st_mtime)):
+                self._send_headers(304, None, None, headers)
+                return
+
+            status, start, end = 200, 0, size - 1
+            rng = self.headers.get("Range")
+            if rng and self.headers.get("If-Range", etag) == etag:
+                try:
+                    span = parse_range(rng, size)
+                except ValueError:
+                    self._send(416, "text/plain", b"Range Not Satisfiable",
+                               {"Content-Range": f"bytes */{size}"})
+                    return
+                if span:
+                    status, (start, end) = 206, span
+                    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+            self._send_headers(status, content_type, end - start + 1, headers)
+            if not self._head and end >= start:
+                self.connection.sendfile(f, start, end - start + 1)
+
+    def _send_file(self, path: Path, content_type: str, render=None, version=None,
+                   headers: dict | None = None):
+        """Serve a file from the cache, or 304 when the client's copy is current."""
+        encoding = negotiate(self.headers.get("Accept-Encoding"))
+        try:
+            body, etag = _files.get(path, encoding, render, version)
+        except OSError:
+            self._send(404, "text/plain", b"Not Found")
+            return
+        headers = {**(headers or {}), "ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self._send_headers(304, None, None, headers)
+            return
+        self._send(200, content_type, body, headers)
+
+    def _json_response(self, data, status: int = 200, headers: dict | None = None):
         body = json.dumps(data, ensure_ascii=False).encode()
-        self._send(status, "application/json; charset=utf-8", body)
+        if len(body) >= MIN_SIZE:
+            headers  = {**(headers or {}), "Vary": "Accept-Encoding"}
+            encoding = negotiate(self.headers.get("Accept-Encoding"))
+            if encoding:
+                body = compress_bytes(body, encoding, fast=True)
+                headers["Content-Encoding"] = encoding
+        self._send(status, "application/json; charset=utf-8", body, headers)
 
     def do_OPTIONS(self):
-        self.send_response(200)
+        self.send_response(204)
         self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
+        self.send_header("Access-Control-Allow-Methods", "GET, HEAD, POST, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
+        self.send_header("Content-Length", "0")
         self.end_headers()
 
 
+class PooledHTTPServer(HTTPServer):
+    """
+    HTTPServer that hands each accepted connection to a fixed-size thread
+    pool.  Same structure as socketserver.ThreadingMixIn, but the thread
+    count is bounded.  Extra connections wait in the pool's queue.
+    """
+
+    request_queue_size = 128
+    allow_reuse_address = True
+
+    def __init__(self, address, handler, workers: int = DEFAULT_WORKERS):
+        # Before binding: a failed bind calls server_close(), which shuts the pool down
+        self.pool     = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+        self.workers  = workers
+        self._open    = 0                  # accepted connections, on a thread or waiting for one
+        self._lock    = threading.Lock()
+        super().__init__(address, handler)
+
+    def saturated(self) -> bool:
+        """True when connections are waiting for a thread (idle keep-alives should let go)."""
+        return self._open > self.workers
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self._open += 1
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._lock:
+                self._open -= 1
+
+    def server_close(self):
+        super().server_close()
+        if hasattr(self, "feed"):
+            self.feed.close()                       # ends open event streams
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+def make_server(host: str, port: int, workers: int = DEFAULT_WORKERS,
+                job_workers: int = JOB_WORKERS, warm: bool = False) -> HTTPServer:
+    """
+    Pooled server, or the plain single-threaded HTTPServer when workers is 0,
+    with its background JobQueue attached as server.jobs and its ChangeFeed
+    as server.feed.  Up to half the workers may hold SSE streams; the
+    single-threaded server can't hold any.  With warm, server.warm is a
+    started WarmUp (otherwise None).
+    """
+    from change_feed import ChangeFeed
+    if workers <= 0:
+        server = HTTPServer((host, port), Handler)
+    else:
+        server = PooledHTTPServer((host, port), Handler, workers)
+    server.feed         = ChangeFeed()
+    server.event_slots  = threading.BoundedSemaphore(max(workers // 2, 0))
+    server.jobs         = JobQueue(workers=job_workers, on_finish=lambda job: server.feed.sync())
+    metrics.METRICS.gauge("jobs_queued", "Background jobs waiting to run").set_function(server.jobs.queued)
+    server.warm         = WarmUp(warm_steps(server)).start() if warm else None
+    metrics.METRICS.gauge("server_ready", "1 once warm-up has finished").set_function(
+        lambda: int(server.warm is None or server.warm.ready.is_set()))
+    return server
+
+
 def main():
     ap = argparse.ArgumentParser(description="Dev server for large-dog-breeds app")
     ap.add_argument("--port", type=int, default=8000)
     ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                    help=f"Handler threads (default {DEFAULT_WORKERS}; 0 = single-threaded)")
+    ap.add_argument("--job-workers", type=int, default=JOB_WORKERS,
+                    help=f"Background add/remove/refresh job threads (default {JOB_WORKERS})")
+    ap.add_argument("--warm", action="store_true",
+                    help="Pre-import, index, compress and render thumbnails in the background "
+                         "(GET /api/ready says when)")
     args = ap.parse_args()
 
     os.chdir(ROOT)
-    server = HTTPServer((args.host, args.port), Handler)
-    print(f"Serving at http://{args.host}:{args.port}/")
+    server = make_server(args.host, args.port, args.workers, args.job_workers, warm=args.warm)
+    print(f"Serving at http://{args.host}:{args.port}/"
+          + (f"  ({args.workers} workers)" if args.workers > 0 else "  (single-threaded)"))
+    if server.warm:
+        def report():
+            server.warm.ready.wait()
+            d = server.warm.to_dict()
+            steps = ", ".join(f"{name} {t:.2f}s" for name, t in d["steps"].items())
+            print(f"Warm in {d['seconds']:.1f}s ({steps})"
+                  + "".join(f"\n  [warm-up] {name} failed: {err}" for name, err in d.get("errors", {}).items()))
+        threading.Thread(target=report, daemon=True).start()
     print("Press Ctrl+C to stop.\n")
     try:
         server.serve_forever()
     except KeyboardInterrupt:
         print("\nStopped.")
+    finally:
+        server.server_close()
 
 
 if __name__ == "__main__":
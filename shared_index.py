@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+shared_index.py — one persisted index per process, shared by request threads.
+
+similarity.py and search_index.py each keep an index in memory that server.py
+reads from its pool threads while add / remove jobs change it.  Readers don't
+wait for writers: get() hands out the published index without locking while
+its file is unchanged, and a published index is never modified again.
+update() copies it, applies the change to the copy, saves the copy and
+publishes it by swapping one reference.  A read that overlaps a job sees
+either the whole old index or the whole new one.  get() takes the lock only
+to load or rebuild the index.
+
+The published index is reused while its file is unchanged.  It is reloaded
+when another process rewrote the file, and rebuilt when a source file is
+newer than the index file (e.g. after a manual merge_ratings.py run).
+
+An index class needs build() and load() classmethods (load returns None when
+the file is missing or unreadable), save() and copy().
+
+As a callable module:
+    from shared_index import SharedIndex
+    shared = SharedIndex(SearchIndex, INDEX_FILE, sources=(BREEDS_FILE,))
+    index  = shared.get()
+    shared.update(lambda index: index.remove("samoyed"))
+"""
+
+import threading
+from pathlib import Path
+
+
+def _mtime(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+class SharedIndex:
+
+    def __init__(self, cls, index_file: Path, sources=()):
+        self.cls        = cls
+        self.index_file = Path(index_file)
+        self.sources    = tuple(sources)
+        self._lock      = threading.Lock()     # serializes loads and writers; get() takes it only to load
+        self._published = (None, None)         # (index file mtime, index), swapped as one reference
+
+    def _current(self):
+        """The index matching the file on disk, loading or rebuilding it if needed.  Holds _lock."""
+        key = _mtime(self.index_file)
+        published_key, index = self._published
+        if index is not None and published_key == key:
+            return index
+        index = None
+        if key >= max(map(_mtime, self.sources), default=0):
+            index = self.cls.load(self.index_file)
+        if index is None:
+            index = self.cls.build()
+            index.save(self.index_file)
+        self._published = (_mtime(self.index_file), index)
+        return index
+
+    def get(self):
+        key, index = self._published
+        if index is not None and key == _mtime(self.index_file):
+            return index
+        with self._lock:                        # load or rebuild; re-checked inside
+            return self._current()
+
+    def update(self, apply) -> None:
+        """Apply one change to a copy of the index, save it, then publish it."""
+        with self._lock:
+            index = self._current().copy()
+            apply(index)
+            index.save(self.index_file)
+            self._published = (_mtime(self.index_file), index)
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+similarity.py — "breeds like this one" via nearest neighbours over trait vectors.
+
+Each breed in large_dog_breeds.json becomes one feature vector:
+
+  - its 31 DogTime star ratings (breed_ratings.json), z-scored per trait
+  - weight, height and lifespan midpoints, z-scored and scaled by SIZE_WEIGHT
+    so body size counts for about as much as a rating category
+
+Missing ratings and placeholder ranges are imputed at the mean (0 after
+z-scoring).  Distance is Euclidean in that space.
+
+The index keeps the top NEIGHBOURS neighbours of every breed precomputed, so
+the common query is a table lookup.  Larger k, or an exclude list that eats
+into the table, falls back to an exact vectorized scan.  The scan lives
+behind a small backend interface (ExactBackend today) so an approximate
+backend can be swapped in later.
+
+Adding or removing a breed updates the index incrementally.  Normalization
+(per-feature mean/std) is frozen at build time.  The index is rebuilt from
+scratch once the catalog has drifted by REBUILD_DRIFT from its built size.
+
+Usage:
+    python similarity.py bernese-mountain-dog           # 10 nearest breeds
+    python similarity.py bernese-mountain-dog --k 5 --exclude newfoundland,leonberger
+    python similarity.py --build                        # rebuild similarity_index.npz
+    python similarity.py --bench 20000                  # synthetic catalog timing
+
+As a callable module:
+    from similarity import get_index
+    get_index().similar("bernese-mountain-dog", k=5)
+"""
+
+import argparse
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from models import MISSING, TRAIT_NAMES, Breed, Ratings, load_breeds, load_ratings
+from shared_index import SharedIndex
+
+ROOT         = Path(__file__).parent
+BREEDS_FILE  = ROOT / "large_dog_breeds.json"
+RATINGS_FILE = ROOT / "breed_ratings.json"
+INDEX_FILE   = ROOT / "similarity_index.npz"
+
+NEIGHBOURS    = 20      # precomputed neighbours per breed
+SIZE_WEIGHT   = 2.0     # multiplier on the weight/height/lifespan features
+REBUILD_DRIFT = 0.10    # full rebuild once N moves this far from the built size
+BLOCK_ROWS    = 512     # rows per block when precomputing all neighbour lists
+
+SIZE_FEATURES = ("weight_lbs", "height_in", "lifespan_yrs")
+FEATURES      = tuple(TRAIT_NAMES) + SIZE_FEATURES
+
+
+def raw_features(breed: Breed, ratings: Ratings | None) -> np.ndarray:
+    """Unnormalized feature row; NaN marks a missing value."""
+    row = np.full(len(FEATURES), np.nan)
+    if ratings is not None:
+        vals = np.array(ratings.values, dtype=float)
+        vals[vals == MISSING] = np.nan
+        row[:len(TRAIT_NAMES)] = vals
+    for i, key in enumerate(SIZE_FEATURES, start=len(TRAIT_NAMES)):
+        rng = getattr(breed, key)
+        if not rng.is_placeholder:
+            row[i] = rng.mid
+    return row
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+
+class ExactBackend:
+    """
+    Brute-force k-NN over a float32 matrix: one matrix-vector product plus an
+    argpartition per query.  Rows can be replaced, appended or swap-deleted
+    in place.
+    """
+
+    name = "exact"
+
+    def __init__(self, X: np.ndarray):
+        self.X  = np.ascontiguousarray(X, dtype=np.float32)
+        self.sq = np.einsum("ij,ij->i", self.X, self.X)
+
+    def __len__(self) -> int:
+        return len(self.X)
+
+    def distances(self, q: np.ndarray) -> np.ndarray:
+        """Squared Euclidean distance from q (D) or Q (M × D) to every row."""
+        q  = np.asarray(q, dtype=np.float32)
+        qq = np.einsum("...j,...j->...", q, q)
+        d  = qq[..., None] + self.sq - 2 * (q @ self.X.T)
+        return np.maximum(d, 0)
+
+    def topk(self, q: np.ndarray, k: int, skip: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """(indices, squared distances) of the k nearest rows, nearest first."""
+        d = self.distances(q)
+        if skip is not None and len(skip):
+            d[skip] = np.inf
+        k = min(k, len(d) - (0 if skip is None else len(skip)))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        idx = np.argpartition(d, k - 1)[:k] if k < len(d) else np.arange(len(d))
+        idx = idx[np.argsort(d[idx], kind="stable")]
+        return idx, d[idx]
+
+    def set_row(self, i: int, x: np.ndarray) -> None:
+        if i == len(self.X):
+            self.X  = np.vstack([self.X, x[None, :].astype(np.float32)])
+            self.sq = np.append(self.sq, np.float32(0))
+        self.X[i]  = x
+        self.sq[i] = self.X[i] @ self.X[i]
+
+    def move_row(self, src: int, dst: int) -> None:
+        self.X[dst], self.sq[dst] = self.X[src], self.sq[src]
+
+    def truncate(self, n: int) -> None:
+        self.X, self.sq = self.X[:n].copy(), self.sq[:n].copy()
+
+    def copy(self) -> "ExactBackend":
+        other = self.__class__.__new__(self.__class__)
+        other.X, other.sq = self.X.copy(), self.sq.copy()
+        return other
+
+
+BACKENDS = {"exact": ExactBackend}
+
+
+# ── Index ─────────────────────────────────────────────────────────────────────
+
+class SimilarityIndex:
+    """
+    Normalized feature matrix plus precomputed neighbour lists.
+
+    slugs / names   row order
+    mean / std      frozen normalization
+    nbr / nbr_d     N × NEIGHBOURS neighbour rows and squared distances,
+                    nearest first (-1 / inf pad when N is small)
+    """
+
+    def __init__(self, slugs, names, raw: np.ndarray, backend: str = "exact",
+                 mean: np.ndarray | None = None, std: np.ndarray | None = None):
+        self.slugs   = list(slugs)
+        self.names   = list(names)
+        self.row     = {s: i for i, s in enumerate(self.slugs)}
+        self.backend_name = backend
+        if mean is None:
+            with np.errstate(invalid="ignore"):
+                mean = np.nanmean(raw, axis=0) if len(raw) else np.zeros(len(FEATURES))
+                std  = np.nanstd(raw, axis=0) if len(raw) else np.ones(len(FEATURES))
+            mean = np.nan_to_num(mean)
+            std  = np.where(np.nan_to_num(std) > 0, np.nan_to_num(std), 1.0)
+        self.mean, self.std = mean, std
+        self.built_n = len(self.slugs)
+        self.backend = BACKENDS[backend](self._normalize(raw))
+        self.nbr   = np.full((0, NEIGHBOURS), -1, dtype=np.int32)
+        self.nbr_d = np.full((0, NEIGHBOURS), np.inf, dtype=np.float32)
+
+    @classmethod
+    def build(cls, breeds_file: Path = BREEDS_FILE, ratings_file: Path = RATINGS_FILE,
+              backend: str = "exact") -> "SimilarityIndex":
+        breeds  = [b for b in load_breeds(breeds_file) if b.dogtime_slug]
+        ratings = load_ratings(ratings_file)
+        raw = np.array([raw_features(b, ratings.get(b.dogtime_slug)) for b in breeds]) \
+            if breeds else np.empty((0, len(FEATURES)))
+        index = cls([b.dogtime_slug for b in breeds], [b.name for b in breeds], raw, backend)
+        index.precompute()
+        return index
+
+    def _normalize(self, raw: np.ndarray) -> np.ndarray:
+        z = (np.atleast_2d(raw) - self.mean) / self.std
+        z[:, len(TRAIT_NAMES):] *= SIZE_WEIGHT
+        return np.nan_to_num(z)
+
+    def __len__(self) -> int:
+        return len(self.slugs)
+
+    # ── Neighbour table ──────────────────────────────────────────────────────
+
+    def _neighbours_of(self, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Top-NEIGHBOURS (excluding self) for a block of rows."""
+        n   = len(self.slugs)
+        k   = min(NEIGHBOURS, n - 1)
+        out_i = np.full((len(rows), NEIGHBOURS), -1, dtype=np.int32)
+        out_d = np.full((len(rows), NEIGHBOURS), np.inf, dtype=np.float32)
+        if k <= 0:
+            return out_i, out_d
+        d = self.backend.distances(self.backend.X[rows])
+        d[np.arange(len(rows)), rows] = np.inf
+        idx = np.argpartition(d, k - 1, axis=1)[:, :k] if k < n else np.argsort(d, axis=1)[:, :k]
+        dd  = np.take_along_axis(d, idx, axis=1)
+        order = np.argsort(dd, axis=1, kind="stable")
+        out_i[:, :k] = np.take_along_axis(idx, order, axis=1)
+        out_d[:, :k] = np.take_along_axis(dd, order, axis=1)
+        return out_i, out_d
+
+    def precompute(self) -> None:
+        n = len(self.slugs)
+        self.nbr   = np.full((n, NEIGHBOURS), -1, dtype=np.int32)
+        self.nbr_d = np.full((n, NEIGHBOURS), np.inf, dtype=np.float32)
+        for start in range(0, n, BLOCK_ROWS):
+            rows = np.arange(start, min(start + BLOCK_ROWS, n))
+            self.nbr[rows], self.nbr_d[rows] = self._neighbours_of(rows)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def similar(self, slug: str, k: int = 10, exclude=()) -> list[dict]:
+        """
+        Up to k nearest breeds to slug, nearest first, skipping the slugs in
+        exclude.  Raises KeyError for an unknown slug.
+        """
+        i    = self.row[slug]
+        skip = {self.row[s] for s in exclude if s in self.row}
+        cand = [(j, d) for j, d in zip(self.nbr[i], self.nbr_d[i]) if j >= 0 and j not in skip]
+        if len(cand) < k and len(cand) < len(self.slugs) - 1 - len(skip - {i}):
+            idx, dist = self.backend.topk(self.backend.X[i], k,
+                                          skip=np.fromiter(skip | {i}, dtype=np.int64))
+            cand = list(zip(idx, dist))
+        return [{"slug": self.slugs[j], "name": self.names[j], "distance": round(float(np.sqrt(d)), 4)}
+                for j, d in cand[:k]]
+
+    # ── Incremental updates ──────────────────────────────────────────────────
+
+    def upsert(self, breed: Breed, ratings: Ratings | None) -> None:
+        """Add or replace a breed, patching only the neighbour lists it affects."""
+        slug = breed.dogtime_slug
+        if slug in self.row:
+            self.remove(slug)
+        i = len(self.slugs)
+        self.slugs.append(slug)
+        self.names.append(breed.name)
+        self.row[slug] = i
+        self.backend.set_row(i, self._normalize(raw_features(breed, ratings))[0])
+        self.nbr   = np.vstack([self.nbr, np.full((1, NEIGHBOURS), -1, dtype=np.int32)])
+        self.nbr_d = np.vstack([self.nbr_d, np.full((1, NEIGHBOURS), np.inf, dtype=np.float32)])
+        if self._drifted():
+            return
+
+        # The new breed's own list, then every list it now belongs in
+        self.nbr[[i]], self.nbr_d[[i]] = self._neighbours_of(np.array([i]))
+        d = self.backend.distances(self.backend.X[i])
+        d[i] = np.inf
+        rows = np.flatnonzero(d < self.nbr_d[:, -1])
+        if len(rows):
+            self.nbr[rows, -1], self.nbr_d[rows, -1] = i, d[rows]
+            order = np.argsort(self.nbr_d[rows], axis=1, kind="stable")
+            self.nbr[rows]   = np.take_along_axis(self.nbr[rows], order, axis=1)
+            self.nbr_d[rows] = np.take_along_axis(self.nbr_d[rows], order, axis=1)
+
+    def remove(self, slug: str) -> bool:
+        """Drop a breed; lists that contained it are recomputed."""
+        i = self.row.pop(slug, None)
+        if i is None:
+            return False
+        last = len(self.slugs) - 1
+        if i != last:                                  # swap the last row into i
+            moved = self.slugs[last]
+            self.slugs[i], self.names[i] = moved, self.names[last]
+            self.row[moved] = i
+            self.backend.move_row(last, i)
+            self.nbr[i], self.nbr_d[i] = self.nbr[last], self.nbr_d[last]
+        self.slugs.pop(), self.names.pop()
+        self.backend.truncate(last)
+        self.nbr, self.nbr_d = self.nbr[:last], self.nbr_d[:last]
+
+        hit = (self.nbr == i).any(axis=1)
+        if i != last:
+            self.nbr[self.nbr == last] = i
+        if self._drifted():
+            return True
+        rows = np.flatnonzero(hit)
+        if len(rows):
+            self.nbr[rows], self.nbr_d[rows] = self._neighbours_of(rows)
+        return True
+
+    def _drifted(self) -> bool:
+        """Rebuild normalization and all lists once N drifted too far."""
+        if abs(len(self.slugs) - self.built_n) <= REBUILD_DRIFT * max(self.built_n, 1):
+            return False
+        raw = self.backend.X.astype(float)
+        raw[:, len(TRAIT_NAMES):] /= SIZE_WEIGHT
+        raw = raw * self.std + self.mean                # back to raw units (imputed values stay at the old mean)
+        fresh = SimilarityIndex(self.slugs, self.names, raw, self.backend_name)
+        fresh.precompute()
+        self.__dict__.update(fresh.__dict__)
+        return True
+
+    def copy(self) -> "SimilarityIndex":
+        """An independent index to apply changes to while readers keep using this one."""
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        other.slugs, other.names, other.row = list(self.slugs), list(self.names), dict(self.row)
+        other.backend = self.backend.copy()
+        other.nbr, other.nbr_d = self.nbr.copy(), self.nbr_d.copy()
+        return other
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def save(self, index_file: Path = INDEX_FILE) -> None:
+        tmp = Path(index_file).with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, slugs=np.array(self.slugs, dtype=str), names=np.array(self.names, dtype=str),
+                     X=self.backend.X, mean=self.mean, std=self.std, nbr=self.nbr, nbr_d=self.nbr_d,
+                     built_n=np.array(self.built_n), backend=np.array(self.backend_name))
+        os.replace(tmp, index_file)
+
+    @classmethod
+    def load(cls, index_file: Path = INDEX_FILE) -> "SimilarityIndex | None":
+        try:
+            with np.load(index_file) as z:
+                if z["X"].shape[1:] != (len(FEATURES),):
+                    return None
+                index = cls.__new__(cls)
+                index.slugs   = z["slugs"].tolist()
+                index.names   = z["names"].tolist()
+                index.row     = {s: i for i, s in enumerate(index.slugs)}
+                index.mean, index.std = z["mean"], z["std"]
+                index.built_n = int(z["built_n"])
+                index.backend_name = str(z["backend"])
+                index.backend = BACKENDS[index.backend_name](z["X"])
+                index.nbr, index.nbr_d = z["nbr"], z["nbr_d"]
+                return index
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+# ── Shared index ──────────────────────────────────────────────────────────────
+# The server keeps one index in memory.  It is rebuilt when the breed or
+# ratings files are newer than similarity_index.npz (e.g. after a manual
+# merge_ratings.py run); add/remove keep the file current incrementally.
+# Updates go to a copy that replaces the shared index once saved, so a
+# /api/similar request never sees a half-applied change (see shared_index.py).
+
+_shared = SharedIndex(SimilarityIndex, INDEX_FILE, sources=(BREEDS_FILE, RATINGS_FILE))
+
+
+def get_index() -> SimilarityIndex:
+    return _shared.get()
+
+
+def upsert_breed(breed: Breed, ratings: Ratings | None) -> None:
+    """Add or refresh one breed in similarity_index.npz."""
+    _shared.update(lambda index: index.upsert(breed, ratings))
+
+
+def upsert_breeds(pairs: list[tuple[Breed, Ratings | None]]) -> None:
+    """Add or refresh many breeds with one load and one save of similarity_index.npz."""
+    def apply(index):
+        for breed, ratings in pairs:
+            index.upsert(breed, ratings)
+    _shared.update(apply)
+
+
+def remove_breed(slug: str) -> None:
+    """Drop one breed from similarity_index.npz."""
+    _shared.update(lambda index: index.remove(slug))
+
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def _bench(n: int) -> None:
+    rng     = np.random.default_rng(0)
+    breeds  = [Breed(name=f"Synthetic {i}", dogtime_slug=f"synthetic-{i}") for i in range(n)]
+    raw     = np.hstack([rng.integers(1, 6, (n, len(TRAIT_NAMES))).astype(float),
+                         rng.uniform(40, 160, (n, 1)), rng.uniform(20, 34, (n, 1)),
+                         rng.uniform(7, 15, (n, 1))])
+    t0 = time.perf_counter()
+    index = SimilarityIndex([b.dogtime_slug for b in breeds], [b.name for b in breeds], raw)
+    index.precompute()
+    print(f"{n:,} synthetic breeds × {len(FEATURES)} features: built in {time.perf_counter() - t0:.2f}s")
+
+    slugs = [breeds[i].dogtime_slug for i in rng.integers(0, n, 200)]
+    for label, kwargs in (("k=10 (table)", {"k": 10}),
+                          ("k=10, exclude 3", {"k": 10, "exclude": slugs[:3]}),
+                          ("k=50 (scan)", {"k": 50})):
+        t0 = time.perf_counter()
+        for s in slugs:
+            index.similar(s, **kwargs)
+        print(f"  {label:18s} {(time.perf_counter() - t0) / len(slugs) * 1e3:7.3f} ms/query")
+
+    extra = Breed(name="Synthetic new", dogtime_slug="synthetic-new")
+    t0 = time.perf_counter()
+    index.upsert(extra, Ratings.from_flat(dict(zip(TRAIT_NAMES, rng.integers(1, 6, len(TRAIT_NAMES))))))
+    t1 = time.perf_counter()
+    index.remove("synthetic-new")
+    t2 = time.perf_counter()
+    print(f"  upsert {(t1 - t0) * 1e3:.2f} ms   remove {(t2 - t1) * 1e3:.2f} ms")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Breed similarity (k nearest neighbours)")
+    ap.add_argument("slug", nargs="?", help="Breed slug to find neighbours for")
+    ap.add_argument("--k",       type=int, default=10, help="Neighbours to list (default 10)")
+    ap.add_argument("--exclude", default="", help="Comma-separated slugs to leave out")
+    ap.add_argument("--build",   action="store_true", help=f"Rebuild {INDEX_FILE.name}")
+    ap.add_argument("--bench",   type=int, metavar="N", help="Time build and queries at N synthetic breeds")
+    args = ap.parse_args()
+
+    if args.bench:
+        _bench(args.bench)
+        return
+    if args.build:
+        index = SimilarityIndex.build()
+        index.save()
+        print(f"Built {INDEX_FILE.name}: {len(index)} breeds × {len(FEATURES)} features")
+    if args.slug:
+        index = get_index()
+        if args.slug not in index.row:
+            print(f"Unknown slug: {args.slug}")
+            return
+        exclude = [s for s in args.exclude.split(",") if s]
+        for n in index.similar(args.slug, k=args.k, exclude=exclude):
+            print(f"  {n['distance']:7.3f}  {n['name']}")
+    elif not args.build:
+        ap.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+trait_registry.py — stable small-integer IDs for DogTime categories and traits.
+
+Built from criteria_schema.json.  Categories are numbered in schema order, and
+traits are numbered by walking the schema: each category's
+"<Category> - Overall" score first, then its traits.  This matches the key
+order of breed_ratings.json, so a trait's ID is also its column in any
+breeds × traits matrix.
+
+Trait names that are not in the schema (DogTime occasionally adds one) are
+interned on first sight and get the next free ID.  Schema IDs never move.
+
+Code that handles ratings works with IDs and converts to names only when it
+reads or writes JSON.
+
+Usage:
+    python trait_registry.py          # print the ID table
+
+As a callable module:
+    from trait_registry import REGISTRY
+    tid = REGISTRY.trait_id("Easy To Train")
+    REGISTRY.trait_name(tid)
+"""
+
+import json
+import threading
+from pathlib import Path
+
+SCHEMA_FILE = Path(__file__).parent / "criteria_schema.json"
+
+OVERALL_SUFFIX = " - Overall"
+
+
+class TraitRegistry:
+    """Bidirectional name ↔ ID tables for categories and traits."""
+
+    def __init__(self):
+        self.category_names: list[str]  = []
+        self.trait_names:    list[str]  = []
+        self.trait_category: list[int]  = []   # trait ID → category ID (-1 if unknown)
+        self._category_ids:  dict[str, int] = {}
+        self._trait_ids:     dict[str, int] = {}
+        self.n_schema_traits = 0               # IDs below this come from the schema
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_schema(cls, schema_file: Path = SCHEMA_FILE) -> "TraitRegistry":
+        reg = cls()
+        for cat in json.loads(Path(schema_file).read_text()):
+            cid = reg.intern_category(cat["category"])
+            reg.intern(cat["category"] + OVERALL_SUFFIX, cid)
+            for t in cat["traits"]:
+                reg.intern(t["name"], cid)
+        reg.n_schema_traits = len(reg.trait_names)
+        return reg
+
+    # ── Interning ────────────────────────────────────────────────────────────
+
+    def intern_category(self, name: str) -> int:
+        cid = self._category_ids.get(name)
+        if cid is None:
+            with self._lock:
+                cid = self._category_ids.get(name)
+                if cid is None:
+                    cid = len(self.category_names)
+                    self.category_names.append(name)
+                    self._category_ids[name] = cid
+        return cid
+
+    def intern(self, name: str, category_id: int = -1) -> int:
+        """Return the ID for a trait name, assigning the next free one if new."""
+        tid = self._trait_ids.get(name)
+        if tid is None:
+            with self._lock:
+                tid = self._trait_ids.get(name)
+                if tid is None:
+                    tid = len(self.trait_names)
+                    self.trait_names.append(name)
+                    self.trait_category.append(category_id)
+                    self._trait_ids[name] = tid
+        return tid
+
+    # ── Lookups ──────────────────────────────────────────────────────────────
+
+    def trait_id(self, name: str) -> int | None:
+        return self._trait_ids.get(name)
+
+    def trait_ids(self, names) -> list[int]:
+        """IDs for names; raises KeyError for a name that was never interned."""
+        ids = self._trait_ids
+        return [ids[n] for n in names]
+
+    def trait_name(self, tid: int) -> str:
+        return self.trait_names[tid]
+
+    def category_id(self, name: str) -> int | None:
+        return self._category_ids.get(name)
+
+    def category_name(self, cid: int) -> str:
+        return self.category_names[cid]
+
+    def category_traits(self, cid: int) -> list[int]:
+        return [tid for tid, c in enumerate(self.trait_category) if c == cid]
+
+    def __len__(self) -> int:
+        return len(self.trait_names)
+
+    # ── Edge conversion ──────────────────────────────────────────────────────
+
+    def nest(self, items) -> dict[str, dict[str, int]]:
+        """
+        [(category_id, trait_id, stars), ...] → the nested
+        {category: {trait: stars}} shape the *_ratings.json files use.
+        """
+        out: dict[str, dict[str, int]] = {}
+        for cid, tid, stars in items:
+            out.setdefault(self.category_names[cid], {})[self.trait_names[tid]] = stars
+        return out
+
+    def flatten(self, nested: dict[str, dict[str, int]]) -> dict[int, int]:
+        """Nested category → trait dict → {trait_id: stars}, interning unknowns."""
+        flat: dict[int, int] = {}
+        for category, traits in nested.items():
+            cid = self.intern_category(category)
+            for name, stars in traits.items():
+                flat[self.intern(name, cid)] = stars
+        return flat
+
+    def names(self, by_id: dict[int, object]) -> dict[str, object]:
+        """{trait_id: value} → {trait_name: value} in ID order."""
+        return {self.trait_names[tid]: by_id[tid] for tid in sorted(by_id)}
+
+
+REGISTRY = TraitRegistry.from_schema()
+
+
+def main():
+    for cid, cat in enumerate(REGISTRY.category_names):
+        print(f"[{cid}] {cat}")
+        for tid in REGISTRY.category_traits(cid):
+            print(f"    {tid:3d}  {REGISTRY.trait_name(tid)}")
+
+
+if __name__ == "__main__":
+    main()
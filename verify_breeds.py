@@ -12,6 +12,7 @@ Usage:
 
 import argparse
 import json
+import os
 import re
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -21,6 +22,8 @@ from pathlib import Path
 import requests
 from bs4 import BeautifulSoup
 
+from models import Range
+
 DATA_FILE = Path(__file__).parent / "large_dog_breeds.json"
 TODAY = date.today().isoformat()
 HEADERS = {
@@ -142,7 +145,7 @@ def parse_breed_data(html: str) -> dict:
     for field, patterns in RANGE_PATTERNS.items():
         match = extract_all_ranges(patterns, text, field=field)
         if match:
-            result[field] = {"min": match[0], "max": match[1]}
+            result[field] = Range(match[0], match[1])
 
     # Re-parse with scripts for image extraction
     soup2 = BeautifulSoup(html, "lxml")
@@ -155,22 +158,20 @@ def parse_breed_data(html: str) -> dict:
 
 def compare_range(
     field: str,
-    json_range: dict,
-    scraped_range: dict,
+    json_range: Range,
+    scraped_range: Range,
     corrections: list,
     tolerance: float = 0.10,
-) -> dict:
+) -> Range:
     """
     Compare min/max with 10% tolerance per boundary.
     Records original value only when a correction is made.
-    Returns (possibly updated) range dict.
+    Returns (possibly updated) range.
     """
-    updated = dict(json_range)
+    updated = Range(json_range.min, json_range.max)
     for bound in ("min", "max"):
-        j_val = json_range.get(bound)
-        s_val = scraped_range.get(bound)
-        if j_val is None or s_val is None:
-            continue
+        j_val = getattr(json_range, bound)
+        s_val = getattr(scraped_range, bound)
         tol = max(abs(s_val) * tolerance, 1.0)
         if abs(j_val - s_val) > tol:
             corrections.append(
@@ -181,7 +182,7 @@ def compare_range(
                     "source": "dogtime.com",
                 }
             )
-            updated[bound] = s_val
+            setattr(updated, bound, s_val)
     return updated
 
 
@@ -211,8 +212,8 @@ def verify_breed(breed: dict) -> dict:
     for field in ("weight_lbs", "height_in", "lifespan_yrs"):
         if field in scraped and field in breed:
             breed[field] = compare_range(
-                field, breed[field], scraped[field], corrections
-            )
+                field, Range.from_dict(breed[field]), scraped[field], corrections
+            ).to_dict()
 
     if "dogtime_image_url" in scraped:
         breed["dogtime_image_url"] = scraped["dogtime_image_url"]
@@ -281,7 +282,9 @@ def main():
     if args.dry_run:
         print("\n[dry-run] No changes written.")
     else:
-        DATA_FILE.write_text(json.dumps(breeds, indent=2, ensure_ascii=False))
+        tmp = DATA_FILE.with_suffix(".tmp")     # rename into place: the server never serves a partial file
+        tmp.write_text(json.dumps(breeds, indent=2, ensure_ascii=False))
+        os.replace(tmp, DATA_FILE)
         print(f"\nWrote {DATA_FILE}")
 
 